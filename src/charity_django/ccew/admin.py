@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Prefetch
 from django.urls import reverse
 from django.utils.html import escape, format_html_join, mark_safe
 from django.utils.translation import gettext_lazy as _
@@ -12,7 +13,12 @@ from charity_django.ccew.models import (
     CharityEventHistory,
     Merger,
 )
-from charity_django.utils.admin import CharitySizeListFilter
+from charity_django.ccew.models.choices import ClassificationType
+from charity_django.utils.admin import (
+    CharitySizeListFilter,
+    NameSearchMixin,
+    PrefetchChangeViewMixin,
+)
 
 
 class CCEWCharitySizeListFilter(CharitySizeListFilter):
@@ -93,16 +99,16 @@ class CharityEventHistoryInline(admin.TabularInline):
 
 
 @admin.register(Charity)
-class CharityAdmin(admin.ModelAdmin):
+class CharityAdmin(PrefetchChangeViewMixin, NameSearchMixin, admin.ModelAdmin):
     list_display = (
-        "name",
+        "display_name",
         "registered_charity_number",
         "linked_charity_number",
         "charity_registration_status",
         "charity_type",
         "income",
     )
-    list_display_links = ("name",)
+    list_display_links = ("display_name",)
     list_filter = (
         MainCharityListFilter,
         "charity_registration_status",
@@ -117,6 +123,7 @@ class CharityAdmin(admin.ModelAdmin):
         "charity_name",
         "registered_charity_number",
     )
+    name_search_id_fields = ("registered_charity_number",)
     inlines = [
         CharityAreaOfOperationInline,
         CharityAnnualReturnHistoryInline,
@@ -140,6 +147,23 @@ class CharityAdmin(admin.ModelAdmin):
         "regulators",
         "ccew_reports",
     )
+    change_view_prefetch = (
+        "trustees",
+        "policies",
+        "other_names",
+        "other_regulators",
+        "published_reports",
+        "classification",
+        "governing_document",
+        "event_history",
+        Prefetch("merged_into", queryset=Merger.objects.select_related("transferee")),
+        Prefetch("merged_from", queryset=Merger.objects.select_related("transferor")),
+    )
+
+    def chair(self, obj):
+        for trustee in obj.trustees.all():
+            if trustee.trustee_is_chair:
+                return trustee
 
     def trustees(self, obj):
         trustees = sorted(
@@ -166,7 +190,7 @@ class CharityAdmin(admin.ModelAdmin):
         return format_html_join(
             "\n",
             "<li>{}</li>",
-            [(o,) for o in obj.policies.values_list("policy_name", flat=True)],
+            [(o.policy_name,) for o in obj.policies.all()],
         )
 
     def other_names(self, obj):
@@ -196,26 +220,38 @@ class CharityAdmin(admin.ModelAdmin):
             related_charities,
         )
 
-    def what(self, obj):
+    def _classification(self, obj, classification_type):
         return format_html_join(
             "\n",
             "<li>{}</li>",
-            [(o,) for o in obj.what],
+            [
+                (o.classification_description,)
+                for o in obj.classification.all()
+                if o.classification_type == classification_type
+            ],
         )
 
+    def what(self, obj):
+        return self._classification(obj, ClassificationType.WHAT)
+
     def how(self, obj):
-        return format_html_join(
-            "\n",
-            "<li>{}</li>",
-            [(o,) for o in obj.how],
-        )
+        return self._classification(obj, ClassificationType.HOW)
 
     def who(self, obj):
-        return format_html_join(
-            "\n",
-            "<li>{}</li>",
-            [(o,) for o in obj.who],
-        )
+        return self._classification(obj, ClassificationType.WHO)
+
+    def _governing_document(self, obj, field):
+        for gd in obj.governing_document.all():
+            return getattr(gd, field)
+
+    def governing_document_description(self, obj):
+        return self._governing_document(obj, "governing_document_description")
+
+    def charitable_objects(self, obj):
+        return self._governing_document(obj, "charitable_objects")
+
+    def area_of_benefit(self, obj):
+        return self._governing_document(obj, "area_of_benefit")
 
     def regulators(self, obj):
         return format_html_join(
@@ -7,9 +7,10 @@ import zipfile
 from datetime import datetime, timedelta
 from tempfile import TemporaryDirectory
 
-import psycopg2.extras
 import requests_cache
 import tqdm
+from django.apps import apps
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.core.management.color import no_style
 from django.db import connections, router, transaction
@@ -30,6 +31,14 @@ from charity_django.ccew.models import (
     CharityPublishedReport,
     CharityTrustee,
 )
+from charity_django.utils.bulk import (
+    BulkWriter,
+    add_bulk_session_argument,
+    import_session,
+)
+from charity_django.utils.indexes import DeferredIndexes
+from charity_django.utils.maintenance import add_analyze_arguments, analyze_tables
+from charity_django.utils.text import normalise_name_many, to_titlecase_many
 
 from .create_dummy_charity import DUMMY_CHARITY_TYPE
 
@@ -43,6 +52,7 @@ class Command(BaseCommand):
     help = "Import CCEW data from a zip file"
 
     encoding = "utf8"
+    bulk_session = False
     base_url = "https://ccewuksprdoneregsadata1.blob.core.windows.net/data/txt/publicextract.{}.zip"
     ccew_file_to_object = {
         "charity": Charity,
@@ -59,6 +69,13 @@ class Command(BaseCommand):
         "charity_published_report": CharityPublishedReport,
         "charity_trustee": CharityTrustee,
     }
+    derived_fields = {
+        # field, source field, function applied to a page of source values
+        "charity": (
+            ("display_name", "charity_name", to_titlecase_many),
+            ("normalised_name", "charity_name", normalise_name_many),
+        ),
+    }
     upsert_files = {
         # conflict target, pre upsert sql
         "charity_annual_return_history": (
@@ -89,6 +106,13 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--sample", type=int, default=0)
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help="Drop the indexes on the reloaded tables and rebuild them afterwards",
+        )
+        add_analyze_arguments(parser)
+        add_bulk_session_argument(parser)
 
     def handle(self, *args, **options):
         self.temp_dir = TemporaryDirectory()
@@ -98,11 +122,15 @@ class Command(BaseCommand):
         )
         self.sample_registration_numbers = set()
         self.sample = options.get("sample")
+        self.bulk_session = options.get("bulk_session")
 
         db = self._get_db()
         self.connection = connections[db]
 
-        with transaction.atomic():
+        with (
+            import_session(db, enabled=self.bulk_session),
+            transaction.atomic(using=db),
+        ):
             # ensure any demonstration charities aren't deleted
             self.demo_charities = list(
                 Charity.objects.filter(charity_type=DUMMY_CHARITY_TYPE).values_list(
@@ -111,11 +139,51 @@ class Command(BaseCommand):
             )
             self.delete_existing()
 
+            indexes = None
+            if options.get("defer_indexes"):
+                indexes = DeferredIndexes(
+                    [
+                        db_table
+                        for filename, db_table in self.ccew_file_to_object.items()
+                        if not self._do_upsert(filename)
+                    ],
+                    using=db,
+                )
+                indexes.drop()
+
             self.fetch_file()
 
+        # the indexes are rebuilt once the data is committed
+        if indexes:
+            indexes.rebuild()
+
+        if options.get("analyze", True):
+            tables = [Charity, *self.ccew_file_to_object.values()]
+            analyze_tables(
+                tables,
+                using=db,
+                vacuum=[
+                    db_table
+                    for filename, db_table in self.ccew_file_to_object.items()
+                    if filename in self.upsert_files
+                ]
+                if options.get("vacuum")
+                else (),
+            )
+
         # delete temporary directory
         self.temp_dir.cleanup()
 
+        # rebuild the links between charities and area codes
+        call_command("update_aoo_geocodes")
+
+        # add geography to the reloaded rows, which also rebuilds the summary
+        # tables, as they are grouped by country and region
+        if apps.is_installed("charity_django.postcodes"):
+            call_command("update_postcode_geography", register=["ccew"])
+        elif apps.is_installed("charity_django.utils"):
+            call_command("update_charity_aggregates", register=["ccew"])
+
     def _do_upsert(self, filename):
         return (filename in self.upsert_files) and (
             self.connection.vendor == "postgresql"
@@ -245,17 +313,32 @@ class Command(BaseCommand):
                     continue
                 yield list(row.values())
 
-        def get_data_chunks(reader, row_count=None):
-            rows = []
+        derived_fields = self.derived_fields.get(filename, ())
+
+        def get_fields(reader):
+            return list(reader.fieldnames) + [f[0] for f in derived_fields]
+
+        def add_derived_fields(reader, page):
+            # derived values are worked out a page at a time rather than row by row
+            columns = [
+                func([r[reader.fieldnames.index(source)] for r in page])
+                for _, source, func in derived_fields
+            ]
+            for row, values in zip(page, zip(*columns)):
+                yield row + list(values)
+
+        def get_rows(reader, row_count=None):
+            if not derived_fields:
+                yield from get_data(reader, row_count)
+                return
+            page = []
             for row in get_data(reader, row_count):
-                rows.append(tuple(row))
-                if len(rows) == page_size:
-                    for r in rows:
-                        yield r
-                    rows = []
-            if rows:
-                for r in rows:
-                    yield r
+                page.append(row)
+                if len(page) == page_size:
+                    yield from add_derived_fields(reader, page)
+                    page = []
+            if page:
+                yield from add_derived_fields(reader, page)
 
         def table_insert(cursor, reader):
             # reset the sequence
@@ -266,33 +349,19 @@ class Command(BaseCommand):
                 cursor.execute(sql)
 
             self.logger("Starting table insert [{}]".format(db_table._meta.db_table))
-            fields = list(reader.fieldnames)
-            statement = (
-                """INSERT INTO "{table}" ("{fields}") VALUES {placeholder}""".format(
-                    table=db_table._meta.db_table,
-                    fields='", "'.join(fields),
-                    placeholder="(" + ", ".join(["%s" for f in fields]) + ")"
-                    if self.connection.vendor == "sqlite"
-                    else "%s",
-                )
-            )
-            if self.connection.vendor == "postgresql":
-                psycopg2.extras.execute_values(
-                    cursor,
-                    statement,
-                    get_data(reader, len(reader.fieldnames)),
-                    page_size=page_size,
-                )
-            else:
-                cursor.executemany(
-                    statement,
-                    get_data_chunks(reader, len(reader.fieldnames)),
-                )
+            with BulkWriter(
+                db_table._meta.db_table,
+                get_fields(reader),
+                using=self.connection.alias,
+                batch_size=page_size,
+                staged=self.bulk_session,
+            ) as writer:
+                writer.write(get_rows(reader, len(reader.fieldnames)))
+            self.logger(writer.summary())
             self.logger("Finished table insert [{}]".format(db_table._meta.db_table))
 
         def table_upsert(cursor, reader):
             self.logger("Starting table upsert [{}]".format(db_table._meta.db_table))
-            fields = list(reader.fieldnames)
 
             # sql to execute prior to upsert
             if self.upsert_files.get(filename)[1]:
@@ -302,28 +371,16 @@ class Command(BaseCommand):
                     )
                 )
 
-            conflict_target = self.upsert_files.get(filename)[0]
-            statement = """INSERT INTO "{table}" ("{fields}") 
-                    VALUES %s 
-                    ON CONFLICT ("{conflict_target}")
-                    DO UPDATE SET {update_fields}""".format(
-                table=db_table._meta.db_table,
-                fields='", "'.join(fields),
-                conflict_target='", "'.join(conflict_target),
-                update_fields=", ".join(
-                    [
-                        '"{field}" = EXCLUDED."{field}"'.format(field=f)
-                        for f in fields
-                        if f not in conflict_target
-                    ]
-                ),
-            )
-            psycopg2.extras.execute_values(
-                cursor,
-                statement,
-                get_data(reader, len(reader.fieldnames)),
-                page_size=page_size,
-            )
+            with BulkWriter(
+                db_table._meta.db_table,
+                get_fields(reader),
+                using=self.connection.alias,
+                batch_size=page_size,
+                conflict_fields=self.upsert_files.get(filename)[0],
+                staged=self.bulk_session,
+            ) as writer:
+                writer.write(get_rows(reader, len(reader.fieldnames)))
+            self.logger(writer.summary())
             self.logger("Finished table upsert [{}]".format(db_table._meta.db_table))
 
         with self.connection.cursor() as cursor:
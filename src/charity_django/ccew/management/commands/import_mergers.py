@@ -8,7 +8,8 @@ import tqdm
 from django.core.management.base import BaseCommand
 from django.db import transaction
 
-from charity_django.ccew.models import Charity, Merger
+from charity_django.ccew.models import Merger
+from charity_django.ccew.resolver import CharityResolver
 from charity_django.utils.cachedsession import CachedHTMLSession
 
 logger = logging.getLogger(__name__)
@@ -94,7 +95,7 @@ class Command(BaseCommand):
             "demo_cache.sqlite",
             expire_after=timedelta(days=1),
         )
-        self.charity_cache = {}
+        self.resolver = CharityResolver().load()
 
         self.fetch_file()
         with transaction.atomic():
@@ -102,22 +103,8 @@ class Command(BaseCommand):
                 self.parse_file(response, filename)
 
     def lookup_charity(self, regno, subno):
-        key = (regno, subno)
-        if key in self.charity_cache:
-            return self.charity_cache[key]
-
-        charity = Charity.objects.filter(
-            registered_charity_number=regno, linked_charity_number=subno
-        ).first()
-        if charity:
-            self.charity_cache[key] = charity
-            return self.charity_cache[key]
-
-        self.charity_cache[key] = Charity.objects.filter(
-            organisation_number=regno
-        ).first()
-
-        return self.charity_cache[key]
+        # returns the primary key of the charity rather than the object
+        return self.resolver.resolve(regno, subno)
 
     def clean_fields(self, record, bool_fields=[]):
         record = {self.columns.get(k.strip(), k): v for k, v in record.items()}
@@ -227,13 +214,13 @@ class Command(BaseCommand):
                         row[f"{field}_subno"] = int(row[f"{field}_subno"])
                 row[f"{field}_name"] = self.regno_regex.sub("", original_field).strip()
 
-                # add the organisation number
-                row[field] = self.lookup_charity(
+                # add the charity id
+                row[f"{field}_id"] = self.lookup_charity(
                     row[f"{field}_regno"],
                     row[f"{field}_subno"],
                 )
 
-                if not row[field]:
+                if not row[f"{field}_id"]:
                     self.logger(
                         f"Could not find charity: {original_field}",
                         level=logging.WARNING,
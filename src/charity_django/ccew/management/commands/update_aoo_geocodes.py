@@ -0,0 +1,100 @@
+import logging
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections, router, transaction
+
+from charity_django.ccew.models import (
+    CharityAreaOfOperation,
+    CharityAreaOfOperationGeoCode,
+    CharityAreaOfOperationLookup,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# stop walking up the hierarchy after this many levels, in case of loops
+MAX_LEVEL = 10
+
+ROLLUP_SQL = """
+-- both parts of the recursive query need the same column types in postgres
+WITH RECURSIVE areas (organisation_number, gss, level) AS (
+    SELECT DISTINCT a.{organisation_number}, CAST(l.{gss} AS VARCHAR(255)), 0
+    FROM {aoo} a
+        INNER JOIN {lookup} l
+            ON a.{geographic_area_type} = l.{geographic_area_type}
+            AND a.{geographic_area_description} = l.{geographic_area_description}
+    WHERE l.{gss} IS NOT NULL
+        AND LENGTH(l.{gss}) <= 9
+    {parents}
+)
+INSERT INTO {rollup} ({organisation_number}, {gss}, {level})
+SELECT organisation_number, gss, MIN(level)
+FROM areas
+GROUP BY organisation_number, gss
+"""
+
+PARENTS_SQL = """
+    UNION
+    SELECT areas.organisation_number, CAST(g.{parentcd} AS VARCHAR(255)), areas.level + 1
+    FROM areas
+        INNER JOIN {geocode} g
+            ON g.{geogcd} = areas.gss
+    WHERE g.{parentcd} IS NOT NULL
+        AND g.{parentcd} != g.{geogcd}
+        AND areas.level < {max_level}
+"""
+
+
+class Command(BaseCommand):
+    help = "Link charities to the GSS codes of the areas they operate in, and the areas containing them"
+
+    def _get_db(self):
+        return router.db_for_write(CharityAreaOfOperationGeoCode)
+
+    def logger(self, message, error=False):
+        if error:
+            logger.error(message)
+            return
+        logger.info(message)
+
+    def get_sql(self, connection):
+        quote_name = connection.ops.quote_name
+        names = {
+            "aoo": quote_name(CharityAreaOfOperation._meta.db_table),
+            "lookup": quote_name(CharityAreaOfOperationLookup._meta.db_table),
+            "rollup": quote_name(CharityAreaOfOperationGeoCode._meta.db_table),
+            "organisation_number": quote_name("organisation_number"),
+            "geographic_area_type": quote_name("geographic_area_type"),
+            "geographic_area_description": quote_name("geographic_area_description"),
+            "gss": quote_name("gss"),
+            "level": quote_name("level"),
+            "parents": "",
+        }
+        # walk up the hierarchy of areas if the postcodes app is installed
+        if apps.is_installed("charity_django.postcodes"):
+            GeoCode = apps.get_model("postcodes", "GeoCode")
+            names["parents"] = PARENTS_SQL.format(
+                geocode=quote_name(GeoCode._meta.db_table),
+                geogcd=quote_name(GeoCode._meta.get_field("GEOGCD").column),
+                parentcd=quote_name(GeoCode._meta.get_field("PARENTCD").column),
+                max_level=MAX_LEVEL,
+            )
+        else:
+            self.logger("Postcodes app not installed, only adding direct areas")
+        return ROLLUP_SQL.format(**names)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        db = self._get_db()
+        connection = connections[db]
+        with transaction.atomic(using=db), connection.cursor() as cursor:
+            deleted, _ = CharityAreaOfOperationGeoCode.objects.using(db).all().delete()
+            self.logger(f"Deleted {deleted:,.0f} existing area of operation codes")
+            cursor.execute(self.get_sql(connection))
+        created = CharityAreaOfOperationGeoCode.objects.using(db).count()
+        self.logger(
+            f"Added {created:,.0f} area of operation codes "
+            f"in {time.perf_counter() - start:.2f} seconds"
+        )
@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 import csv
 import logging
-from collections import defaultdict
+import time
+from collections import Counter, defaultdict
 from datetime import timedelta
 from io import StringIO
 
 import requests_cache
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from django.db import router
+from django.db import router, transaction
 
 from charity_django.ccew.models import (
     CharityAreaOfOperation,
@@ -22,6 +24,15 @@ DEFAULT_DATE_FORMAT = "%Y-%m-%d"
 
 class Command(BaseCommand):
     help = "Update Area of Operation Lookups"
+    lookup_url = "https://raw.githubusercontent.com/drkane/charity-lookups/refs/heads/master/cc-aoo-gss-iso-new.csv"
+    lookup_columns = {
+        # model field: CSV column
+        "gss": "GSS",
+        "iso3166_1": "ISO3166-1",
+        "iso3166_1_alpha3": "ISO3166-1:3",
+        "iso3166_2_gb": "ISO3166-2:GB",
+        "continent": "ContinentCode",
+    }
 
     def _get_db(self):
         return router.db_for_write(CharityAreaOfOperationLookup)
@@ -36,111 +47,140 @@ class Command(BaseCommand):
         parser.add_argument("--sample", type=int, default=0)
 
     def handle(self, *args, **options):
-        # fetch all existing area of operations
+        start = time.perf_counter()
+        db = self._get_db()
+
+        # fetch all the areas used by charities
         self.logger("Fetching existing Area of Operations")
-        areas = set(
-            list(
-                CharityAreaOfOperation.objects.values_list(
-                    "geographic_area_type", "geographic_area_description"
-                ).distinct()
+        charity_areas = set(
+            CharityAreaOfOperation.objects.values_list(
+                "geographic_area_type", "geographic_area_description"
+            ).distinct()
+        ) | set(
+            CharityAreaOfOperation.objects.filter(
+                parent_geographic_area_description__isnull=False
             )
-            + list(
-                CharityAreaOfOperation.objects.filter(
-                    parent_geographic_area_description__isnull=False
-                )
-                .values_list(
-                    "parent_geographic_area_type", "parent_geographic_area_description"
-                )
-                .distinct()
+            .values_list(
+                "parent_geographic_area_type", "parent_geographic_area_description"
             )
+            .distinct()
         )
-        existing_areas = CharityAreaOfOperationLookup.objects.values_list(
-            "geographic_area_type", "geographic_area_description"
-        ).distinct()
-        for area in areas:
-            if area not in existing_areas:
-                CharityAreaOfOperationLookup.objects.get_or_create(
-                    geographic_area_type=area[0],
-                    geographic_area_description=area[1],
-                )
-        self.logger(f"Found {len(areas)} existing Area of Operations")
+        self.logger(f"Found {len(charity_areas)} existing Area of Operations")
 
         # fetch lookups
         session = requests_cache.CachedSession(
             "demo_cache.sqlite",
             expire_after=timedelta(days=1),
         )
-        response = session.get(
-            "https://raw.githubusercontent.com/drkane/charity-lookups/refs/heads/master/cc-aoo-gss-iso-new.csv"
-        )
+        response = session.get(self.lookup_url)
         response.raise_for_status()
         self.logger("Fetched Area of Operations lookups from remote source")
 
-        # parse CSV
-        csv_data = StringIO(response.content.decode("utf-8-sig"))
-        reader = csv.DictReader(csv_data)
+        # parse CSV into the rows we want for each area
         self.logger("Parsing Area of Operations lookups")
+        csv_data = StringIO(response.content.decode("utf-8-sig"))
+        desired = defaultdict(list)
+        for row in csv.DictReader(csv_data):
+            if not row["geographic_area_description"]:
+                continue
+            key = (
+                row["geographic_area_type"].strip(),
+                row["geographic_area_description"].strip(),
+            )
+            desired[key].append(
+                {
+                    field: (row.get(column) or "").strip() or None
+                    for field, column in self.lookup_columns.items()
+                }
+            )
+
+        # existing lookups, fetched in one query
+        existing = defaultdict(list)
+        for lookup in CharityAreaOfOperationLookup.objects.using(db).all():
+            existing[
+                (lookup.geographic_area_type, lookup.geographic_area_description)
+            ].append(lookup)
+
         results = {
             "total": 0,
             "created": 0,
             "updated": 0,
-            "errors": 0,
+            "unchanged": 0,
+            "deleted": 0,
         }
-        areas = defaultdict(list)
-        for row in reader:
-            if not row["geographic_area_description"]:
+        to_create = []
+        to_update = []
+        to_delete = []
+        for area, rows in desired.items():
+            results["total"] += len(rows)
+            current = existing.get(area, [])
+            if len(rows) == 1 and len(current) == 1:
+                lookup = current[0]
+                if all(getattr(lookup, f) == v for f, v in rows[0].items()):
+                    results["unchanged"] += 1
+                    continue
+                for field, value in rows[0].items():
+                    setattr(lookup, field, value)
+                to_update.append(lookup)
+                continue
+            if Counter(self._lookup_values(lookup) for lookup in current) == Counter(
+                tuple(row.values()) for row in rows
+            ):
+                results["unchanged"] += len(rows)
                 continue
-            areas[
-                (row["geographic_area_type"], row["geographic_area_description"])
-            ].append(row)
-
-        for area_info, rows in areas.items():
             if len(rows) > 1:
                 self.logger(
-                    f"Warning: Multiple rows found for area '{area_info[1]}'. "
+                    f"Warning: Multiple rows found for area '{area[1]}'. "
                     "Deleting rather than updating.",
                     error=True,
                 )
-                CharityAreaOfOperationLookup.objects.filter(
-                    geographic_area_type=area_info[0].strip(),
-                    geographic_area_description=area_info[1].strip(),
-                ).delete()
-                for row in rows:
-                    area = CharityAreaOfOperationLookup.objects.create(
-                        geographic_area_type=area_info[0].strip(),
-                        geographic_area_description=area_info[1].strip(),
-                        gss=row.get("GSS", "").strip() or None,
-                        iso3166_1=row.get("ISO3166-1", "").strip() or None,
-                        iso3166_1_alpha3=row.get("ISO3166-1:3", "").strip() or None,
-                        iso3166_2_gb=row.get("ISO3166-2:GB", "").strip() or None,
-                        continent=row.get("ContinentCode", "").strip() or None,
-                    )
-                    results["created"] += 1
-                    results["total"] += 1
+            # replace all the lookups for this area
+            to_delete.extend(lookup.pk for lookup in current)
+            to_create.extend(
+                CharityAreaOfOperationLookup(
+                    geographic_area_type=area[0],
+                    geographic_area_description=area[1],
+                    **row,
+                )
+                for row in rows
+            )
+
+        # areas used by charities that aren't in the lookup yet
+        for area in charity_areas:
+            if area in desired or area in existing:
                 continue
-            row = rows[0]
-            area, created = CharityAreaOfOperationLookup.objects.update_or_create(
-                geographic_area_type=area_info[0].strip(),
-                geographic_area_description=area_info[1].strip(),
-                defaults={
-                    "gss": row.get("GSS", "").strip() or None,
-                    "iso3166_1": row.get("ISO3166-1", "").strip() or None,
-                    "iso3166_1_alpha3": row.get("ISO3166-1:3", "").strip() or None,
-                    "iso3166_2_gb": row.get("ISO3166-2:GB", "").strip() or None,
-                    "continent": row.get("ContinentCode", "").strip() or None,
-                },
+            to_create.append(
+                CharityAreaOfOperationLookup(
+                    geographic_area_type=area[0],
+                    geographic_area_description=area[1],
+                )
+            )
+
+        with transaction.atomic(using=db):
+            if to_delete:
+                results["deleted"], _ = (
+                    CharityAreaOfOperationLookup.objects.using(db)
+                    .filter(pk__in=to_delete)
+                    .delete()
+                )
+            CharityAreaOfOperationLookup.objects.using(db).bulk_create(
+                to_create, batch_size=1_000
             )
-            if created:
-                results["created"] += 1
-            else:
-                results["updated"] += 1
-            results["total"] += 1
+            CharityAreaOfOperationLookup.objects.using(db).bulk_update(
+                to_update, list(self.lookup_columns.keys()), batch_size=1_000
+            )
+        results["created"] = len(to_create)
+        results["updated"] = len(to_update)
+        self.results = results
+
         self.logger(
             f"Processed {results['total']} Area of Operations lookups: "
-            f"{results['created']} created, {results['updated']} updated"
+            f"{results['created']} created, {results['updated']} updated, "
+            f"{results['deleted']} deleted, {results['unchanged']} unchanged "
+            f"in {time.perf_counter() - start:.2f} seconds"
         )
 
-        for area in CharityAreaOfOperationLookup.objects.filter(
+        for area in CharityAreaOfOperationLookup.objects.using(db).filter(
             gss__isnull=True,
             iso3166_1__isnull=True,
             iso3166_1_alpha3__isnull=True,
@@ -151,3 +191,9 @@ class Command(BaseCommand):
                 f"Area of Operation {area.geographic_area_description} has no GSS or ISO codes",
                 error=True,
             )
+
+        # rebuild the links between charities and area codes
+        call_command("update_aoo_geocodes")
+
+    def _lookup_values(self, lookup):
+        return tuple(getattr(lookup, field) for field in self.lookup_columns)
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ccew", "0010_charityareaofoperationlookup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="charity",
+            name="display_name",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text="The Main Name of the Charity in title case, used for display and sorting",
+                max_length=255,
+                null=True,
+                verbose_name="Name",
+            ),
+        ),
+    ]
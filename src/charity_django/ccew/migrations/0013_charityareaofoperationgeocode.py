@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ccew", "0012_charity_normalised_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CharityAreaOfOperationGeoCode",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "gss",
+                    models.CharField(
+                        db_index=True,
+                        help_text="The code for an area the charity operates in, or an area containing it",
+                        max_length=9,
+                        verbose_name="GSS code",
+                    ),
+                ),
+                (
+                    "level",
+                    models.PositiveSmallIntegerField(
+                        default=0,
+                        help_text="0 if the charity lists this area itself, 1 for the area's parent, 2 for its grandparent, etc",
+                    ),
+                ),
+                (
+                    "charity",
+                    models.ForeignKey(
+                        db_column="organisation_number",
+                        db_constraint=False,
+                        help_text="The organisation number for the charity. This is the index value for the charity.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="area_of_operation_geocodes",
+                        to="ccew.charity",
+                        to_field="organisation_number",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Area of Operation GSS code",
+                "verbose_name_plural": "Area of Operation GSS codes",
+                "unique_together": {("charity", "gss")},
+            },
+        ),
+    ]
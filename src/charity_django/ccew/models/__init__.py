@@ -4,6 +4,7 @@ from .charity_ar_parta import CharityARPartA
 from .charity_ar_partb import CharityARPartB
 from .charity_area_of_operation import (
     CharityAreaOfOperation,
+    CharityAreaOfOperationGeoCode,
     CharityAreaOfOperationLookup,
 )
 from .charity_classification import CharityClassification
@@ -20,6 +21,7 @@ __all__ = (
     Charity,
     CharityAnnualReturnHistory,
     CharityAreaOfOperation,
+    CharityAreaOfOperationGeoCode,
     CharityAreaOfOperationLookup,
     CharityARPartA,
     CharityARPartB,
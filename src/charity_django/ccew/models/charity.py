@@ -1,6 +1,8 @@
 from django.db import models
 
-from charity_django.utils.text import to_titlecase
+from charity_django.utils.geography import PostcodeGeography
+from charity_django.utils.search import NameSearchQuerySet
+from charity_django.utils.text import normalise_name, to_titlecase
 
 from .choices import (
     CharityIsCDFOrCIF,
@@ -12,7 +14,7 @@ from .choices import (
 )
 
 
-class Charity(models.Model):
+class Charity(PostcodeGeography, models.Model):
     date_of_extract = models.DateField(
         null=True,
         blank=True,
@@ -38,6 +40,24 @@ class Charity(models.Model):
         db_index=True,
         help_text="The Main Name of the Charity",
     )
+    display_name = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Name",
+        help_text="The Main Name of the Charity in title case, used for display and sorting",
+    )
+    normalised_name = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Normalised name",
+        help_text="The Main Name of the Charity with case, punctuation and common words removed, used for searching",
+    )
     charity_type = models.CharField(
         max_length=255,
         null=True,
@@ -178,19 +198,26 @@ class Charity(models.Model):
         help_text="Indicates whether the charity owns or leases any land or buildings. True, False, NULL (not known)",
     )
 
+    objects = NameSearchQuerySet.as_manager()
+
     def __str__(self):
         """Return a string representation of the model"""
         return "{} [{}{}]".format(
-            to_titlecase(self.charity_name),
+            self.name,
             self.registered_charity_number,
             "-{}".format(self.linked_charity_number)
             if self.linked_charity_number
             else "",
         )
 
+    def save(self, *args, **kwargs):
+        self.display_name = to_titlecase(self.charity_name)
+        self.normalised_name = normalise_name(self.charity_name)
+        super().save(*args, **kwargs)
+
     @property
     def name(self):
-        return to_titlecase(self.charity_name)
+        return self.display_name or to_titlecase(self.charity_name)
 
     @property
     def org_id(self):
@@ -347,10 +374,17 @@ class Charity(models.Model):
             )
 
         # event history
-        for s in self.event_history.filter(assoc_organisation_number__isnull=False):
-            assoc_charity = Charity.objects.filter(
-                organisation_number=s.assoc_organisation_number
-            ).first()
+        events = [
+            s
+            for s in self.event_history.all()
+            if s.assoc_organisation_number is not None
+        ]
+        assoc_charities = Charity.objects.in_bulk(
+            {s.assoc_organisation_number for s in events},
+            field_name="organisation_number",
+        )
+        for s in events:
+            assoc_charity = assoc_charities.get(s.assoc_organisation_number)
             if not assoc_charity:
                 continue
             yield (
@@ -94,3 +94,47 @@ class CharityAreaOfOperationLookup(models.Model):
         blank=True,
         help_text="The continent for the area, if applicable",
     )
+
+
+class CharityAreaOfOperationGeoCodeQuerySet(models.QuerySet):
+    def count_by_area(self):
+        """
+        Count the charities operating in each area, in a single aggregate query.
+        """
+        return (
+            self.values("gss")
+            .annotate(charities=models.Count("charity_id"))
+            .order_by("gss")
+        )
+
+
+class CharityAreaOfOperationGeoCode(models.Model):
+    charity = models.ForeignKey(
+        Charity,
+        db_column="organisation_number",
+        to_field="organisation_number",
+        on_delete=models.CASCADE,
+        help_text="The organisation number for the charity. This is the index value for the charity.",
+        related_name="area_of_operation_geocodes",
+        db_constraint=False,
+    )
+    gss = models.CharField(
+        max_length=9,
+        db_index=True,
+        verbose_name="GSS code",
+        help_text="The code for an area the charity operates in, or an area containing it",
+    )
+    level = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="0 if the charity lists this area itself, 1 for the area's parent, 2 for its grandparent, etc",
+    )
+
+    objects = CharityAreaOfOperationGeoCodeQuerySet.as_manager()
+
+    def __str__(self):
+        return "{} - {}".format(self.charity_id, self.gss)
+
+    class Meta:
+        verbose_name = "Area of Operation GSS code"
+        verbose_name_plural = "Area of Operation GSS codes"
+        unique_together = [("charity", "gss")]
@@ -0,0 +1,74 @@
+from django.db import router
+
+from charity_django.ccew.models import Charity
+
+# linked charity numbers are packed into the low bits of the lookup key
+SUBNO_BITS = 20
+
+
+def _key(regno, subno):
+    return (regno << SUBNO_BITS) | subno
+
+
+class CharityResolver:
+    """
+    Resolve CCEW charity numbers to the primary key of the matching `Charity`.
+
+    The numbers for the whole register are loaded in a single query the first
+    time they're needed, and held as a dict of ints, so resolving a number
+    doesn't touch the database.
+    """
+
+    def __init__(self, using=None):
+        self.using = using or router.db_for_read(Charity)
+        self._by_number = None
+        self._by_organisation_number = None
+
+    def load(self):
+        self._by_number = {}
+        self._by_organisation_number = {}
+        for pk, organisation_number, regno, subno in (
+            Charity.objects.using(self.using)
+            .values_list(
+                "pk",
+                "organisation_number",
+                "registered_charity_number",
+                "linked_charity_number",
+            )
+            .iterator(chunk_size=10_000)
+        ):
+            self._by_number[_key(regno, subno or 0)] = pk
+            self._by_organisation_number[organisation_number] = pk
+        return self
+
+    def __len__(self):
+        if self._by_number is None:
+            self.load()
+        return len(self._by_number)
+
+    def resolve(self, regno, subno=0):
+        """
+        Get the primary key for a registered charity number and linked charity number.
+
+        If there's no matching charity then `regno` is tried as an
+        organisation number instead. Returns None if no charity is found.
+        """
+        if self._by_number is None:
+            self.load()
+        try:
+            regno = int(regno)
+            subno = int(subno or 0)
+        except (TypeError, ValueError):
+            return None
+        if regno < 0 or subno < 0 or subno >= (1 << SUBNO_BITS):
+            return self._by_organisation_number.get(regno)
+        pk = self._by_number.get(_key(regno, subno))
+        if pk is None:
+            pk = self._by_organisation_number.get(regno)
+        return pk
+
+    def resolve_many(self, numbers):
+        """
+        Resolve a list of (regno, subno) tuples, returning the primary keys in the same order.
+        """
+        return [self.resolve(regno, subno) for regno, subno in numbers]
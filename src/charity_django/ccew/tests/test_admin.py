@@ -0,0 +1,110 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from charity_django.ccew.models import (
+    Charity,
+    CharityAnnualReturnHistory,
+    CharityAreaOfOperation,
+    CharityClassification,
+    CharityEventHistory,
+    CharityGoverningDocument,
+    CharityOtherNames,
+    CharityOtherRegulators,
+    CharityPolicy,
+    CharityPublishedReport,
+    CharityTrustee,
+    Merger,
+)
+from charity_django.ccew.models.choices import ClassificationType
+
+
+class CharityAdminTestCase(TestCase):
+    # the number of related rows shouldn't change the number of queries
+    query_budget = 20
+
+    def create_charity(self, organisation_number, related_rows):
+        charity = Charity.objects.create(
+            organisation_number=organisation_number,
+            registered_charity_number=organisation_number,
+            linked_charity_number=0,
+            charity_name=f"Test Charity {organisation_number}",
+        )
+        numbers = {
+            "charity": charity,
+            "registered_charity_number": organisation_number,
+        }
+        for i in range(related_rows):
+            CharityTrustee.objects.create(
+                **numbers,
+                linked_charity_number=0,
+                trustee_name=f"Trustee {i}",
+                trustee_is_chair=i == 0,
+            )
+            CharityPolicy.objects.create(
+                **numbers, linked_charity_number=0, policy_name=f"Policy {i}"
+            )
+            CharityOtherNames.objects.create(**numbers, charity_name=f"Other {i}")
+            CharityOtherRegulators.objects.create(
+                **numbers, regulator_name=f"Regulator {i}"
+            )
+            CharityPublishedReport.objects.create(**numbers, report_name=f"Report {i}")
+            for classification_type in ClassificationType:
+                CharityClassification.objects.create(
+                    **numbers,
+                    classification_type=classification_type,
+                    classification_description=f"{classification_type.label} {i}",
+                )
+            CharityAreaOfOperation.objects.create(
+                **numbers,
+                geographic_area_type="Local Authority",
+                geographic_area_description=f"Area {i}",
+            )
+            CharityAnnualReturnHistory.objects.create(
+                **numbers,
+                fin_period_end_date=datetime.date(2020 - i, 3, 31),
+            )
+            other = Charity.objects.create(
+                organisation_number=organisation_number * 100 + i,
+                registered_charity_number=organisation_number * 100 + i,
+                linked_charity_number=0,
+                charity_name=f"Related Charity {i}",
+            )
+            CharityEventHistory.objects.create(
+                **numbers,
+                event_type="Asset transfer in",
+                assoc_organisation_number=other.organisation_number,
+                date_of_event=datetime.date(2020, 1, 1),
+            )
+            Merger.objects.create(transferor=charity, transferee=other)
+            Merger.objects.create(transferor=other, transferee=charity)
+        CharityGoverningDocument.objects.create(
+            **numbers, governing_document_description="Trust deed"
+        )
+        return charity
+
+    def get_change_page_queries(self, charity):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("admin:ccew_charity_change", args=(charity.pk,))
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Trustee 0 (Chair)")
+        self.assertContains(response, "Related Charity 0")
+        return len(queries)
+
+    def test_change_view_queries(self):
+        self.client.force_login(User.objects.create_superuser("admin"))
+        charity_few = self.create_charity(1, 1)
+        charity_many = self.create_charity(2, 5)
+        # the first request caches content types
+        self.get_change_page_queries(charity_few)
+
+        few = self.get_change_page_queries(charity_few)
+        many = self.get_change_page_queries(charity_many)
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, self.query_budget)
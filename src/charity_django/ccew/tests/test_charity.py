@@ -29,6 +29,21 @@ class CharityTestCase(TestCase):
         )
         self.assertEqual(str(charity), "Test Charity [123-1]")
 
+    def test_charity_display_name(self):
+        charity = Charity.objects.create(
+            organisation_number=123,
+            registered_charity_number=123,
+            linked_charity_number=0,
+            charity_name="THE TEST CHARITY OF LONDON",
+        )
+        self.assertEqual(charity.display_name, "The Test Charity of London")
+        self.assertEqual(charity.name, "The Test Charity of London")
+
+        charity.charity_name = "ANOTHER TEST CHARITY"
+        charity.save()
+        charity.refresh_from_db()
+        self.assertEqual(charity.display_name, "Another Test Charity")
+
     def test_charity_orgid(self):
         charity = Charity.objects.create(
             organisation_number=123,
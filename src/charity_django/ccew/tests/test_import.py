@@ -9,6 +9,7 @@ from django.test import TestCase
 
 from charity_django.ccew.management.commands.import_ccew import Command as CCEWCommand
 from charity_django.ccew.models import Charity
+from charity_django.utils.text import normalise_name, to_titlecase
 
 
 class MockSession(requests.Session):
@@ -64,6 +65,18 @@ class ImportTestCase(TestCase):
                 == "Howard’s land Religion Charitable Incorporated Organisation"
             )
 
+    def test_charity_import_display_name(self):
+        command = CCEWCommand()
+        command.stdout = sys.stdout
+
+        with requests_mock.Mocker() as m:
+            self._mock_csv_downloads(m)
+            command.handle()
+            assert not Charity.objects.filter(display_name__isnull=True).exists()
+            for charity in Charity.objects.all()[:50]:
+                assert charity.display_name == to_titlecase(charity.charity_name)
+                assert charity.normalised_name == normalise_name(charity.charity_name)
+
     def test_charity_import_twice(self):
         command = CCEWCommand()
         command.stdout = sys.stdout
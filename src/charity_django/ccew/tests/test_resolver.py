@@ -0,0 +1,61 @@
+from django.test import TestCase
+
+from charity_django.ccew.management.commands.import_mergers import (
+    Command as MergersCommand,
+)
+from charity_django.ccew.models import Charity
+from charity_django.ccew.resolver import CharityResolver
+
+
+class CharityResolverTestCase(TestCase):
+    def setUp(self):
+        self.main = Charity.objects.create(
+            organisation_number=1,
+            registered_charity_number=1000001,
+            linked_charity_number=0,
+            charity_name="Main Charity",
+        )
+        self.linked = Charity.objects.create(
+            organisation_number=2,
+            registered_charity_number=1000001,
+            linked_charity_number=3,
+            charity_name="Linked Charity",
+        )
+        self.other = Charity.objects.create(
+            organisation_number=5000001,
+            registered_charity_number=200001,
+            linked_charity_number=0,
+            charity_name="Other Charity",
+        )
+
+    def test_resolve(self):
+        with self.assertNumQueries(1):
+            resolver = CharityResolver().load()
+            self.assertEqual(resolver.resolve(1000001, 0), self.main.pk)
+            self.assertEqual(resolver.resolve("1000001", "3"), self.linked.pk)
+            self.assertEqual(resolver.resolve(1000001), self.main.pk)
+            # falls back to the organisation number
+            self.assertEqual(resolver.resolve(5000001, 0), self.other.pk)
+            self.assertIsNone(resolver.resolve(9999999, 0))
+            self.assertIsNone(resolver.resolve("not a number", 0))
+            self.assertEqual(
+                resolver.resolve_many([(200001, 0), (1000001, 3), (9, 1)]),
+                [self.other.pk, self.linked.pk, None],
+            )
+        self.assertEqual(len(resolver), 3)
+
+    def test_merger_charity_numbers(self):
+        command = MergersCommand()
+        command.resolver = CharityResolver().load()
+        with self.assertNumQueries(0):
+            row = command.get_charity_numbers(
+                {
+                    "transferor_name": "Linked Charity (1000001-3)",
+                    "transferee_name": "Other Charity (200001)",
+                }
+            )
+        self.assertEqual(row["transferor_name"], "Linked Charity")
+        self.assertEqual(row["transferor_regno"], "1000001")
+        self.assertEqual(row["transferor_subno"], 3)
+        self.assertEqual(row["transferor_id"], self.linked.pk)
+        self.assertEqual(row["transferee_id"], self.other.pk)
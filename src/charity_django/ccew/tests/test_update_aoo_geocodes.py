@@ -0,0 +1,91 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from charity_django.ccew.models import (
+    Charity,
+    CharityAreaOfOperation,
+    CharityAreaOfOperationGeoCode,
+    CharityAreaOfOperationLookup,
+)
+from charity_django.postcodes.models import GeoCode
+
+
+class UpdateAOOGeoCodesTestCase(TestCase):
+    def setUp(self):
+        areas = {
+            1: ["Leeds City", "Bradford City"],
+            2: ["Leeds City"],
+            3: ["Narnia"],
+        }
+        for organisation_number, descriptions in areas.items():
+            Charity.objects.create(
+                organisation_number=organisation_number,
+                registered_charity_number=organisation_number,
+                linked_charity_number=0,
+                charity_name=f"Test Charity {organisation_number}",
+            )
+            for description in descriptions:
+                CharityAreaOfOperation.objects.create(
+                    charity_id=organisation_number,
+                    registered_charity_number=organisation_number,
+                    linked_charity_number=0,
+                    geographic_area_type="Local Authority",
+                    geographic_area_description=description,
+                )
+        for description, gss in [
+            ("Leeds City", "E08000035"),
+            ("Bradford City", "E08000032"),
+            ("Narnia", None),
+        ]:
+            CharityAreaOfOperationLookup.objects.create(
+                geographic_area_type="Local Authority",
+                geographic_area_description=description,
+                gss=gss,
+            )
+        for code, parent in [
+            ("E08000035", "E12000003"),
+            ("E08000032", "E12000003"),
+            ("E12000003", "E92000001"),
+            ("E92000001", None),
+        ]:
+            GeoCode.objects.create(GEOGCD=code, PARENTCD=parent)
+
+    def test_update_aoo_geocodes(self):
+        call_command("update_aoo_geocodes")
+
+        self.assertEqual(
+            dict(
+                CharityAreaOfOperationGeoCode.objects.filter(charity_id=1).values_list(
+                    "gss", "level"
+                )
+            ),
+            {
+                "E08000035": 0,
+                "E08000032": 0,
+                "E12000003": 1,
+                "E92000001": 2,
+            },
+        )
+        self.assertFalse(
+            CharityAreaOfOperationGeoCode.objects.filter(charity_id=3).exists()
+        )
+
+        with self.assertNumQueries(1):
+            counts = {
+                row["gss"]: row["charities"]
+                for row in CharityAreaOfOperationGeoCode.objects.count_by_area()
+            }
+        self.assertEqual(
+            counts,
+            {
+                "E08000032": 1,
+                "E08000035": 2,
+                "E12000003": 2,
+                "E92000001": 2,
+            },
+        )
+
+    def test_update_aoo_geocodes_twice(self):
+        call_command("update_aoo_geocodes")
+        call_command("update_aoo_geocodes")
+        self.assertEqual(CharityAreaOfOperationGeoCode.objects.count(), 7)
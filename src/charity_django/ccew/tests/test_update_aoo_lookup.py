@@ -0,0 +1,120 @@
+import unittest.mock
+
+import pytest
+import requests
+import requests_mock
+from django.test import TestCase
+
+from charity_django.ccew.management.commands.update_aoo_lookup import (
+    Command as AOOLookupCommand,
+)
+from charity_django.ccew.models import (
+    Charity,
+    CharityAreaOfOperation,
+    CharityAreaOfOperationLookup,
+)
+
+LOOKUP_CSV = """geographic_area_type,geographic_area_description,GSS,ISO3166-1,ISO3166-1:3,ISO3166-2:GB,ContinentCode
+Local Authority,Leeds City,E08000035,GB,GBR,GB-LDS,EU
+Local Authority,Bristol City,E06000023,GB,GBR,GB-BST,EU
+Country,Atlantis,,,,,
+Country,Sealand,,XS,,,EU
+Country,Sealand,,XT,,,EU
+"""
+
+
+class MockSession(requests.Session):
+    def __init__(self, *args, **kwargs):
+        kwargs.pop("expire_after", None)
+        super().__init__(*[], **kwargs)
+
+
+@pytest.fixture(scope="function", autouse=True)
+def disable_requests_cache():
+    """Replace CachedSession with a regular Session for all test functions"""
+    with unittest.mock.patch("requests_cache.CachedSession", MockSession):
+        yield
+
+
+class UpdateAOOLookupTestCase(TestCase):
+    def setUp(self):
+        Charity.objects.create(
+            organisation_number=1,
+            registered_charity_number=1,
+            linked_charity_number=0,
+            charity_name="Test Charity",
+        )
+        for area_type, area, parent in [
+            ("Local Authority", "Leeds City", None),
+            ("Country", "Narnia", "Europe"),
+        ]:
+            CharityAreaOfOperation.objects.create(
+                charity_id=1,
+                registered_charity_number=1,
+                linked_charity_number=0,
+                geographic_area_type=area_type,
+                geographic_area_description=area,
+                parent_geographic_area_type="Continent" if parent else None,
+                parent_geographic_area_description=parent,
+            )
+        CharityAreaOfOperationLookup.objects.create(
+            geographic_area_type="Local Authority",
+            geographic_area_description="Bristol City",
+            gss="E00000000",
+        )
+
+    def run_command(self):
+        command = AOOLookupCommand()
+        with requests_mock.Mocker() as m:
+            m.get(AOOLookupCommand.lookup_url, text=LOOKUP_CSV)
+            command.handle()
+        return command.results
+
+    def test_update_aoo_lookup(self):
+        results = self.run_command()
+        self.assertEqual(results["total"], 5)
+        self.assertEqual(results["updated"], 1)
+        # Leeds, Atlantis, two rows for Sealand, Narnia, Europe
+        self.assertEqual(results["created"], 6)
+
+        bristol = CharityAreaOfOperationLookup.objects.get(
+            geographic_area_description="Bristol City"
+        )
+        self.assertEqual(bristol.gss, "E06000023")
+        self.assertEqual(bristol.iso3166_2_gb, "GB-BST")
+
+        narnia = CharityAreaOfOperationLookup.objects.get(
+            geographic_area_description="Narnia"
+        )
+        self.assertEqual(narnia.iso3166_1, "GB")
+        self.assertIsNone(narnia.gss)
+        self.assertTrue(
+            CharityAreaOfOperationLookup.objects.filter(
+                geographic_area_type="Continent", geographic_area_description="Europe"
+            ).exists()
+        )
+        self.assertEqual(
+            set(
+                CharityAreaOfOperationLookup.objects.filter(
+                    geographic_area_description="Sealand"
+                ).values_list("iso3166_1", flat=True)
+            ),
+            {"XS", "XT"},
+        )
+
+    def test_update_aoo_lookup_twice(self):
+        self.run_command()
+        count = CharityAreaOfOperationLookup.objects.count()
+        with (
+            unittest.mock.patch(
+                "charity_django.ccew.management.commands.update_aoo_lookup.call_command"
+            ) as mock_call_command,
+            self.assertNumQueries(6),
+        ):
+            results = self.run_command()
+        mock_call_command.assert_called_once_with("update_aoo_geocodes")
+        self.assertEqual(CharityAreaOfOperationLookup.objects.count(), count)
+        self.assertEqual(results["created"], 0)
+        self.assertEqual(results["updated"], 0)
+        self.assertEqual(results["deleted"], 0)
+        self.assertEqual(results["unchanged"], 5)
@@ -2,20 +2,20 @@ from django.contrib import admin
 from django.utils.html import format_html_join
 
 from charity_django.ccni.models import Charity
-from charity_django.utils.admin import CharitySizeListFilter
+from charity_django.utils.admin import CharitySizeListFilter, NameSearchMixin
 
 
 class CCNICharitySizeListFilter(CharitySizeListFilter):
     recent_income_field = "total_income"
 
 
-class CharityAdmin(admin.ModelAdmin):
+class CharityAdmin(NameSearchMixin, admin.ModelAdmin):
     list_display = (
-        "charity_name",
+        "display_name",
         "reg_charity_number",
         "status",
     )
-    list_display_links = ("charity_name",)
+    list_display_links = ("display_name",)
     list_filter = (
         "status",
         CCNICharitySizeListFilter,
@@ -25,6 +25,7 @@ class CharityAdmin(admin.ModelAdmin):
         "charity_name",
         "reg_charity_number",
     )
+    name_search_id_fields = ("reg_charity_number",)
     readonly_fields = (
         "org_id",
         "what_the_charity_does",
@@ -2,28 +2,78 @@ import csv
 import io
 import logging
 import random
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-import psycopg2.extras
 import requests
 import requests_cache
+from django.apps import apps
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.db import connections, router, transaction
-from django.utils.text import slugify
 
 from charity_django.ccni.models import (
     Charity,
     CharityClassification,
     ClassificationTypes,
 )
+from charity_django.utils.bulk import (
+    BulkWriter,
+    add_bulk_session_argument,
+    import_session,
+)
+from charity_django.utils.maintenance import add_analyze_arguments, analyze_tables
+from charity_django.utils.rows import RowTransformer, date_parser
+from charity_django.utils.text import normalise_name_many, to_titlecase_many
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+date_fields = [
+    ("date_registered", "%d/%m/%Y"),
+    ("date_for_financial_year_ending", "%d %B %Y"),
+    ("financial_period_start", "%d %B %Y"),
+    ("financial_period_end", "%d %B %Y"),
+]
+int_fields = [
+    "reg_charity_number",
+    "sub_charity_number",
+    "total_income",
+    "total_spending",
+    "charitable_spending",
+    "income_generation_and_governance",
+    "retained_for_future_use",
+    "total_income_previous_financial_period",
+    "employed_staff",
+    "uk_and_ireland_volunteers",
+    "income_from_donations_and_legacies",
+    "income_from_charitable_activities",
+    "income_from_other_trading_activities",
+    "income_from_investments",
+    "income_from_other",
+    "total_income_and_endowments",
+    "expenditure_on_raising_funds",
+    "expenditure_on_charitable_activities",
+    "expenditure_on_governance",
+    "expenditure_on_other",
+    "total_expenditure",
+    "assets_and_liabilities_total_fixed_assets",
+    "total_net_assets_and_liabilities",
+]
+array_fields = [
+    "what_the_charity_does",
+    "who_the_charity_helps",
+    "how_the_charity_works",
+]
+
+
+def split_list(value):
+    return value.split(",")
+
 
 class Command(BaseCommand):
     help = "Import CCNI data from a zip file"
     page_size = 10_000
+    bulk_session = False
 
     base_url = "https://www.charitycommissionni.org.uk/umbraco/api/charityApi/ExportSearchResultsToCsv/?include=Linked&include=Removed"
 
@@ -41,6 +91,8 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--sample", type=int, default=0)
+        add_analyze_arguments(parser)
+        add_bulk_session_argument(parser)
 
     def handle(self, *args, **options):
         self.session = requests_cache.CachedSession(
@@ -48,11 +100,25 @@ class Command(BaseCommand):
             expire_after=timedelta(days=1),
         )
         self.sample = options.get("sample")
+        self.bulk_session = options.get("bulk_session")
 
         self.charities = []
         self.charity_classification = set()
 
-        self.fetch_file()
+        with import_session(self._get_db(), enabled=self.bulk_session):
+            self.fetch_file()
+
+        if options.get("analyze", True):
+            tables = [Charity, CharityClassification]
+            analyze_tables(
+                tables,
+                using=self._get_db(),
+                vacuum=tables if options.get("vacuum") else (),
+            )
+
+        # rebuild the summary tables
+        if apps.is_installed("charity_django.utils"):
+            call_command("update_charity_aggregates", register=["ccni"])
 
     def fetch_file(self):
         self.files = {}
@@ -63,66 +129,27 @@ class Command(BaseCommand):
         r.raise_for_status()
 
         file = io.StringIO(r.content.decode("latin1"))
-        reader = csv.DictReader(file)
-        for k, row in enumerate(reader):
-            self.add_charity(row)
+        reader = csv.reader(file)
+        transform = self.get_row_transformer(next(reader, []))
+        for row in reader:
+            if row:
+                self.add_charity(transform(row))
         self.save_charities()
 
-    def add_charity(self, record):
-        record = {
-            slugify(k).replace("-", "_").replace("__", "_").replace("__", "_"): (
-                v if v != "" else None
-            )
-            for k, v in record.items()
-            if k
-        }
-
-        # date fields
-        for k, format_ in [
-            ("date_registered", "%d/%m/%Y"),
-            ("date_for_financial_year_ending", "%d %B %Y"),
-            ("financial_period_start", "%d %B %Y"),
-            ("financial_period_end", "%d %B %Y"),
-        ]:
-            if record.get(k):
-                record[k] = datetime.strptime(record[k], format_).date()
-
-        # int fields
-        for k in [
-            "reg_charity_number",
-            "sub_charity_number",
-            "total_income",
-            "total_spending",
-            "charitable_spending",
-            "income_generation_and_governance",
-            "retained_for_future_use",
-            "total_income_previous_financial_period",
-            "employed_staff",
-            "uk_and_ireland_volunteers",
-            "income_from_donations_and_legacies",
-            "income_from_charitable_activities",
-            "income_from_other_trading_activities",
-            "income_from_investments",
-            "income_from_other",
-            "total_income_and_endowments",
-            "expenditure_on_raising_funds",
-            "expenditure_on_charitable_activities",
-            "expenditure_on_governance",
-            "expenditure_on_other",
-            "total_expenditure",
-            "assets_and_liabilities_total_fixed_assets",
-            "total_net_assets_and_liabilities",
-        ]:
-            if record.get(k) is not None:
-                record[k] = int(record[k])
+    def get_row_transformer(self, headers):
+        return RowTransformer(
+            headers,
+            converters={
+                **{k: date_parser(format_) for k, format_ in date_fields},
+                **{k: int for k in int_fields},
+                **{k: split_list for k in array_fields},
+            },
+        )
 
+    def add_charity(self, record):
         # array fields
-        for k in [
-            "what_the_charity_does",
-            "who_the_charity_helps",
-            "how_the_charity_works",
-        ]:
-            record[k] = record.get(k, "").split(",")
+        for k in array_fields:
+            record[k] = record.get(k) or []
             for classification_record in record[k]:
                 if classification_record.strip():
                     self.charity_classification.add(
@@ -144,25 +171,9 @@ class Command(BaseCommand):
             record["website"] = "http://" + record["website"]
         self.charities.append(record)
 
-    def _execute_many(self, cursor, statement, values):
-        connection = self._get_connection()
-        if connection.vendor == "postgresql":
-            psycopg2.extras.execute_values(
-                cursor,
-                statement,
-                values,
-                page_size=self.page_size,
-            )
-        else:
-            cursor.executemany(
-                statement,
-                values,
-            )
-
     def save_charities(self):
         db = self._get_db()
-        connection = connections[db]
-        with connection.cursor() as cursor, transaction.atomic(using=db):
+        with transaction.atomic(using=db):
             if self.sample:
                 self.logger("Sampling {:,.0f} charities".format(self.sample))
                 self.logger(
@@ -175,6 +186,16 @@ class Command(BaseCommand):
                 )
                 self.logger("Sampled {:,.0f} charities".format(len(self.charities)))
 
+            # add display and normalised names
+            names = [c["charity_name"] for c in self.charities]
+            for record, display_name, normalised_name in zip(
+                self.charities,
+                to_titlecase_many(names),
+                normalise_name_many(names),
+            ):
+                record["display_name"] = display_name
+                record["normalised_name"] = normalised_name
+
             for object in [Charity, CharityClassification]:
                 # delete existing charities
                 self.logger(
@@ -204,13 +225,12 @@ class Command(BaseCommand):
                         raise
 
                 # insert new charities
-                statement = """INSERT INTO "{table}" ("{fields}") VALUES {placeholder};""".format(
-                    table=object._meta.db_table,
-                    fields='", "'.join(fields),
-                    placeholder="(" + ", ".join(["%s" for f in fields]) + ")"
-                    if connection.vendor == "sqlite"
-                    else "%s",
-                )
-
-                self._execute_many(cursor, statement, values)
-                self.logger("Finished table insert [{}]".format(object._meta.db_table))
+                with BulkWriter(
+                    object,
+                    fields,
+                    using=db,
+                    batch_size=self.page_size,
+                    staged=self.bulk_session,
+                ) as writer:
+                    writer.write(values)
+                self.logger(writer.summary())
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ccni", "0005_alter_charityclassification_charity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="charity",
+            name="display_name",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=255,
+                null=True,
+                verbose_name="Name",
+            ),
+        ),
+    ]
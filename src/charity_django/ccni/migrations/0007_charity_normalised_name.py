@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:43
+
+from django.db import migrations, models
+
+import charity_django.utils.search
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ccni", "0006_charity_display_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="charity",
+            name="normalised_name",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=255,
+                null=True,
+                verbose_name="Normalised name",
+            ),
+        ),
+        charity_django.utils.search.AddTrigramIndex(
+            model_name="charity",
+            field_name="normalised_name",
+            name="ccni_charity_normalised_name_trgm",
+        ),
+    ]
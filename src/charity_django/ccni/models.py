@@ -1,5 +1,8 @@
 from django.db import models
 
+from charity_django.utils.search import NameSearchQuerySet
+from charity_django.utils.text import normalise_name, to_titlecase
+
 
 class ClassificationTypes(models.TextChoices):
     """Classification types"""
@@ -19,6 +22,22 @@ class Charity(models.Model):
         db_index=True,
         verbose_name="Charity name",
     )
+    display_name = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Name",
+    )
+    normalised_name = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Normalised name",
+    )
     date_registered = models.DateField(
         verbose_name="Date registered", null=True, blank=True
     )
@@ -176,6 +195,8 @@ class Charity(models.Model):
         blank=True,
     )
 
+    objects = NameSearchQuerySet.as_manager()
+
     @property
     def what_the_charity_does(self):
         return self.classifications.filter(
@@ -198,6 +219,15 @@ class Charity(models.Model):
     def org_id(self):
         return f"GB-NIC-{self.reg_charity_number}"
 
+    def save(self, *args, **kwargs):
+        self.display_name = to_titlecase(self.charity_name)
+        self.normalised_name = normalise_name(self.charity_name)
+        super().save(*args, **kwargs)
+
+    @property
+    def name(self):
+        return self.display_name or to_titlecase(self.charity_name)
+
     def __str__(self) -> str:
         return f"{self.charity_name} [{self.reg_charity_number}]"
 
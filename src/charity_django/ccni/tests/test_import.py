@@ -9,6 +9,7 @@ from django.test import TestCase
 
 from charity_django.ccni.management.commands.import_ccni import Command as CCNICommand
 from charity_django.ccni.models import Charity
+from charity_django.utils.text import to_titlecase
 
 
 class MockSession(requests.Session):
@@ -58,6 +59,17 @@ class ImportCCNITestCase(TestCase):
             charity = Charity.objects.get(reg_charity_number=100016)
             assert charity.charity_name == "Fírinne"
 
+    def test_charity_import_display_name(self):
+        command = CCNICommand()
+        command.stdout = sys.stdout
+
+        with requests_mock.Mocker() as m:
+            self._mock_csv_downloads(m)
+            command.handle()
+            assert not Charity.objects.filter(display_name__isnull=True).exists()
+            for charity in Charity.objects.all()[:50]:
+                assert charity.display_name == to_titlecase(charity.charity_name)
+
     def test_charity_import_twice(self):
         command = CCNICommand()
         command.stdout = sys.stdout
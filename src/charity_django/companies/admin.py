@@ -1,13 +1,25 @@
 from django.contrib import admin
-from django.db.models import Count
+from django.db.models import Prefetch
 from django.utils.html import format_html_join
 
-from charity_django.companies.models import Company, SICCode
-from charity_django.utils.admin import ReadOnlyMixin, UsedChoicesFieldListFilter
+from charity_django.companies.models import Company, CompanySICCode, SICCode
+from charity_django.utils.admin import (
+    EstimatedCountMixin,
+    NameSearchMixin,
+    PrefetchChangeViewMixin,
+    ReadOnlyMixin,
+    UsedChoicesFieldListFilter,
+)
 
 
 @admin.register(Company)
-class CompanyAdmin(ReadOnlyMixin, admin.ModelAdmin):
+class CompanyAdmin(
+    EstimatedCountMixin,
+    PrefetchChangeViewMixin,
+    NameSearchMixin,
+    ReadOnlyMixin,
+    admin.ModelAdmin,
+):
     list_display = (
         "CompanyNumber",
         "CompanyName",
@@ -19,15 +31,22 @@ class CompanyAdmin(ReadOnlyMixin, admin.ModelAdmin):
         "CompanyNumber",
         "CompanyName",
     )
-    list_filter = (
-        ("CompanyStatus", UsedChoicesFieldListFilter),
-        ("CompanyCategory", UsedChoicesFieldListFilter),
+    list_filter = tuple(
+        (field, UsedChoicesFieldListFilter) for field in Company.used_choices_fields
     )
     search_fields = (
         "CompanyNumber",
         "CompanyName",
     )
+    name_search_id_fields = ("CompanyNumber",)
     readonly_fields = ("sic_codes_labels", "previous_name_labels", "accounts_labels")
+    change_view_prefetch = (
+        Prefetch(
+            "sic_codes", queryset=CompanySICCode.objects.select_related("sic_code")
+        ),
+        "previous_names",
+        "accounts",
+    )
 
     fieldsets = (
         (
@@ -108,10 +127,7 @@ class CompanyAdmin(ReadOnlyMixin, admin.ModelAdmin):
         return format_html_join(
             "\n",
             "<li>{} [{}]</li>",
-            [
-                (c.sic_code.title, c.sic_code.code)
-                for c in obj.sic_codes.prefetch_related("sic_code").all()
-            ],
+            [(c.sic_code.title, c.sic_code.code) for c in obj.sic_codes.all()],
         )
 
     @admin.display(description="Previous names")
@@ -139,13 +155,7 @@ class SICCodeAdmin(ReadOnlyMixin, admin.ModelAdmin):
     list_display = (
         "code",
         "title",
-        "companies_count",
+        "company_count",
+        "active_company_count",
+        "nonprofit_company_count",
     )
-
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.annotate(company_count=Count("companies", distinct=True))
-
-    @admin.display(description="Companies", ordering="company_count")
-    def companies_count(self, obj):
-        return obj.companies.count()
@@ -81,6 +81,11 @@ class CompanyStatuses(Enum):
     OPEN = "open"  # , "Open"
 
 
+ACTIVE_STATUSES = [
+    CompanyStatuses.ACTIVE,
+    CompanyStatuses.ACTIVE_PROPOSAL_TO_STRIKE_OFF,
+]
+
 COMPANY_STATUS_LOOKUP = {
     "Active": CompanyStatuses.ACTIVE,
     "Active - Proposal to Strike off": CompanyStatuses.ACTIVE_PROPOSAL_TO_STRIKE_OFF,
@@ -327,3 +332,28 @@ class CompaniesHouseAPI:
             return ixbrl_response.content
         else:
             raise ValueError("No IXBRL document available")
+
+    def stream_account_ixbrl(
+        self, account: CompaniesHouseAccount, fileobj, chunk_size=64 * 1024
+    ):
+        """
+        Write the iXBRL document for an account to `fileobj` in chunks,
+        rather than holding the whole document in memory.
+
+        Returns the number of bytes written.
+        """
+        if not account.has_ixbrl:
+            raise ValueError("No IXBRL document available")
+        ixbrl_url = account.links.get("document")
+        if not ixbrl_url:
+            raise ValueError("No document available")
+        written = 0
+        with self.session.get(
+            ixbrl_url, headers={"Accept": "application/xhtml+xml"}, stream=True
+        ) as ixbrl_response:
+            ixbrl_response.raise_for_status()
+            for chunk in ixbrl_response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    fileobj.write(chunk)
+                    written += len(chunk)
+        return written
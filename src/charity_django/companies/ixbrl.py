@@ -0,0 +1,160 @@
+from dataclasses import dataclass, field
+from datetime import date as Date
+from typing import BinaryIO
+from xml.etree.ElementTree import iterparse
+
+IX_NAMESPACES = (
+    "http://www.xbrl.org/2013/inlineXBRL",
+    "http://www.xbrl.org/2008/inlineXBRL",
+)
+XBRLI_NAMESPACE = "http://www.xbrl.org/2003/instance"
+
+"""
+Lookup of XBRL concept names (without the taxonomy prefix) to the
+fields stored against an Account. Concepts are listed in order of
+preference - the first one found in a document is used.
+"""
+IXBRL_FACTS = {
+    "turnover": (
+        "TurnoverRevenue",
+        "Turnover",
+        "TurnoverGrossOperatingRevenue",
+        "Revenue",
+    ),
+    "net_assets": (
+        "NetAssetsLiabilities",
+        "NetAssetsLiabilitiesIncludingPensionAssetLiability",
+        "TotalAssetsLessCurrentLiabilities",
+    ),
+    "employees": (
+        "AverageNumberEmployeesDuringPeriod",
+        "AverageNumberEmployees",
+        "EmployeesTotal",
+    ),
+}
+CONCEPT_LOOKUP = {
+    concept: (fact, priority)
+    for fact, concepts in IXBRL_FACTS.items()
+    for priority, concept in enumerate(concepts)
+}
+
+
+@dataclass
+class IXBRLFacts:
+    period_end: Date = None
+    turnover: int = None
+    net_assets: int = None
+    employees: int = None
+    contexts: dict = field(default_factory=dict, repr=False)
+
+    def to_json(self):
+        return {
+            "period_end": self.period_end,
+            "turnover": self.turnover,
+            "net_assets": self.net_assets,
+            "employees": self.employees,
+        }
+
+
+def _local_name(tag):
+    if "}" in tag:
+        return tag.split("}", 1)[1]
+    return tag
+
+
+def _namespace(tag):
+    if tag.startswith("{"):
+        return tag[1:].split("}", 1)[0]
+    return None
+
+
+def _parse_value(text, attrib):
+    text = (text or "").strip()
+    if not text or text in ("-", "–", "—"):
+        value = 0.0
+    else:
+        if attrib.get("format", "").endswith(("numcommadecimal", "num-comma-decimal")):
+            text = text.replace(".", "").replace(" ", "").replace(",", ".")
+        else:
+            text = text.replace(",", "").replace(" ", "")
+        try:
+            value = float(text)
+        except ValueError:
+            return None
+    scale = attrib.get("scale")
+    if scale:
+        value = value * (10 ** int(scale))
+    if attrib.get("sign") == "-":
+        value = -value
+    return int(round(value))
+
+
+def parse_ixbrl(source: str | BinaryIO) -> IXBRLFacts:
+    """
+    Extract the key financial facts from an iXBRL document.
+
+    The document is read incrementally with `iterparse` and elements are
+    discarded once they have been read, so memory use doesn't depend on the
+    size of the document. Where a fact is reported for more than one period
+    the value for the latest period is used.
+    """
+    result = IXBRLFacts()
+    candidates = []  # (fact, priority, context_ref, value)
+
+    context_id = None
+    context_end = None
+    fact_depth = 0
+
+    for event, elem in iterparse(source, events=("start", "end")):
+        namespace = _namespace(elem.tag)
+        name = _local_name(elem.tag)
+
+        if event == "start":
+            if namespace in IX_NAMESPACES and name in ("nonFraction", "nonNumeric"):
+                fact_depth += 1
+            elif namespace == XBRLI_NAMESPACE and name == "context":
+                context_id = elem.get("id")
+                context_end = None
+            continue
+
+        # end events
+        if namespace == XBRLI_NAMESPACE:
+            if name in ("endDate", "instant") and context_id and elem.text:
+                try:
+                    context_end = Date.fromisoformat(elem.text.strip()[0:10])
+                except ValueError:
+                    context_end = None
+            elif name == "context":
+                if context_id:
+                    result.contexts[context_id] = context_end
+                context_id = None
+
+        elif namespace in IX_NAMESPACES and name in ("nonFraction", "nonNumeric"):
+            fact_depth -= 1
+            concept = elem.get("name", "").split(":")[-1]
+            if name == "nonFraction" and concept in CONCEPT_LOOKUP:
+                fact, priority = CONCEPT_LOOKUP[concept]
+                if elem.get("{http://www.w3.org/2001/XMLSchema-instance}nil") == "true":
+                    value = None
+                else:
+                    value = _parse_value("".join(elem.itertext()), elem.attrib)
+                if value is not None:
+                    candidates.append((fact, priority, elem.get("contextRef"), value))
+
+        if not fact_depth:
+            elem.clear()
+
+    # choose the value for the latest period, preferring the concepts
+    # listed first in IXBRL_FACTS
+    period_ends = [d for d in result.contexts.values() if d]
+    if period_ends:
+        result.period_end = max(period_ends)
+    best = {}
+    for fact, priority, context_ref, value in candidates:
+        period_end = result.contexts.get(context_ref)
+        key = (period_end or Date.min, -priority)
+        if fact not in best or key > best[fact][0]:
+            best[fact] = (key, value)
+    for fact, (_, value) in best.items():
+        setattr(result, fact, value)
+    return result
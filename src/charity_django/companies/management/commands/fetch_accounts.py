@@ -0,0 +1,207 @@
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import router, transaction
+from requests.exceptions import HTTPError
+
+from charity_django.companies.ch_api import CompaniesHouseAccount, CompaniesHouseAPI
+from charity_django.companies.ixbrl import parse_ixbrl
+from charity_django.companies.models import Account, AccountTypeChoices
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class Command(BaseCommand):
+    help = "Fetch iXBRL accounts from Companies House and store the key financial facts"
+    account_fields = ["turnover", "net_assets", "employees"]
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "company_numbers",
+            nargs="*",
+            type=str,
+            help="Company numbers to fetch accounts for",
+        )
+        parser.add_argument(
+            "--file",
+            type=str,
+            default=None,
+            help="File containing company numbers to fetch, one per line",
+        )
+        parser.add_argument(
+            "--api-key",
+            type=str,
+            help="API key to use for fetching data",
+            default=os.getenv("CH_API_KEY"),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Number of companies to fetch and parse accounts for at the same time",
+        )
+        parser.add_argument(
+            "--latest-only",
+            action="store_true",
+            help="Only fetch the most recent set of accounts for each company",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of parsed accounts to save in each database write",
+        )
+
+    def logger(self, message, error=False):
+        if error:
+            logger.error(message)
+            return
+        logger.info(message)
+
+    def get_company_numbers(self, options):
+        yield from options.get("company_numbers") or []
+        if options.get("file"):
+            with open(options["file"], encoding="utf8") as f:
+                for line in f:
+                    if line.strip():
+                        yield line.strip()
+
+    def handle(self, *args, **options):
+        self.api_key = options["api_key"]
+        self.local = threading.local()
+        self.latest_only = options.get("latest_only", False)
+        self.temp_dir = TemporaryDirectory()
+        workers = options.get("workers") or 1
+        batch_size = options.get("batch_size") or 500
+
+        self.results = {"fetched": 0, "errors": 0, "saved": 0}
+        self.results_lock = threading.Lock()
+        batch = []
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # only keep a limited number of companies in flight so memory
+                # use stays bounded however many companies are requested
+                pending = set()
+                for company_number in self.get_company_numbers(options):
+                    pending.add(executor.submit(self.process_company, company_number))
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            batch.extend(future.result())
+                    if len(batch) >= batch_size:
+                        self.save_accounts(batch)
+                        batch = []
+                done, _ = wait(pending)
+                for future in done:
+                    batch.extend(future.result())
+            self.save_accounts(batch)
+        finally:
+            self.temp_dir.cleanup()
+
+        self.logger(
+            "Fetched {fetched:,.0f} accounts ({errors:,.0f} errors), saved {saved:,.0f}".format(
+                **self.results
+            )
+        )
+
+    def _count(self, key):
+        with self.results_lock:
+            self.results[key] += 1
+
+    @property
+    def api(self):
+        # each worker thread has its own API client, as a requests session
+        # isn't safe to share between threads
+        if not hasattr(self.local, "api"):
+            self.local.api = CompaniesHouseAPI(self.api_key)
+        return self.local.api
+
+    def get_accounts(self, company_number):
+        try:
+            for account in self.api.get_accounts(company_number):
+                if not account.has_ixbrl:
+                    continue
+                yield account
+                if self.latest_only:
+                    break
+        except HTTPError as e:
+            self._count("errors")
+            self.logger(
+                f"Failed to fetch filing history for company {company_number}: {e}",
+                error=True,
+            )
+
+    def process_company(self, company_number):
+        """
+        Fetch the filing history of a company and process each set of iXBRL
+        accounts, returning the accounts to save.
+
+        Runs inside a worker thread, so doesn't touch the database.
+        """
+        accounts = []
+        for account in self.get_accounts(company_number):
+            result = self.process_account(account)
+            if result:
+                accounts.append(result)
+        return accounts
+
+    def process_account(self, account: CompaniesHouseAccount):
+        """
+        Download a single iXBRL document to disk and parse it.
+        """
+        try:
+            with NamedTemporaryFile(dir=self.temp_dir.name, suffix=".xhtml") as f:
+                self.api.stream_account_ixbrl(account, f)
+                f.flush()
+                f.seek(0)
+                facts = parse_ixbrl(f)
+        except Exception as e:
+            self._count("errors")
+            self.logger(
+                f"Failed to process accounts {account.transaction_id} for company {account.company_number}: {e}",
+                error=True,
+            )
+            return None
+
+        self._count("fetched")
+        financial_year_end = account.financial_year_end or facts.period_end
+        if hasattr(financial_year_end, "date"):
+            financial_year_end = financial_year_end.date()
+        if not financial_year_end:
+            return None
+        category = account.accounts_type
+        if category not in AccountTypeChoices.values:
+            category = None
+        return Account(
+            company_id=account.company_number,
+            financial_year_end=financial_year_end,
+            category=category,
+            turnover=facts.turnover,
+            net_assets=facts.net_assets,
+            employees=facts.employees,
+        )
+
+    def save_accounts(self, accounts):
+        if not accounts:
+            return
+        # a company may have filed amended accounts for the same year
+        accounts = {(a.company_id, a.financial_year_end): a for a in accounts}
+        db = router.db_for_write(Account)
+        with transaction.atomic(using=db):
+            Account.objects.using(db).bulk_create(
+                accounts.values(),
+                update_conflicts=True,
+                unique_fields=["company", "financial_year_end"],
+                update_fields=self.account_fields,
+            )
+        self.results["saved"] += len(accounts)
+        self.logger(
+            "Saved {:,.0f} accounts ({:,.0f} total)".format(
+                len(accounts), self.results["saved"]
+            )
+        )
@@ -10,26 +10,42 @@ from collections import defaultdict
 
 import requests
 import tqdm
+from django.apps import apps
 from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.db import connections, router, transaction
+from django.db.models import Count, Q
 from requests_html import HTMLSession
 
 from charity_django.companies.ch_api import (
     ACCOUNTS_TYPE_LOOKUP,
+    ACTIVE_STATUSES,
     COMPANY_CATEGORY_LOOKUP,
     COMPANY_STATUS_LOOKUP,
+    NONPROFIT_TYPES,
     AccountTypes,
     CompanyStatuses,
     CompanyTypes,
 )
 from charity_django.companies.models import (
+    Account,
     Company,
     CompanySICCode,
     PreviousName,
     SICCode,
 )
+from charity_django.utils.bulk import (
+    BulkWriter,
+    add_bulk_session_argument,
+    import_session,
+)
+from charity_django.utils.cache import bump_cache_version, refresh_used_values
 from charity_django.utils.cachedsession import CachedHTMLSession
+from charity_django.utils.geography import PostcodeGeography
+from charity_django.utils.indexes import DeferredIndexes
+from charity_django.utils.maintenance import add_analyze_arguments, analyze_tables
+from charity_django.utils.text import normalise_name_many
 
 from ._company_sql import UPDATE_COMPANIES
 
@@ -38,30 +54,31 @@ logger.setLevel(logging.INFO)
 
 DEFAULT_DATE_FORMAT = "%Y-%m-%d"
 
+# filled in by `update_postcode_geography` rather than from the CSV
+GEOGRAPHY_FIELDS = [f.name for f in PostcodeGeography._meta.fields]
+
 
 MODEL_UPDATES = {
     Company: {
-        "update_conflicts": True,
         "update_fields": [
             f.get_attname_column()[0]
             for f in Company._meta.get_fields()
-            if f.name not in ["CompanyNumber"] and hasattr(f, "get_attname_column")
+            if f.name not in ["CompanyNumber", *GEOGRAPHY_FIELDS]
+            and hasattr(f, "get_attname_column")
         ],
-        "unique_fields": ["CompanyNumber"],
+        "conflict_fields": ["CompanyNumber"],
     },
     PreviousName: {
-        "update_conflicts": True,
         "update_fields": [
             "in_latest_update",
         ],
-        "unique_fields": ["company", "CompanyName"],
+        "conflict_fields": ["company", "CompanyName"],
     },
     CompanySICCode: {
-        "update_conflicts": True,
         "update_fields": [
             "in_latest_update",
         ],
-        "unique_fields": ["company", "sic_code"],
+        "conflict_fields": ["company", "sic_code"],
     },
 }
 
@@ -83,6 +100,7 @@ class Command(BaseCommand):
     ]
     date_format = "%d/%m/%Y"
     bulk_limit = 50000
+    bulk_session = False
     source = {
         "title": "Free Company Data Product",
         "description": "The Free Company Data Product is a downloadable data snapshot \
@@ -129,12 +147,33 @@ class Command(BaseCommand):
             default=settings.DEBUG,
         )
         parser.add_argument("--sample", type=int, default=0)
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help="Drop the indexes on the reloaded tables and rebuild them afterwards",
+        )
+        add_analyze_arguments(parser)
+        add_bulk_session_argument(parser)
 
     def handle(self, *args, **options):
         self.debug = options["debug"]
         self.sample = options["sample"]
+        self.bulk_session = options.get("bulk_session")
         db = router.db_for_write(Company)
-        with transaction.atomic(using=db), connections[db].cursor() as cursor:
+        indexes = None
+        if options.get("defer_indexes"):
+            indexes = DeferredIndexes(MODEL_UPDATES.keys(), using=db)
+        # copies of the existing tables don't need to survive a crash
+        table_kind = (
+            "UNLOGGED TABLE"
+            if self.bulk_session and connections[db].vendor == "postgresql"
+            else "TABLE"
+        )
+        with (
+            import_session(db, enabled=self.bulk_session),
+            transaction.atomic(using=db),
+            connections[db].cursor() as cursor,
+        ):
             new_tables = []
 
             for m in MODEL_UPDATES.keys():
@@ -156,7 +195,7 @@ class Command(BaseCommand):
                 self.logger(f"Copying {m.__name__} to temporary table - started")
                 cursor.execute(
                     f'''
-                    CREATE TABLE "{new_table}" AS
+                    CREATE {table_kind} "{new_table}" AS
                     SELECT {columns}, false as "in_latest_update"
                     FROM "{m._meta.db_table}"'''
                 )
@@ -167,6 +206,9 @@ class Command(BaseCommand):
                 cursor.execute(f'DELETE FROM "{m._meta.db_table}" WHERE 1=1')
                 self.logger(f"Truncating {m.__name__} db table - finished")
 
+            if indexes is not None:
+                indexes.drop()
+
             # import the new data
             self.set_session(install_cache=options["cache"])
             self.fetch_file()
@@ -200,6 +242,68 @@ class Command(BaseCommand):
                 cursor.execute(sql)
                 self.logger(f"Executed {title}")
 
+        # the indexes are rebuilt once the data is committed
+        if indexes is not None:
+            indexes.rebuild()
+
+        if options.get("analyze", True):
+            tables = [*MODEL_UPDATES.keys(), Account]
+            analyze_tables(
+                tables, using=db, vacuum=tables if options.get("vacuum") else ()
+            )
+
+        self.update_sic_code_counts()
+
+        # the reloaded rows don't have any geography yet
+        if apps.is_installed("charity_django.postcodes"):
+            call_command("update_postcode_geography", register=["companies"])
+
+        # cached counts and filters for the old data are no longer valid
+        bump_cache_version(*MODEL_UPDATES.keys(), SICCode)
+        refresh_used_values(Company, *Company.used_choices_fields)
+
+    def update_sic_code_counts(self):
+        """
+        Store the number of companies with each SIC code, so they don't
+        need to be counted from the link table when displayed.
+        """
+        db = router.db_for_write(SICCode)
+        counts = {
+            row["sic_code"]: row
+            for row in CompanySICCode.objects.using(db)
+            .order_by()
+            .values("sic_code")
+            .annotate(
+                company_count=Count("company"),
+                active_company_count=Count(
+                    "company",
+                    filter=Q(
+                        company__CompanyStatus__in=[s.value for s in ACTIVE_STATUSES]
+                    ),
+                ),
+                nonprofit_company_count=Count(
+                    "company",
+                    filter=Q(
+                        company__CompanyCategory__in=[t.value for t in NONPROFIT_TYPES]
+                    ),
+                ),
+            )
+        }
+        count_fields = [
+            "company_count",
+            "active_company_count",
+            "nonprofit_company_count",
+        ]
+        sic_codes = list(SICCode.objects.using(db).all())
+        for sic_code in sic_codes:
+            row = counts.get(sic_code.code, {})
+            for field in count_fields:
+                setattr(sic_code, field, row.get(field, 0))
+        SICCode.objects.using(db).bulk_update(
+            sic_codes, count_fields, batch_size=self.bulk_limit
+        )
+        self.logger(f"Updated company counts for {len(sic_codes):,.0f} SIC codes")
+
     def set_session(self, install_cache=False):
         if install_cache:
             self.logger("Using requests_cache")
@@ -418,9 +522,16 @@ class Command(BaseCommand):
         self.logger(
             "Saving {:,.0f} {} records".format(len(self.records[model]), model.__name__)
         )
-        model.objects.bulk_create(
-            self.records[model].values(), **MODEL_UPDATES.get(model, {})
-        )
+        if model is Company:
+            companies = self.records[model].values()
+            for company, normalised_name in zip(
+                companies, normalise_name_many(c.CompanyName for c in companies)
+            ):
+                company.normalised_name = normalised_name
+        with BulkWriter(
+            model, staged=self.bulk_session, **MODEL_UPDATES.get(model, {})
+        ) as writer:
+            writer.write_objects(self.records[model].values())
         self.object_count[model] += len(self.records[model])
         self.logger(
             "Saved {:,.0f} {} records ({:,.0f} total)".format(
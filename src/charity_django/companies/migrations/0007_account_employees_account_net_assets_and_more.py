@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0006_alter_company_companycategory"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="employees",
+            field=models.IntegerField(
+                blank=True, null=True, verbose_name="Average number of employees"
+            ),
+        ),
+        migrations.AddField(
+            model_name="account",
+            name="net_assets",
+            field=models.BigIntegerField(
+                blank=True, null=True, verbose_name="Net assets / (liabilities)"
+            ),
+        ),
+        migrations.AddField(
+            model_name="account",
+            name="turnover",
+            field=models.BigIntegerField(
+                blank=True, null=True, verbose_name="Turnover / revenue"
+            ),
+        ),
+    ]
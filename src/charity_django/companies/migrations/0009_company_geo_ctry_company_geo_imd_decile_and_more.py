@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0008_company_normalised_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="company",
+            name="geo_ctry",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                max_length=9,
+                null=True,
+                verbose_name="Country",
+            ),
+        ),
+        migrations.AddField(
+            model_name="company",
+            name="geo_imd_decile",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                db_index=True,
+                help_text="Index of Multiple Deprivation decile for the postcode, from 1 (most deprived) to 10, within its country",
+                null=True,
+                verbose_name="IMD decile",
+            ),
+        ),
+        migrations.AddField(
+            model_name="company",
+            name="geo_laua",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                max_length=9,
+                null=True,
+                verbose_name="Local Authority",
+            ),
+        ),
+        migrations.AddField(
+            model_name="company",
+            name="geo_lsoa21",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                max_length=9,
+                null=True,
+                verbose_name="Lower Super Output Area (2021)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="company",
+            name="geo_rgn",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                max_length=9,
+                null=True,
+                verbose_name="Region",
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0009_company_geo_ctry_company_geo_imd_decile_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="siccode",
+            name="active_company_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Active companies"
+            ),
+        ),
+        migrations.AddField(
+            model_name="siccode",
+            name="company_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Number of companies with this SIC code, updated after each import",
+                verbose_name="Companies",
+            ),
+        ),
+        migrations.AddField(
+            model_name="siccode",
+            name="nonprofit_company_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Nonprofit companies"
+            ),
+        ),
+    ]
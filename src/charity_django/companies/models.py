@@ -7,6 +7,9 @@ from charity_django.companies.ch_api import (
     CompanyStatuses,
     CompanyTypes,
 )
+from charity_django.utils.geography import PostcodeGeography
+from charity_django.utils.search import NameSearchQuerySet
+from charity_django.utils.text import normalise_name
 
 
 class CompanyStatusChoices(models.TextChoices):
@@ -263,7 +266,7 @@ class CompanyManager(models.Manager):
         return CompanyQuerySet(self.model)
 
 
-class Company(models.Model):
+class Company(PostcodeGeography, models.Model):
     CompanyName = models.CharField(
         max_length=255, db_index=True, verbose_name="Company Name"
     )
@@ -374,6 +377,24 @@ class Company(models.Model):
     )
     last_updated = models.DateTimeField(auto_now=True)
     in_latest_update = models.BooleanField(default=False, db_index=True)
+    normalised_name = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Normalised name",
+    )
+
+    objects = NameSearchQuerySet.as_manager()
+
+    # fields filtered on in the admin, whose used values are cached after
+    # each import
+    used_choices_fields = ("CompanyStatus", "CompanyCategory")
+
+    def save(self, *args, **kwargs):
+        self.normalised_name = normalise_name(self.CompanyName)
+        super().save(*args, **kwargs)
 
     @property
     def is_nonprofit(self):
@@ -393,6 +414,22 @@ class Company(models.Model):
 class SICCode(models.Model):
     code = models.CharField(max_length=255, db_index=True, primary_key=True)
     title = models.CharField(max_length=255, db_index=True)
+    company_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Companies",
+        help_text="Number of companies with this SIC code, updated after each import",
+    )
+    active_company_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Active companies",
+    )
+    nonprofit_company_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Nonprofit companies",
+    )
 
     class Meta:
         verbose_name = "SIC Code"
@@ -463,6 +500,15 @@ class Account(models.Model):
         null=True,
         blank=True,
     )
+    turnover = models.BigIntegerField(
+        null=True, blank=True, verbose_name="Turnover / revenue"
+    )
+    net_assets = models.BigIntegerField(
+        null=True, blank=True, verbose_name="Net assets / (liabilities)"
+    )
+    employees = models.IntegerField(
+        null=True, blank=True, verbose_name="Average number of employees"
+    )
     objects = CompanyManager()
 
     class Meta:
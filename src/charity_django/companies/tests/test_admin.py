@@ -0,0 +1,62 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from charity_django.companies.models import (
+    Account,
+    Company,
+    CompanySICCode,
+    PreviousName,
+    SICCode,
+)
+
+
+class CompanyAdminTestCase(TestCase):
+    # the number of related rows shouldn't change the number of queries
+    query_budget = 10
+
+    def create_company(self, company_number, related_rows):
+        company = Company.objects.create(
+            CompanyNumber=company_number,
+            CompanyName=f"Company {company_number}",
+        )
+        for i in range(related_rows):
+            sic_code, _ = SICCode.objects.get_or_create(
+                code=f"8899{i}", defaults={"title": f"SIC code {i}"}
+            )
+            CompanySICCode.objects.create(company=company, sic_code=sic_code)
+            PreviousName.objects.create(
+                company=company,
+                CompanyName=f"Old name {i}",
+                ConDate=datetime.date(2010 + i, 1, 1),
+            )
+            Account.objects.create(
+                company=company,
+                financial_year_end=datetime.date(2010 + i, 3, 31),
+            )
+        return company
+
+    def get_change_page_queries(self, company):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("admin:companies_company_change", args=(company.pk,))
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Old name 0")
+        return len(queries)
+
+    def test_change_view_queries(self):
+        self.client.force_login(User.objects.create_superuser("admin"))
+        company_few = self.create_company("00000001", 1)
+        company_many = self.create_company("00000002", 5)
+        # the first request caches content types
+        self.get_change_page_queries(company_few)
+
+        few = self.get_change_page_queries(company_few)
+        many = self.get_change_page_queries(company_many)
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, self.query_budget)
@@ -0,0 +1,155 @@
+import datetime
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests_mock
+from django.core.management import call_command
+from django.test import TestCase
+
+from charity_django.companies.ch_api import CompaniesHouseAPI
+from charity_django.companies.ixbrl import parse_ixbrl
+from charity_django.companies.management.commands.fetch_accounts import Command
+from charity_django.companies.models import Account
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "data", "ixbrl_accounts.xhtml")
+DOCUMENT_URL = "https://document-api.company-information.service.gov.uk/document/abc123"
+
+
+class TestParseIXBRL(TestCase):
+    def test_parse_file(self):
+        facts = parse_ixbrl(FIXTURE)
+        self.assertEqual(facts.period_end, datetime.date(2023, 3, 31))
+        self.assertEqual(facts.turnover, 1_234_567)
+        self.assertEqual(facts.net_assets, -12_000)
+        self.assertEqual(facts.employees, 17)
+
+    def test_parse_fileobj(self):
+        with open(FIXTURE, "rb") as f:
+            facts = parse_ixbrl(io.BytesIO(f.read()))
+        self.assertEqual(facts.turnover, 1_234_567)
+
+    def test_parse_missing_facts(self):
+        facts = parse_ixbrl(
+            io.BytesIO(
+                b'<html xmlns="http://www.w3.org/1999/xhtml"><body><p>No facts</p></body></html>'
+            )
+        )
+        self.assertIsNone(facts.period_end)
+        self.assertIsNone(facts.turnover)
+        self.assertIsNone(facts.net_assets)
+        self.assertIsNone(facts.employees)
+
+
+class TestFetchAccounts(TestCase):
+    def mock_api(self, m):
+        m.get(
+            CompaniesHouseAPI.FILING_HISTORY_URL.format(company_number="01234567"),
+            json={
+                "items": [
+                    {
+                        "type": "AA",
+                        "category": "accounts",
+                        "date": "2023-06-01",
+                        "description": "accounts-with-accounts-type-small",
+                        "description_values": {"made_up_date": "2023-03-31"},
+                        "links": {"document_metadata": DOCUMENT_URL},
+                        "barcode": "XBARCODE",
+                        "transaction_id": "MzM4",
+                        "pages": 10,
+                    }
+                ]
+            },
+        )
+        m.get(
+            DOCUMENT_URL,
+            json={
+                "company_number": "01234567",
+                "barcode": "XBARCODE",
+                "significant_date": None,
+                "significant_date_type": "",
+                "category": "accounts",
+                "created_at": "2023-06-01T10:00:00.000Z",
+                "etag": "",
+                "filename": "01234567_aa_2023-06-01.xhtml",
+                "links": {
+                    "self": DOCUMENT_URL,
+                    "document": DOCUMENT_URL + "/content",
+                },
+                "resources": {"application/xhtml+xml": {"content_length": 4321}},
+            },
+        )
+        with open(FIXTURE, "rb") as f:
+            m.get(DOCUMENT_URL + "/content", content=f.read())
+
+    def test_stream_account_ixbrl(self):
+        api = CompaniesHouseAPI("test-key")
+        with requests_mock.Mocker() as m:
+            self.mock_api(m)
+            account = next(api.get_accounts("01234567"))
+            out = io.BytesIO()
+            written = api.stream_account_ixbrl(account, out, chunk_size=256)
+        self.assertEqual(written, os.path.getsize(FIXTURE))
+        self.assertEqual(out.getvalue(), open(FIXTURE, "rb").read())
+
+    def test_handle(self):
+        with requests_mock.Mocker() as m:
+            self.mock_api(m)
+            call_command("fetch_accounts", "01234567", api_key="test-key", workers=2)
+
+        account = Account.objects.get(company_id="01234567")
+        self.assertEqual(account.financial_year_end, datetime.date(2023, 3, 31))
+        self.assertEqual(account.category, "small")
+        self.assertEqual(account.turnover, 1_234_567)
+        self.assertEqual(account.net_assets, -12_000)
+        self.assertEqual(account.employees, 17)
+
+    def test_handle_filing_history_error(self):
+        with requests_mock.Mocker() as m:
+            self.mock_api(m)
+            m.get(
+                CompaniesHouseAPI.FILING_HISTORY_URL.format(company_number="07654321"),
+                status_code=404,
+            )
+            call_command(
+                "fetch_accounts",
+                "07654321",
+                "01234567",
+                api_key="test-key",
+                workers=2,
+            )
+
+        self.assertEqual(
+            list(Account.objects.values_list("company_id", flat=True)), ["01234567"]
+        )
+
+    def test_api_per_thread(self):
+        command = Command()
+        command.api_key = "test-key"
+        command.local = threading.local()
+        # both threads are running at once, so neither can reuse the other's
+        barrier = threading.Barrier(2)
+
+        def get_session():
+            barrier.wait()
+            return command.api.session
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(get_session) for _ in range(2)]
+        self.assertIsNot(futures[0].result(), futures[1].result())
+        self.assertIs(command.api, command.api)
+
+    def test_handle_keeps_existing_category(self):
+        Account.objects.create(
+            company_id="01234567",
+            financial_year_end=datetime.date(2023, 3, 31),
+            category="full",
+        )
+        with requests_mock.Mocker() as m:
+            self.mock_api(m)
+            call_command("fetch_accounts", "01234567", api_key="test-key")
+
+        account = Account.objects.get(company_id="01234567")
+        self.assertEqual(account.category, "full")
+        self.assertEqual(account.turnover, 1_234_567)
@@ -3,11 +3,17 @@ import re
 from unittest.mock import patch
 
 import requests_mock
+from django.db import connection
 from django.test import TestCase
 from requests_html import HTMLSession
 
-from charity_django.companies.management.commands.import_companies import Command
-from charity_django.companies.models import Company
+from charity_django.companies.management.commands.import_companies import (
+    MODEL_UPDATES,
+    Command,
+)
+from charity_django.companies.models import Company, CompanySICCode, SICCode
+from charity_django.postcodes.models import Postcode
+from charity_django.utils.indexes import secondary_indexes
 
 
 class TestImportCompanies(TestCase):
@@ -48,6 +54,89 @@ class TestImportCompanies(TestCase):
             command.handle(debug=False, cache=False, sample=0)
             assert Company.objects.count() == 87
 
+        for sic_code in SICCode.objects.all():
+            assert sic_code.company_count == sic_code.companies.count()
+
+    def test_handle_bulk_session(self):
+        command = Command()
+
+        with requests_mock.Mocker() as m:
+            self.mock_csv_downloads(m)
+            command.handle(debug=False, cache=False, sample=0, bulk_session=True)
+            assert Company.objects.count() == 87
+
+        for sic_code in SICCode.objects.all():
+            assert sic_code.company_count == sic_code.companies.count()
+
+    def test_handle_postcode_geography(self):
+        Postcode.objects.create(
+            PCD="CT126SJ",
+            PCDS="CT12 6SJ",
+            lsoa2021_id="E01024000",
+            local_authority_id="E07000114",
+            region_id="E12000008",
+            country_id="E92000001",
+        )
+        command = Command()
+
+        with requests_mock.Mocker() as m:
+            self.mock_csv_downloads(m)
+            command.handle(debug=False, cache=False, sample=0)
+
+        company = Company.objects.get(CompanyNumber="11990344")
+        assert company.geo_laua == "E07000114"
+        assert company.geo_ctry == "E92000001"
+
+    def test_handle_defer_indexes(self):
+        command = Command()
+        indexes = {
+            model: secondary_indexes(model, connection) for model in MODEL_UPDATES
+        }
+
+        with requests_mock.Mocker() as m:
+            self.mock_csv_downloads(m)
+            command.handle(debug=False, cache=False, sample=0, defer_indexes=True)
+            assert Company.objects.count() == 87
+
+        with connection.cursor() as cursor:
+            for model, model_indexes in indexes.items():
+                existing = connection.introspection.get_constraints(
+                    cursor, model._meta.db_table
+                )
+                for name, _ in model_indexes:
+                    assert name in existing
+
+    def test_update_sic_code_counts(self):
+        for i, (status, category) in enumerate(
+            [
+                ("active", "ltd"),
+                ("active", "private-limited-guarant-nsc"),
+                ("dissolved", "private-limited-guarant-nsc"),
+            ]
+        ):
+            Company.objects.create(
+                CompanyNumber=f"0000000{i}",
+                CompanyName=f"Company {i}",
+                CompanyStatus=status,
+                CompanyCategory=category,
+            )
+            CompanySICCode.objects.create(
+                company_id=f"0000000{i}",
+                sic_code=SICCode.objects.get_or_create(
+                    code="88990", defaults={"title": "Other social work"}
+                )[0],
+            )
+        SICCode.objects.create(code="01110", title="Growing of cereals")
+
+        command = Command()
+        command.update_sic_code_counts()
+
+        sic_code = SICCode.objects.get(code="88990")
+        assert sic_code.company_count == 3
+        assert sic_code.active_company_count == 2
+        assert sic_code.nonprofit_company_count == 2
+        assert SICCode.objects.get(code="01110").company_count == 0
+
     @patch("random.random", side_effect=[0.01, 0.99] * 1_000)
     def test_handle_sample(self, random_mock):
         command = Command()
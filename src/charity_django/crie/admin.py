@@ -6,7 +6,7 @@ from charity_django.crie.models import (
     CharityFinancialYear,
     ClassificationTypes,
 )
-from charity_django.utils.admin import CharitySizeListFilter
+from charity_django.utils.admin import CharitySizeListFilter, NameSearchMixin
 
 
 class CRIECharitySizeListFilter(CharitySizeListFilter):
@@ -61,14 +61,14 @@ class CharityFinancialYearInline(admin.TabularInline):
         return False
 
 
-class CharityAdmin(admin.ModelAdmin):
+class CharityAdmin(NameSearchMixin, admin.ModelAdmin):
     list_display = (
-        "registered_charity_name",
+        "display_name",
         "registered_charity_number",
         "status",
         "income",
     )
-    list_display_links = ("registered_charity_name",)
+    list_display_links = ("display_name",)
     list_filter = (
         "status",
         CRIECharitySizeListFilter,
@@ -78,6 +78,7 @@ class CharityAdmin(admin.ModelAdmin):
         "registered_charity_name",
         "registered_charity_number",
     )
+    name_search_id_fields = ("registered_charity_number",)
     readonly_fields = (
         "org_id",
         "also_known_as",
@@ -1,13 +1,13 @@
-import io
 import logging
+import tempfile
 from datetime import timedelta
+from typing import Generator
 
 import openpyxl
 import requests
 import requests_cache
 from django.core.management.base import BaseCommand
-from django.db import connections, models, router, transaction
-from django.utils.text import slugify
+from django.db import connections, router, transaction
 from openpyxl import load_workbook
 from tqdm import tqdm
 
@@ -16,17 +16,88 @@ from charity_django.crie.models import (
     Charity,
     CharityClassificationCategory,
     CharityFinancialYear,
+    CharityName,
     ClassificationTypes,
 )
 from charity_django.crie.utils import parse_classification, parse_classification_simple
+from charity_django.utils.bulk import (
+    BulkWriter,
+    add_bulk_session_argument,
+    import_session,
+)
+from charity_django.utils.maintenance import add_analyze_arguments, analyze_tables
+from charity_django.utils.rows import RowTransformer
+from charity_django.utils.text import normalise_name_many, to_titlecase_many
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# the most recent financial year for each charity
+LATEST_FINANCIAL_YEAR_SQL = """
+SELECT id, charity_id, period_end_date, gross_income, gross_expenditure,
+    activity_description, activity_description_ga
+FROM (
+    SELECT fy.*,
+        ROW_NUMBER() OVER (
+            PARTITION BY fy.charity_id ORDER BY fy.period_end_date DESC
+        ) AS year_rank
+    FROM {financial_year} fy
+) fy
+WHERE year_rank = 1
+"""
+
+UPDATE_LATEST_SQL = """
+UPDATE {charity}
+SET latest_financial_year_end = latest.period_end_date,
+    latest_income = latest.gross_income,
+    latest_expenditure = latest.gross_expenditure,
+    latest_activity_description = latest.activity_description,
+    latest_activity_description_ga = latest.activity_description_ga
+FROM ({latest}) latest
+WHERE {charity}.registered_charity_number = latest.charity_id
+"""
+
+INSERT_LATEST_CLASSIFICATIONS_SQL = """
+INSERT INTO {charity_classifications} (charity_id, charityclassificationcategory_id)
+SELECT DISTINCT latest.charity_id, fyc.charityclassificationcategory_id
+FROM ({latest}) latest
+    INNER JOIN {financial_year_classifications} fyc
+        ON fyc.charityfinancialyear_id = latest.id
+"""
+
+
+# the fields updated when a financial year is already in the table
+FINANCIAL_YEAR_UPDATE_FIELDS = [
+    "period_start_date",
+    "activity_description",
+    "income_government_or_local_authorities",
+    "income_other_public_bodies",
+    "income_philantrophic_organisations",
+    "income_donations",
+    "income_trading_and_commercial_activities",
+    "income_other_sources",
+    "income_bequests",
+    "gross_income",
+    "gross_expenditure",
+    "surplus_deficit_for_the_period",
+    "cash_at_hand_and_in_bank",
+    "other_assets",
+    "total_assets",
+    "total_liabilities",
+    "net_assets_liabilities",
+    "gross_income_schools",
+    "gross_expenditure_schools",
+    "number_of_employees",
+    "number_of_full_time_employees",
+    "number_of_part_time_employees",
+    "number_of_volunteers",
+]
+
 
 class Command(BaseCommand):
     help = "Import Charity Regulator Ireland data from an Excel file"
     page_size = 100_000
+    bulk_session = False
     base_url = "https://www.charitiesregulator.ie/media/1rviel2n/20251019-public-register-of-charities.xlsx"
 
     def _get_db(self):
@@ -44,6 +115,8 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--sample", type=int, default=0)
         parser.add_argument("--file", type=str, default=None)
+        add_analyze_arguments(parser)
+        add_bulk_session_argument(parser)
 
     def handle(self, *args, **options):
         self.session = requests_cache.CachedSession(
@@ -53,9 +126,10 @@ class Command(BaseCommand):
         )
         self.sample = options.get("sample")
         self.file = options.get("file")
+        self.bulk_session = options.get("bulk_session")
 
-        self.classification_cache = {}
-        self.charities = {}
+        self.classification_ids = {}
+        self.new_classifications = set()
         self.charity_fields = [
             f.get_attname_column()[1]
             for f in Charity._meta.fields
@@ -67,26 +141,51 @@ class Command(BaseCommand):
 
         self.names = set()
 
-        self.fetch_file()
+        with import_session(self._get_db(), enabled=self.bulk_session):
+            self.fetch_file()
+
+        if options.get("analyze", True):
+            tables = [
+                Charity,
+                CharityName,
+                CharityClassificationCategory,
+                CharityFinancialYear,
+                Charity.classifications.through,
+                CharityFinancialYear.classifications.through,
+            ]
+            analyze_tables(
+                tables,
+                using=self._get_db(),
+                vacuum=tables if options.get("vacuum") else (),
+            )
 
     def fetch_file(self) -> None:
-        self.files = {}
         if self.file:
             self.logger(f"Using local file: {self.file}")
-            with open(self.file, "rb") as f:
-                file = io.BytesIO(f.read())
-        else:
-            self.logger(f"Downloading file from: {self.base_url}")
+            self.import_workbook(self.file)
+            return
+
+        self.logger(f"Downloading file from: {self.base_url}")
+        # requests_cache reads the whole body into memory to store it, so the
+        # cache is skipped for the download and the response is streamed
+        with self.session.cache_disabled():
             try:
-                r = self.session.get(self.base_url, verify=True)
+                r = self.session.get(self.base_url, verify=True, stream=True)
             except requests.exceptions.SSLError:
-                r = self.session.get(self.base_url, verify=False)
-            r.raise_for_status()
-
-            file = io.BytesIO(r.content)
-
+                r = self.session.get(self.base_url, verify=False, stream=True)
+        r.raise_for_status()
+
+        # openpyxl reads the workbook lazily from disk in read-only mode, so
+        # save the download to a file rather than holding it in memory
+        with r, tempfile.NamedTemporaryFile(suffix=".xlsx") as f:
+            for chunk in r.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
+            f.flush()
+            self.import_workbook(f.name)
+
+    def import_workbook(self, filename: str) -> None:
         self.logger("Loading workbook...")
-        wb = load_workbook(filename=file, read_only=True)
+        wb = load_workbook(filename=filename, read_only=True)
 
         # check that that sheets we're expecting are present
         PUBLIC_REGISTER_SHEET = "Public Register"
@@ -98,69 +197,69 @@ class Command(BaseCommand):
 
         db = self._get_db()
         connection = self._get_connection()
-        with connection.cursor(), transaction.atomic(using=db):
-            classifications = set()
-            classifications.update(
-                self.get_charities_classifications(wb[PUBLIC_REGISTER_SHEET])
-            )
-            classifications.update(
-                self.get_annual_reports_classifications(wb[ANNUAL_REPORTS_SHEET])
-            )
-            self.add_classification_categories(classifications)
-
-            self.add_charities(wb[PUBLIC_REGISTER_SHEET])
-            self.add_annual_reports(wb[ANNUAL_REPORTS_SHEET])
-            self.update_latest_financial_years()
-
-    def get_charities_classifications(
-        self, ws: openpyxl.worksheet.worksheet.Worksheet
-    ) -> set[tuple[str, ClassificationTypes]]:
-        self.logger("Finding charity classification categories...")
-        # import Public Register sheet
-        headers = [cell.value.strip() if cell.value else None for cell in ws[2]]
-        charity_classifications = set()
-        for i, row in enumerate(
-            tqdm(
-                ws.iter_rows(min_row=3, values_only=True),
-                desc="Processing charities",
-                total=ws.max_row - 2,
-            )
-        ):
+        try:
+            with connection.cursor(), transaction.atomic(using=db):
+                self.add_charities(wb[PUBLIC_REGISTER_SHEET])
+                self.add_annual_reports(wb[ANNUAL_REPORTS_SHEET])
+                self.update_latest_financial_years()
+        finally:
+            wb.close()
+
+    def _get_row_transformer(
+        self, ws: openpyxl.worksheet.worksheet.Worksheet, exclude: str
+    ) -> RowTransformer:
+        # headers are on the second row of each sheet
+        headers = next(ws.iter_rows(min_row=2, max_row=2, values_only=True))
+        return RowTransformer(headers, exclude=(exclude,))
+
+    def _iter_records(
+        self,
+        ws: openpyxl.worksheet.worksheet.Worksheet,
+        transform: RowTransformer,
+        desc: str,
+    ) -> Generator[dict, None, None]:
+        for row in tqdm(ws.iter_rows(min_row=3, values_only=True), desc=desc):
             if not any(row):
                 break
-            _, _, classifications = self.get_charity(dict(zip(headers, row)))
-            charity_classifications.update(classifications)
-
-        self.logger("Finished finding charity classification categories.")
-        return charity_classifications
+            yield transform(row)
 
     def add_charities(self, ws: openpyxl.worksheet.worksheet.Worksheet) -> None:
         self.logger("Importing charities...")
         # import Public Register sheet
-        headers = [cell.value.strip() if cell.value else None for cell in ws[2]]
-        for i, row in enumerate(
-            tqdm(
-                ws.iter_rows(min_row=3, values_only=True),
-                desc="Processing charities",
-                total=ws.max_row - 2,
-            )
-        ):
-            if not any(row):
-                break
-            self.add_charity(dict(zip(headers, row)))
+        transform = self._get_row_transformer(ws, exclude="trustees_start_date")
+        self.charity_record_fields = ["registered_charity_number"] + [
+            field for field in transform.fields if field in self.charity_fields
+        ]
+        self.charity_records = []
+        self.charity_names = set()
+        self.charity_classifications = set()
+        # only update the fields that come from the register, so the
+        # latest financial year fields are kept
+        self.charity_writer = BulkWriter(
+            Charity,
+            batch_size=self.page_size,
+            conflict_fields=["registered_charity_number"],
+            update_fields=self.charity_record_fields[1:]
+            + ["display_name", "normalised_name"],
+            staged=self.bulk_session,
+        )
+        with self.charity_writer:
+            for record in self._iter_records(
+                ws, transform, desc="Processing charities"
+            ):
+                self.add_charity(record)
+                if len(self.charity_records) >= self.page_size:
+                    self.save_charities()
+            self.save_charities()
+        self.logger(self.charity_writer.summary())
+        self.save_charity_names()
+        self.add_classification_categories()
+        self.save_charity_classifications()
         self.logger("Finished importing charities.")
 
     def get_charity(
         self, record: dict
     ) -> tuple[dict, set[str], set[tuple[str, ClassificationTypes]]]:
-        record = {
-            slugify(k).replace("-", "_").replace("__", "_").replace("__", "_"): (
-                v if v != "" else None
-            )
-            for k, v in record.items()
-            if k and k != "Trustees (Start Date)"
-        }
-
         # primary address field (replace multiple , , with single ,)
         if record.get("primary_address"):
             record["primary_address"] = ", ".join(
@@ -214,63 +313,75 @@ class Command(BaseCommand):
 
     def add_charity(self, record: dict) -> None:
         record, names, classifications = self.get_charity(record)
+        charity_number = int(record["registered_charity_number"])
+        record["registered_charity_number"] = charity_number
+        self.charity_records.append(
+            tuple(record.get(field) for field in self.charity_record_fields)
+        )
+        for name in names:
+            self.charity_names.add((charity_number, name))
+        for key in classifications:
+            self._register_classification(key)
+            self.charity_classifications.add((charity_number, key))
 
-        charity = Charity.objects.filter(
-            registered_charity_number=record["registered_charity_number"]
-        ).first()
-        if not charity:
-            charity = Charity(
-                registered_charity_number=record["registered_charity_number"]
+    def save_charities(self) -> None:
+        if not self.charity_records:
+            return
+        name_index = self.charity_record_fields.index("registered_charity_name")
+        names = [row[name_index] for row in self.charity_records]
+        charities = [
+            Charity(
+                **dict(zip(self.charity_record_fields, row)),
+                display_name=display_name,
+                normalised_name=normalised_name,
             )
-        for key, value in record.items():
-            if key in self.charity_fields:
-                setattr(charity, key, value)
-        charity.save()
+            for row, display_name, normalised_name in zip(
+                self.charity_records,
+                to_titlecase_many(names),
+                normalise_name_many(names),
+            )
+        ]
 
-        for name in names:
-            charity.names.get_or_create(
-                name=name,
-                defaults={"language": "en"},
+        self.charity_writer.write_objects(charities)
+        self.logger(f"Saved {len(charities):,.0f} charities")
+        self.charity_records = []
+
+    def save_charity_names(self) -> None:
+        existing_names = set(CharityName.objects.values_list("charity_id", "name"))
+        with BulkWriter(
+            CharityName, batch_size=self.page_size, staged=self.bulk_session
+        ) as writer:
+            writer.write_objects(
+                CharityName(charity_id=charity_id, name=name, language="en")
+                for charity_id, name in self.charity_names
+                if (charity_id, name) not in existing_names
             )
 
-        charity.classifications.set(
-            [
-                self._get_classification_category(c, classification_type)
-                for c, classification_type in classifications
+    def save_charity_classifications(self) -> None:
+        # the links to report classifications are rebuilt by
+        # `update_latest_financial_years`
+        Charity.classifications.through.objects.filter(
+            charityclassificationcategory__classification_type__in=[
+                ClassificationTypes.CHARITY_CLASSIFICATION,
+                ClassificationTypes.OPERATES_IN,
+                ClassificationTypes.CHARITABLE_PURPOSE,
             ]
-        )
-
-    def get_annual_reports_classifications(
-        self, ws: openpyxl.worksheet.worksheet.Worksheet
-    ) -> set[tuple[str, ClassificationTypes]]:
-        self.logger("Finding annual report classification categories...")
-        # import Annual Reports sheet
-        headers = [cell.value.strip() if cell.value else None for cell in ws[2]]
-        charity_classifications = set()
-        for i, row in enumerate(
-            tqdm(
-                ws.iter_rows(min_row=3, values_only=True),
-                desc="Processing annual reports",
-                total=ws.max_row - 2,
+        ).delete()
+        with BulkWriter(
+            Charity.classifications.through,
+            ["charity_id", "charityclassificationcategory_id"],
+            batch_size=self.page_size,
+            ignore_conflicts=True,
+            staged=self.bulk_session,
+        ) as writer:
+            writer.write(
+                (charity_id, self.classification_ids[key])
+                for charity_id, key in self.charity_classifications
             )
-        ):
-            if not any(row):
-                break
-            _, classifications = self.get_annual_report(dict(zip(headers, row)))
-            charity_classifications.update(classifications)
-        self.logger("Finished finding annual report classification categories.")
-        return charity_classifications
 
     def get_annual_report(
         self, record: dict
     ) -> tuple[dict, set[tuple[str, ClassificationTypes]]]:
-        record = {
-            slugify(k).replace("-", "_").replace("__", "_").replace("__", "_"): (
-                v if v != "" else None
-            )
-            for k, v in record.items()
-            if k and k != "Registered Charity Name"
-        }
         record["charity_id"] = int(record.pop("registered_charity_number_rcn"))
 
         classifications = set()
@@ -285,158 +396,136 @@ class Command(BaseCommand):
                     classifications.add((c, classification_type))
         return record, classifications
 
-    def add_annual_report(self, record: dict) -> None:
-        record, classifications = self.get_annual_report(record)
-        charity_fy, created = CharityFinancialYear.objects.update_or_create(
-            charity_id=record["charity_id"],
-            period_end_date=record["period_end_date"].date(),
-            defaults={
-                key: value
-                for key, value in record.items()
-                if key in self.charity_account_fields
-            },
-        )
-        charity_fy.classifications.set(
-            [
-                self._get_classification_category(c, classification_type)
-                for c, classification_type in classifications
-            ]
+    def _register_classification(
+        self, key: tuple[str, ClassificationTypes]
+    ) -> tuple[str, ClassificationTypes]:
+        # categories are saved in bulk by `add_classification_categories`
+        if key not in self.classification_ids:
+            self.new_classifications.add(key)
+        return key
+
+    def add_classification_categories(self) -> None:
+        new_classifications = self.new_classifications - self.classification_ids.keys()
+        self.new_classifications = set()
+        if not new_classifications:
+            return
+        self.logger(
+            f"Adding {len(new_classifications):,.0f} classification categories..."
         )
-
-    def add_classification_categories(
-        self, classifications: set[tuple[str, ClassificationTypes]]
-    ) -> None:
-        self.logger("Adding classification categories...")
-        for classification, classification_type in tqdm(
-            classifications, desc="Processing classification categories"
-        ):
-            self._get_classification_category(classification, classification_type)
-        self.logger("Finished adding classification categories.")
-
-    def _get_classification_category(
-        self, classification: str, classification_type: ClassificationTypes
-    ) -> CharityClassificationCategory:
-        key = (classification, classification_type)
-        if key in self.classification_cache:
-            return self.classification_cache[key]
-        category = CharityClassificationCategory.objects.filter(
-            classification_type=classification_type,
-            classification_en=classification,
-        ).first()
-        if not category:
-            category = CharityClassificationCategory.objects.filter(
-                classification_type=classification_type,
-                classification_ga=classification,
-            ).first()
-        if not category:
-            category = CharityClassificationCategory.objects.create(
-                classification_type=classification_type,
-                classification_en=classification,
+        classification_types = {t for _, t in new_classifications}
+
+        def find_existing():
+            # match on the Irish name first, so a match on the English name wins
+            categories = CharityClassificationCategory.objects.filter(
+                classification_type__in=classification_types
+            ).values_list(
+                "id", "classification_type", "classification_ga", "classification_en"
+            )
+            for category_id, classification_type, *names in categories:
+                for name in names:
+                    key = (name, classification_type)
+                    if name and key in new_classifications:
+                        self.classification_ids[key] = category_id
+
+        find_existing()
+        missing = new_classifications - self.classification_ids.keys()
+        if missing:
+            writer = BulkWriter(
+                CharityClassificationCategory,
+                batch_size=self.page_size,
+                ignore_conflicts=True,
+            )
+            writer.write_objects(
+                CharityClassificationCategory(
+                    classification_type=classification_type,
+                    classification_en=classification,
+                )
+                for classification, classification_type in missing
             )
-        self.classification_cache[key] = category
-        return category
+            find_existing()
+        self.logger("Finished adding classification categories.")
 
     def add_annual_reports(self, ws: openpyxl.worksheet.worksheet.Worksheet) -> None:
         self.logger("Importing annual reports...")
         # import Annual Reports sheet
-        self.classifications: set[tuple[str, ClassificationTypes]] = set()
+        self.financial_years = []
+        self.financial_year_classifications = set()
         accounts_seen = set()
 
-        def generate_annual_reports():
-            headers = [cell.value.strip() if cell.value else None for cell in ws[2]]
-            for i, row in enumerate(
-                tqdm(
-                    ws.iter_rows(min_row=3, values_only=True),
-                    desc="Processing annual reports",
-                    total=ws.max_row - 2,
-                )
+        transform = self._get_row_transformer(ws, exclude="registered_charity_name")
+        self.financial_year_writer = BulkWriter(
+            CharityFinancialYear,
+            batch_size=self.page_size,
+            conflict_fields=["charity_id", "period_end_date"],
+            update_fields=FINANCIAL_YEAR_UPDATE_FIELDS,
+            staged=self.bulk_session,
+        )
+        with self.financial_year_writer:
+            for record in self._iter_records(
+                ws, transform, desc="Processing annual reports"
             ):
-                if not any(row):
-                    break
-                record, classifications = self.get_annual_report(
-                    dict(zip(headers, row))
-                )
+                record, classifications = self.get_annual_report(record)
+                fy_key = (record["charity_id"], record["period_end_date"].date())
                 for c in classifications:
-                    self.classifications.add(
-                        (
-                            record["charity_id"],
-                            record["period_end_date"].date(),
-                            self._get_classification_category(c[0], c[1]),
-                        )
-                    )
+                    self._register_classification(c)
+                    self.financial_year_classifications.add((*fy_key, c))
 
-                key = (record["charity_id"], record["period_end_date"].date())
-                if key in accounts_seen:
-                    print("Duplicate account for", key)
+                if fy_key in accounts_seen:
+                    self.logger(f"Duplicate account for {fy_key}", error=True)
                     continue
-                accounts_seen.add(key)
-
-                yield CharityFinancialYear(
-                    **{
-                        key: value
-                        for key, value in record.items()
-                        if key in self.charity_account_fields
-                    }
+                accounts_seen.add(fy_key)
+
+                self.financial_years.append(
+                    CharityFinancialYear(
+                        **{
+                            key: value
+                            for key, value in record.items()
+                            if key in self.charity_account_fields
+                        }
+                    )
                 )
-
-        CharityFinancialYear.objects.bulk_create(
-            generate_annual_reports(),
-            batch_size=self.page_size,
-            update_conflicts=True,
-            unique_fields=["charity_id", "period_end_date"],
-            update_fields=[
-                "period_start_date",
-                "activity_description",
-                "income_government_or_local_authorities",
-                "income_other_public_bodies",
-                "income_philantrophic_organisations",
-                "income_donations",
-                "income_trading_and_commercial_activities",
-                "income_other_sources",
-                "income_bequests",
-                "gross_income",
-                "gross_expenditure",
-                "surplus_deficit_for_the_period",
-                "cash_at_hand_and_in_bank",
-                "other_assets",
-                "total_assets",
-                "total_liabilities",
-                "net_assets_liabilities",
-                "gross_income_schools",
-                "gross_expenditure_schools",
-                "number_of_employees",
-                "number_of_full_time_employees",
-                "number_of_part_time_employees",
-                "number_of_volunteers",
-            ],
-        )
-
+                if len(self.financial_years) >= self.page_size:
+                    self.save_financial_years()
+            self.save_financial_years()
+        self.logger(self.financial_year_writer.summary())
         self.logger("Finished importing annual reports.")
 
+        self.add_classification_categories()
         self.logger("Importing annual report classifications...")
         self.logger("Fetching existing financial years...")
         lookup = {
-            (cfy.charity_id, cfy.period_end_date): cfy.id
-            for cfy in CharityFinancialYear.objects.all()
+            (charity_id, period_end_date): fy_id
+            for fy_id, charity_id, period_end_date in (
+                CharityFinancialYear.objects.values_list(
+                    "id", "charity_id", "period_end_date"
+                )
+            )
         }
         self.logger("Finished fetching existing financial years.")
 
         def bulk_classifications():
-            for charity_id, fyend, classification in tqdm(
-                self.classifications, desc="Processing classifications"
+            for charity_id, fyend, key in tqdm(
+                self.financial_year_classifications, desc="Processing classifications"
             ):
-                yield CharityFinancialYear.classifications.through(
-                    charityfinancialyear_id=lookup[(charity_id, fyend)],
-                    charityclassificationcategory=classification,
-                )
+                yield (lookup[(charity_id, fyend)], self.classification_ids[key])
 
-        CharityFinancialYear.classifications.through.objects.bulk_create(
-            bulk_classifications(),
+        with BulkWriter(
+            CharityFinancialYear.classifications.through,
+            ["charityfinancialyear_id", "charityclassificationcategory_id"],
             batch_size=self.page_size,
             ignore_conflicts=True,
-        )
+            staged=self.bulk_session,
+        ) as writer:
+            writer.write(bulk_classifications())
         self.logger("Finished importing annual report classifications.")
 
+    def save_financial_years(self) -> None:
+        if not self.financial_years:
+            return
+        self.financial_year_writer.write_objects(self.financial_years)
+        self.logger(f"Saved {len(self.financial_years):,.0f} financial years")
+        self.financial_years = []
+
     def extract_website(self, text: str) -> str | None:
         import re
 
@@ -448,49 +537,52 @@ class Command(BaseCommand):
         return None
 
     def update_latest_financial_years(self) -> None:
-        # Update the latest financial years for all charities
-        latest_fy = (
-            CharityFinancialYear.objects.values("charity_id")
-            .annotate(max_fyend=models.Max("period_end_date"))
-            .values("charity_id", "max_fyend")
-        )
-        classifications_to_update = CharityClassificationCategory.objects.filter(
-            classification_type__in=[
-                ClassificationTypes.REPORT_ACTIVITY,
-                ClassificationTypes.BENEFICIARIES,
-            ]
-        ).values_list("id", flat=True)
-        for latest_fy in tqdm(latest_fy, desc="Updating latest financial years"):
-            latest = CharityFinancialYear.objects.get(
-                charity_id=latest_fy["charity_id"],
-                period_end_date=latest_fy["max_fyend"],
-            )
+        self.logger("Updating latest financial years...")
+        connection = self._get_connection()
+        quote_name = connection.ops.quote_name
+        names = {
+            "charity": quote_name(Charity._meta.db_table),
+            "financial_year": quote_name(CharityFinancialYear._meta.db_table),
+            "charity_classifications": quote_name(
+                Charity.classifications.through._meta.db_table
+            ),
+            "financial_year_classifications": quote_name(
+                CharityFinancialYear.classifications.through._meta.db_table
+            ),
+        }
+        latest_sql = LATEST_FINANCIAL_YEAR_SQL.format(**names)
 
-            updates = dict(
-                latest_financial_year_end=latest_fy["max_fyend"],
-                latest_income=latest.gross_income,
-                latest_expenditure=latest.gross_expenditure,
-                latest_activity_description=latest.activity_description,
-                latest_activity_description_ga=latest.activity_description_ga,
+        with connection.cursor() as cursor:
+            # latest_* columns
+            cursor.execute(UPDATE_LATEST_SQL.format(latest=latest_sql, **names))
+            self.logger(
+                f"Updated latest financial year for {cursor.rowcount:,.0f} charities"
             )
 
-            # look for a website in the latest_activity_description field
-            website = self.extract_website(latest.activity_description)
-            if website:
-                updates["website"] = website
+            # look for a website in the latest activity description
+            cursor.execute(
+                f"SELECT charity_id, activity_description FROM ({latest_sql}) latest"
+            )
+            websites = []
+            for charity_id, activity_description in cursor.fetchall():
+                website = self.extract_website(activity_description or "")
+                if website:
+                    websites.append(
+                        Charity(registered_charity_number=charity_id, website=website)
+                    )
+            Charity.objects.bulk_update(
+                websites, ["website"], batch_size=self.page_size
+            )
 
-            Charity.objects.filter(
-                registered_charity_number=latest_fy["charity_id"]
-            ).update(**updates)
+            # replace the charity classifications that come from annual
+            # reports with the ones from each charity's latest report
             Charity.classifications.through.objects.filter(
-                charityclassificationcategory_id__in=classifications_to_update
-            ).delete()
-            Charity.classifications.through.objects.bulk_create(
-                [
-                    Charity.classifications.through(
-                        charityclassificationcategory_id=id,
-                        charity_id=latest.charity_id,
-                    )
-                    for id in latest.classifications.values_list("id", flat=True)
+                charityclassificationcategory__classification_type__in=[
+                    ClassificationTypes.REPORT_ACTIVITY,
+                    ClassificationTypes.BENEFICIARIES,
                 ]
+            ).delete()
+            cursor.execute(
+                INSERT_LATEST_CLASSIFICATIONS_SQL.format(latest=latest_sql, **names)
             )
+        self.logger("Finished updating latest financial years.")
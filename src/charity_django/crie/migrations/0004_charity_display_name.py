@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("crie", "0003_alter_charity_latest_expenditure_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="charity",
+            name="display_name",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=255,
+                null=True,
+                verbose_name="Name",
+            ),
+        ),
+    ]
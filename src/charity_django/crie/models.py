@@ -1,5 +1,8 @@
 from django.db import models
 
+from charity_django.utils.search import NameSearchQuerySet
+from charity_django.utils.text import normalise_name, to_titlecase
+
 # Report Activity
 # Beneficiaries
 
@@ -144,6 +147,22 @@ class Charity(models.Model):
         db_index=True,
         verbose_name="Registered Charity Name",
     )
+    display_name = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Name",
+    )
+    normalised_name = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Normalised name",
+    )
     status = models.CharField(
         max_length=255,
         verbose_name="Status",
@@ -227,6 +246,8 @@ class Charity(models.Model):
         db_constraint=False,
     )
 
+    objects = NameSearchQuerySet.as_manager()
+
     @property
     def org_id(self):
         return f"IE-CHY-{self.registered_charity_number}"
@@ -238,6 +259,15 @@ class Charity(models.Model):
             org_ids.append(f"IE-CRO-{self.cro_number}")
         return org_ids
 
+    def save(self, *args, **kwargs):
+        self.display_name = to_titlecase(self.registered_charity_name)
+        self.normalised_name = normalise_name(self.registered_charity_name)
+        super().save(*args, **kwargs)
+
+    @property
+    def name(self):
+        return self.display_name or to_titlecase(self.registered_charity_name)
+
     def __str__(self) -> str:
         return f"{self.registered_charity_name} [{self.registered_charity_number}]"
 
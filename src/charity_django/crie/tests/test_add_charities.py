@@ -0,0 +1,192 @@
+import datetime
+import tempfile
+
+import openpyxl
+from django.test import TestCase
+
+from charity_django.crie.management.commands.import_crie import Command
+from charity_django.crie.models import (
+    Charity,
+    CharityClassificationCategory,
+    CharityFinancialYear,
+    CharityName,
+    ClassificationTypes,
+)
+
+HEADERS = [
+    "Registered Charity Number",
+    "Registered Charity Name",
+    "Also Known As",
+    "Status",
+    "Charitable Purpose",
+]
+
+ANNUAL_REPORT_HEADERS = [
+    "Registered Charity Number (RCN)",
+    "Registered Charity Name",
+    "Period End Date",
+    "Gross Income",
+    "Report Activity",
+]
+
+
+class AddCharitiesTestCase(TestCase):
+    def setUp(self):
+        self.report_activity = CharityClassificationCategory.objects.create(
+            classification_type=ClassificationTypes.REPORT_ACTIVITY,
+            classification_en="Report activity",
+        )
+        charity = Charity.objects.create(
+            registered_charity_number=1,
+            registered_charity_name="OLD NAME",
+            latest_income=100,
+        )
+        charity.names.create(name="OLD NAME", language="en")
+        charity.classifications.add(
+            self.report_activity,
+            CharityClassificationCategory.objects.create(
+                classification_type=ClassificationTypes.CHARITABLE_PURPOSE,
+                classification_en="Old purpose",
+            ),
+        )
+
+    def get_command(self):
+        command = Command()
+        command.classification_ids = {}
+        command.new_classifications = set()
+        command.charity_fields = [
+            f.get_attname_column()[1]
+            for f in Charity._meta.fields
+            if f.get_attname_column()[1] != "registered_charity_number"
+        ]
+        command.charity_account_fields = [
+            f.get_attname_column()[1] for f in CharityFinancialYear._meta.fields
+        ]
+        return command
+
+    def get_worksheet(self, rows, ws=None, title="Public Register", headers=HEADERS):
+        if ws is None:
+            ws = openpyxl.Workbook().active
+        ws.title = title
+        ws.append([title])
+        ws.append(headers)
+        for row in rows:
+            ws.append(row)
+        return ws
+
+    def test_add_charities(self):
+        self.get_command().add_charities(
+            self.get_worksheet(
+                [
+                    (1, "NEW NAME", "Other Name", "Registered", "Education; Health"),
+                    (2, "SECOND CHARITY", None, "Registered", "Education"),
+                ]
+            )
+        )
+
+        charity = Charity.objects.get(registered_charity_number=1)
+        self.assertEqual(charity.registered_charity_name, "NEW NAME")
+        self.assertEqual(charity.display_name, "New Name")
+        self.assertEqual(charity.normalised_name, "new name")
+        # fields not in the register are kept
+        self.assertEqual(charity.latest_income, 100)
+        self.assertEqual(
+            set(charity.names.values_list("name", flat=True)),
+            {"OLD NAME", "NEW NAME", "Other Name"},
+        )
+        self.assertEqual(
+            set(charity.classifications.values_list("classification_en", flat=True)),
+            {"Education", "Health", "Report activity"},
+        )
+
+        charity = Charity.objects.get(registered_charity_number=2)
+        self.assertEqual(
+            set(charity.classifications.values_list("classification_en", flat=True)),
+            {"Education"},
+        )
+        self.assertEqual(CharityName.objects.filter(charity=charity).count(), 1)
+
+    def test_add_charities_queries(self):
+        command = self.get_command()
+        command.add_charities(
+            self.get_worksheet([(1, "CHARITY", None, "Registered", "Education")])
+        )
+
+        # once the classification categories are cached, the number of
+        # queries doesn't depend on the number of charities
+        ws = self.get_worksheet(
+            [
+                (number, f"CHARITY {number}", f"Other {number}", None, "Education")
+                for number in range(1, 50)
+            ]
+        )
+        with self.assertNumQueries(5):
+            command.add_charities(ws)
+        self.assertEqual(Charity.objects.count(), 49)
+
+    def test_import_workbook(self):
+        self.check_import_workbook(self.get_command())
+
+    def test_import_workbook_staged(self):
+        command = self.get_command()
+        command.bulk_session = True
+        # each table is published once, after every page has been staged
+        command.page_size = 1
+        self.check_import_workbook(command)
+
+    def check_import_workbook(self, command):
+        wb = openpyxl.Workbook()
+        self.get_worksheet(
+            [
+                (1, "NEW NAME", None, "Registered", "Education"),
+                (2, "SECOND CHARITY", None, "Registered", "Education"),
+            ],
+            ws=wb.active,
+        )
+        self.get_worksheet(
+            [
+                (
+                    1,
+                    "NEW NAME",
+                    datetime.datetime(2022, 12, 31),
+                    200,
+                    "Report activity",
+                ),
+                (1, "NEW NAME", datetime.datetime(2021, 12, 31), 100, "Old activity"),
+                (2, "SECOND CHARITY", datetime.datetime(2022, 12, 31), 50, None),
+            ],
+            ws=wb.create_sheet(),
+            title="Annual Reports",
+            headers=ANNUAL_REPORT_HEADERS,
+        )
+        with tempfile.NamedTemporaryFile(suffix=".xlsx") as f:
+            wb.save(f.name)
+            command.import_workbook(f.name)
+
+        self.assertEqual(CharityFinancialYear.objects.count(), 3)
+        # each category is only created once, and existing ones are reused
+        self.assertEqual(
+            CharityClassificationCategory.objects.filter(
+                classification_en__in=["Education", "Report activity", "Old activity"]
+            ).count(),
+            3,
+        )
+        charity = Charity.objects.get(registered_charity_number=1)
+        self.assertEqual(charity.latest_income, 200)
+        self.assertEqual(
+            set(charity.classifications.all()),
+            {
+                self.report_activity,
+                CharityClassificationCategory.objects.get(
+                    classification_en="Education"
+                ),
+            },
+        )
+        self.assertEqual(
+            set(
+                CharityFinancialYear.objects.get(
+                    charity_id=1, period_end_date=datetime.date(2021, 12, 31)
+                ).classifications.values_list("classification_en", flat=True)
+            ),
+            {"Old activity"},
+        )
@@ -0,0 +1,77 @@
+import datetime
+
+from django.test import TestCase
+
+from charity_django.crie.management.commands.import_crie import Command
+from charity_django.crie.models import (
+    Charity,
+    CharityClassificationCategory,
+    CharityFinancialYear,
+    ClassificationTypes,
+)
+
+
+class UpdateLatestFinancialYearsTestCase(TestCase):
+    def setUp(self):
+        self.purpose = CharityClassificationCategory.objects.create(
+            classification_type=ClassificationTypes.CHARITABLE_PURPOSE,
+            classification_en="Advancement of education",
+        )
+        self.old_activity = CharityClassificationCategory.objects.create(
+            classification_type=ClassificationTypes.REPORT_ACTIVITY,
+            classification_en="Old activity",
+        )
+        self.new_activity = CharityClassificationCategory.objects.create(
+            classification_type=ClassificationTypes.REPORT_ACTIVITY,
+            classification_en="New activity",
+        )
+        for number in (1, 2, 3):
+            charity = Charity.objects.create(
+                registered_charity_number=number,
+                registered_charity_name=f"Charity {number}",
+            )
+            charity.classifications.add(self.purpose, self.old_activity)
+        for number, year, income, description in [
+            (1, 2021, 100, "Old report"),
+            (1, 2022, 200, "See https://example.com for more"),
+            (2, 2020, 300, None),
+        ]:
+            financial_year = CharityFinancialYear.objects.create(
+                charity_id=number,
+                period_end_date=datetime.date(year, 12, 31),
+                gross_income=income,
+                gross_expenditure=income // 2,
+                activity_description=description,
+            )
+            financial_year.classifications.add(
+                self.new_activity if year == 2022 else self.old_activity
+            )
+
+    def test_update_latest_financial_years(self):
+        Command().update_latest_financial_years()
+
+        charity = Charity.objects.get(registered_charity_number=1)
+        self.assertEqual(charity.latest_financial_year_end, datetime.date(2022, 12, 31))
+        self.assertEqual(charity.latest_income, 200)
+        self.assertEqual(charity.latest_expenditure, 100)
+        self.assertEqual(charity.website, "https://example.com")
+        self.assertEqual(
+            set(charity.classifications.all()), {self.purpose, self.new_activity}
+        )
+
+        charity = Charity.objects.get(registered_charity_number=2)
+        self.assertEqual(charity.latest_income, 300)
+        self.assertIsNone(charity.website)
+        self.assertEqual(
+            set(charity.classifications.all()), {self.purpose, self.old_activity}
+        )
+
+        # no financial years, so only the classifications from the register
+        charity = Charity.objects.get(registered_charity_number=3)
+        self.assertIsNone(charity.latest_financial_year_end)
+        self.assertEqual(set(charity.classifications.all()), {self.purpose})
+
+    def test_update_latest_financial_years_queries(self):
+        # the number of queries doesn't depend on the number of charities
+        with self.assertNumQueries(5):
+            Command().update_latest_financial_years()
@@ -0,0 +1,190 @@
+import random
+import re
+from unittest import TestCase
+
+from charity_django.crie.utils import (
+    ENGLISH_WORDS,
+    _parse_classification,
+    detect_language,
+    detect_language_many,
+    parse_classification,
+    parse_classification_many,
+)
+
+LESSER = (
+    ". The following classification is of lesser importance than the one listed above: "
+)
+NOT_LESSER = (
+    ". The following classification is not of lesser importance"
+    " than the one listed above: "
+)
+
+
+def reference_parse_classification(value):
+    """The character by character implementation, used to check the tokenising one"""
+    classifications = (
+        value.replace(NOT_LESSER, ";;;").replace(LESSER, ";;;").split(";;;")
+    )
+
+    def process_buffer(value):
+        return value.strip().replace(" / ", "/")
+
+    for c in classifications:
+        buffer = ""
+        bracket_level = 0
+        for char in c:
+            if char in ["[", "("]:
+                bracket_level += 1
+                if buffer.strip() and bracket_level <= 2:
+                    yield process_buffer(buffer)
+                    buffer = ""
+                if bracket_level > 2:
+                    buffer += char
+            elif char in ["]", ")"]:
+                if buffer.strip() and bracket_level <= 2:
+                    yield process_buffer(buffer)
+                    buffer = ""
+                if bracket_level > 2:
+                    buffer += char
+                bracket_level -= 1
+            elif char == ";":
+                if buffer.strip():
+                    yield process_buffer(buffer)
+                buffer = ""
+            else:
+                buffer += char
+        if buffer.strip():
+            yield process_buffer(buffer)
+
+
+REFERENCE_PHRASES = [
+    re.compile(rf"\b{word}\b", re.IGNORECASE) for word in ENGLISH_WORDS
+]
+
+
+def reference_detect_language(text):
+    """The implementation with a regex for each word"""
+    text = text.lower()
+    irish_chars = sum(text.count(c) for c in "áéíóúÁÉÍÓÚ")
+    english_count = 0
+    for phrase in REFERENCE_PHRASES:
+        if phrase.search(text):
+            english_count += 1
+    if irish_chars and not english_count:
+        return "ga"
+    return "en"
+
+
+CLASSIFICATIONS = [
+    "Education, Research [Primary Education (Schools)]",
+    "Health [Hospitals / Clinics; Mental Health (Counselling)]",
+    "Arts, Culture, Heritage, Science [Music (Choirs)]",
+    "Social Services [Children & Youth Services]",
+    "Religion [Christian (Catholic)]",
+    "Local Development, Housing [Community Development]",
+    "Recreation, Sports [Sports Clubs (GAA (Hurling))]",
+]
+
+NAMES = [
+    "Cumann Lúthchleas Gael",
+    "Naíonra an Chláir",
+    "Scoil Náisiúnta Mhuire",
+    "St. Mary's Parish Choir",
+    "The Community Fund Limited",
+    "Comhaltas Ceoltóirí Éireann",
+    "Gaelscoil Uí Ríordáin",
+    "Cork Film Festival",
+    "Ionad Pobail",
+]
+
+
+def classification_fixtures(count=1_000):
+    # classification text is repeated across lots of charities
+    rng = random.Random(44)
+    values = [
+        rng.choice([LESSER, NOT_LESSER]).join(
+            rng.sample(CLASSIFICATIONS, rng.randint(1, 3))
+        )
+        for _ in range(200)
+    ]
+    return [rng.choice(values) for _ in range(count)]
+
+
+class TestParseClassification(TestCase):
+    def test_parse_classification(self):
+        self.assertEqual(
+            list(
+                parse_classification(
+                    "Education, Research [Primary Education (Schools); Other]"
+                    + LESSER
+                    + "Health [Hospitals / Clinics]"
+                )
+            ),
+            [
+                "Education, Research",
+                "Primary Education",
+                "Schools",
+                "Other",
+                "Health",
+                "Hospitals/Clinics",
+            ],
+        )
+
+    def test_parse_classification_matches_reference(self):
+        cases = [
+            "",
+            "Education",
+            " ; ; ",
+            "A [B (C (D) E) F] G",
+            "A [B (C [D (E) F] G) H]",
+            "A] B (C",
+            "A;;;B [C;;;D] E",
+            "A;;;;B",
+            "A. B. C.",
+            "A [B]" + NOT_LESSER + "C (D" + LESSER + "E) F",
+        ] + CLASSIFICATIONS
+        for value in cases:
+            with self.subTest(value=value):
+                self.assertEqual(
+                    list(parse_classification(value)),
+                    list(reference_parse_classification(value)),
+                )
+
+    def test_parse_classification_many(self):
+        values = classification_fixtures(1_000)
+        self.assertEqual(
+            parse_classification_many(values),
+            [tuple(reference_parse_classification(value)) for value in values],
+        )
+        self.assertEqual(parse_classification_many([]), [])
+
+    def test_parse_classification_uncached(self):
+        values = classification_fixtures()
+        self.assertEqual(
+            [_parse_classification.__wrapped__(value) for value in values],
+            [tuple(reference_parse_classification(value)) for value in values],
+        )
+
+
+class TestDetectLanguage(TestCase):
+    def test_detect_language(self):
+        self.assertEqual(detect_language("Cumann Lúthchleas Gael"), "ga")
+        self.assertEqual(detect_language("CUMANN LÚTHCHLEAS GAEL"), "ga")
+        self.assertEqual(detect_language("Ionad Pobail"), "en")
+        self.assertEqual(detect_language("Comhaltas Ceoltóirí Éireann Ltd"), "en")
+        # words are only matched whole
+        self.assertEqual(detect_language("Scoil Théatre"), "ga")
+
+    def test_detect_language_many(self):
+        self.assertEqual(
+            detect_language_many(NAMES),
+            [reference_detect_language(name) for name in NAMES],
+        )
+        self.assertEqual(detect_language_many([]), [])
+
+    def test_detect_language_many_matches_reference(self):
+        rng = random.Random(44)
+        values = [rng.choice(NAMES) + f" {i % 500}" for i in range(1_000)]
+        expected = [reference_detect_language(value) for value in values]
+        self.assertEqual([detect_language(value) for value in values], expected)
+        self.assertEqual(detect_language_many(values), expected)
@@ -1,49 +1,71 @@
 import re
-from typing import Generator
+from functools import lru_cache
+from typing import Generator, Iterable
+
+
+CLASSIFICATION_CACHE_SIZE = 10_000
+
+# one token at a time: the phrase (or ";;;") that starts the next
+# classification, an opening or closing bracket, a separator or a run of text
+CLASSIFICATION_TOKENS = re.compile(
+    r"(?P<next>\. The following classification is (?:not )?of lesser importance"
+    r" than the one listed above: |;;;)"
+    r"|(?P<open>[\[(])"
+    r"|(?P<close>[\])])"
+    r"|(?P<separator>;)"
+    r"|(?P<text>[^\[\]();.]+|\.)"
+)
+
+
+@lru_cache(maxsize=CLASSIFICATION_CACHE_SIZE)
+def _parse_classification(value: str) -> tuple[str, ...]:
+    results = []
+    buffer = []
+    bracket_level = 0
+
+    def process_buffer():
+        item = "".join(buffer).strip()
+        if item:
+            results.append(item.replace(" / ", "/"))
+        buffer.clear()
+
+    for match in CLASSIFICATION_TOKENS.finditer(value):
+        kind = match.lastgroup
+        if kind == "text":
+            buffer.append(match.group())
+            continue
+        if kind == "open":
+            bracket_level += 1
+        elif kind == "close":
+            bracket_level -= 1
+        elif kind == "next":
+            bracket_level = 0
+        # brackets nested more than two deep are part of the classification
+        if (kind == "open" and bracket_level > 2) or (
+            kind == "close" and bracket_level >= 2
+        ):
+            buffer.append(match.group())
+            continue
+        process_buffer()
+    process_buffer()
+    return tuple(results)
 
 
 def parse_classification(value: str) -> Generator[str, None, None]:
-    classifications = (
-        value.replace(
-            ". The following classification is not of lesser importance than the one listed above: ",
-            ";;;",
-        )
-        .replace(
-            ". The following classification is of lesser importance than the one listed above: ",
-            ";;;",
-        )
-        .split(";;;")
-    )
-
-    def process_buffer(value: str):
-        return value.strip().replace(" / ", "/")
-
-    for i, c in enumerate(classifications):
-        buffer = ""
-        bracket_level = 0
-        for char in c:
-            if char in ["[", "("]:
-                bracket_level += 1
-                if buffer.strip() and bracket_level <= 2:
-                    yield process_buffer(buffer)
-                    buffer = ""
-                if bracket_level > 2:
-                    buffer += char
-            elif char in ["]", ")"]:
-                if buffer.strip() and bracket_level <= 2:
-                    yield process_buffer(buffer)
-                    buffer = ""
-                if bracket_level > 2:
-                    buffer += char
-                bracket_level -= 1
-            elif char == ";":
-                if buffer.strip():
-                    yield process_buffer(buffer)
-                buffer = ""
-            else:
-                buffer += char
-        if buffer.strip():
-            yield process_buffer(buffer)
+    yield from _parse_classification(value)
+
+
+def parse_classification_many(values: Iterable[str]) -> list[tuple[str, ...]]:
+    """
+    Parse a list of classification values, returning the results in the same
+    order. Each distinct value is only parsed once.
+    """
+    values = list(values)
+    results = {}
+    for value in values:
+        if value not in results:
+            results[value] = _parse_classification(value)
+    return [results[value] for value in values]
 
 
 def parse_classification_simple(value: str) -> Generator[str, None, None]:
@@ -54,55 +76,64 @@ def parse_classification_simple(value: str) -> Generator[str, None, None]:
             yield c
 
 
-ENGLISH_PHRASES = [
-    re.compile(rf"\b{word.lower()}\b", re.IGNORECASE)
-    for word in [
-        "the",
-        "limited",
-        "and",
-        "of",
-        "charity",
-        "company",
-        "guarantee",
-        "association",
-        "foundation",
-        "housing",
-        "school",
-        "blood",
-        "scout",
-        "group",
-        "development",
-        "ltd",
-        "community",
-        "playgroup",
-        "residential",
-        "enterprise",
-        "center",
-        "resource",
-        "choir",
-        "festival",
-        "music",
-        "staff",
-        "fund",
-        "college",
-        "theatre",
-        "healthcare",
-        "social",
-        "inclusion",
-        "ministries",
-        "ireland",
-    ]
+ENGLISH_WORDS = [
+    "the",
+    "limited",
+    "and",
+    "of",
+    "charity",
+    "company",
+    "guarantee",
+    "association",
+    "foundation",
+    "housing",
+    "school",
+    "blood",
+    "scout",
+    "group",
+    "development",
+    "ltd",
+    "community",
+    "playgroup",
+    "residential",
+    "enterprise",
+    "center",
+    "resource",
+    "choir",
+    "festival",
+    "music",
+    "staff",
+    "fund",
+    "college",
+    "theatre",
+    "healthcare",
+    "social",
+    "inclusion",
+    "ministries",
+    "ireland",
 ]
+ENGLISH_PHRASES = re.compile(
+    r"\b(?:{})\b".format("|".join(ENGLISH_WORDS)), re.IGNORECASE
+)
+IRISH_CHARACTERS = re.compile(r"[áéíóú]")
 
 
 def detect_language(text: str) -> str:
     """A very basic language detection based on character frequency."""
     text = text.lower()
-    irish_chars = sum(text.count(c) for c in "áéíóúÁÉÍÓÚ")
-    english_count = 0
-    for phrase in ENGLISH_PHRASES:
-        if phrase.search(text):
-            english_count += 1
-    if irish_chars and not english_count:
+    if IRISH_CHARACTERS.search(text) and not ENGLISH_PHRASES.search(text):
         return "ga"
     return "en"
+
+
+def detect_language_many(values: Iterable[str]) -> list[str]:
+    """
+    Detect the language of a list of values, returning the results in the
+    same order. Each distinct value is only checked once.
+    """
+    values = list(values)
+    results = {}
+    for value in values:
+        if value not in results:
+            results[value] = detect_language(value)
+    return [results[value] for value in values]
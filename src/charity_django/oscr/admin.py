@@ -5,7 +5,7 @@ from charity_django.oscr.models import (
     Charity,
     CharityFinancialYear,
 )
-from charity_django.utils.admin import CharitySizeListFilter
+from charity_django.utils.admin import CharitySizeListFilter, NameSearchMixin
 
 
 class OSCRCharitySizeListFilter(CharitySizeListFilter):
@@ -17,13 +17,13 @@ class CharityFinancialYearInline(admin.TabularInline):
     model = CharityFinancialYear
 
 
-class CharityAdmin(admin.ModelAdmin):
+class CharityAdmin(NameSearchMixin, admin.ModelAdmin):
     list_display = (
-        "charity_name",
+        "display_name",
         "charity_number",
         "charity_status",
     )
-    list_display_links = ("charity_name",)
+    list_display_links = ("display_name",)
     list_filter = (
         "charity_status",
         OSCRCharitySizeListFilter,
@@ -33,6 +33,7 @@ class CharityAdmin(admin.ModelAdmin):
         "charity_name",
         "charity_number",
     )
+    name_search_id_fields = ("charity_number",)
     inlines = [
         CharityFinancialYearInline,
     ]
@@ -4,13 +4,13 @@ import logging
 import random
 import re
 import zipfile
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 
-import psycopg2.extras
 import requests_cache
+from django.apps import apps
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.db import connections, router, transaction
-from django.db.utils import OperationalError, ProgrammingError
 from django.utils.text import slugify
 
 from charity_django.oscr.models import (
@@ -19,6 +19,15 @@ from charity_django.oscr.models import (
     CharityFinancialYear,
     ClassificationTypes,
 )
+from charity_django.utils.bulk import (
+    STAGING_ORDER_FIELD,
+    BulkWriter,
+    add_bulk_session_argument,
+    import_session,
+)
+from charity_django.utils.maintenance import add_analyze_arguments, analyze_tables
+from charity_django.utils.rows import RowTransformer, date_parser, split_quoted_list
+from charity_django.utils.text import normalise_name_many, to_titlecase_many
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -36,12 +45,52 @@ classification_fields = list(
     for f in CharityClassification._meta.fields
     if f.name != "id"
 )
+date_fields = [
+    "registered_date",
+    "ceased_date",
+    "year_end",
+    "date_annual_return_received",
+    "next_year_end_date",
+]
+int_fields = [
+    "mailing_cycle",
+    "most_recent_year_income",
+    "most_recent_year_expenditure",
+    "donations_and_legacies_income",
+    "charitable_activities_income",
+    "other_trading_activities_income",
+    "investments_income",
+    "other_income",
+    "raising_funds_spending",
+    "charitable_activities_spending",
+    "other_spending",
+]
+array_fields = [
+    "purposes",
+    "beneficiaries",
+    "activities",
+]
+parse_oscr_date = date_parser("%d/%m/%Y")
 insolvency_regex = re.compile(r"\(?subject to insolvency proceedings\)?", re.IGNORECASE)
 
+CREATE_LATEST_SQL = """
+CREATE TEMPORARY TABLE {latest} (row_order INTEGER, charity_number VARCHAR(255))
+"""
+
+# only the rows for the latest record of each charity are published from the
+# staging tables
+LATEST_CHARITY_SQL = "{order_field} IN (SELECT row_order FROM {latest})"
+LATEST_CHARITY_ID_SQL = "charity_id IN (SELECT charity_number FROM {latest})"
+
+
+def oscr_field_name(header):
+    return slugify(header.strip().replace("/", "_")).replace("-", "_")
+
 
 class Command(BaseCommand):
     help = "Import OSCR data from a zip file"
     page_size = 10_000
+    bulk_session = False
 
     base_urls = (
         "https://www.oscr.org.uk/download/charity-register",
@@ -63,6 +112,14 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--sample", type=int, default=0)
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Write rows to staging tables as they are read, rather than "
+            "holding every register in memory",
+        )
+        add_analyze_arguments(parser)
+        add_bulk_session_argument(parser)
 
     def handle(self, *args, **options):
         self.session = requests_cache.CachedSession(
@@ -70,33 +127,37 @@ class Command(BaseCommand):
             expire_after=timedelta(days=1),
         )
         self.sample = options.get("sample")
+        self.stream = options.get("stream")
+        self.bulk_session = options.get("bulk_session")
 
         self.charities = {}
         self.financial_years = {}
         self.charity_classification = set()
 
-        self.fetch_file()
-
-    def _execute_many(self, cursor, statement, values):
-        connection = self._get_connection()
-        try:
-            if connection.vendor == "postgresql":
-                psycopg2.extras.execute_values(
-                    cursor,
-                    statement,
-                    values,
-                    page_size=self.page_size,
-                )
+        with import_session(self._get_db(), enabled=self.bulk_session):
+            if self.stream:
+                self.create_staging_tables()
+                try:
+                    self.fetch_file()
+                finally:
+                    self.drop_staging_tables()
             else:
-                cursor.executemany(
-                    statement,
-                    values,
-                )
-        except (OperationalError, ProgrammingError) as e:
-            self.logger(e, error=True)
-            self.logger(statement, error=True)
-            self.logger(values[0:10], error=True)
-            raise
+                self.fetch_file()
+
+        if options.get("analyze", True):
+            tables = [Charity, CharityFinancialYear, CharityClassification]
+            analyze_tables(
+                tables,
+                using=self._get_db(),
+                vacuum=tables if options.get("vacuum") else (),
+            )
+
+        # add geography to the reloaded rows, which also rebuilds the summary
+        # tables, as they are grouped by country and region
+        if apps.is_installed("charity_django.postcodes"):
+            call_command("update_postcode_geography", register=["oscr"])
+        elif apps.is_installed("charity_django.utils"):
+            call_command("update_charity_aggregates", register=["oscr"])
 
     def fetch_file(self):
         self.files = {}
@@ -112,76 +173,52 @@ class Command(BaseCommand):
             for file_ in z.infolist():
                 self.logger("Opening: {}".format(file_.filename))
                 with z.open(file_) as csvfile:
-                    reader = csv.DictReader(io.TextIOWrapper(csvfile, encoding="utf8"))
-                    rowcount = 0
+                    reader = csv.reader(io.TextIOWrapper(csvfile, encoding="utf8"))
+                    transform = self.get_row_transformer(next(reader, []))
                     for row in reader:
-                        rowcount += 1
-                        self.add_charity(row)
+                        if row:
+                            self.add_charity(transform(row))
             z.close()
-        self.save_charities()
-
-    def add_charity(self, record):
-        record = {
-            slugify(k.strip().replace("/", "_")).replace("-", "_"): v.strip()
-            if v
-            not in (
-                "",
-                "-",
-                "-, -",
-            )
-            else None
-            for k, v in record.items()
-            if k
-        }
+        if self.stream:
+            self.save_staged_charities()
+        else:
+            self.save_charities()
+
+    def get_row_transformer(self, headers):
+        return RowTransformer(
+            headers,
+            field_name=oscr_field_name,
+            null_values=("", "-", "-, -"),
+            strip=True,
+            converters={
+                **{k: parse_oscr_date for k in date_fields},
+                **{k: int for k in int_fields},
+                **{k: split_quoted_list for k in array_fields},
+            },
+        )
 
+    def clean_record(self, record):
+        """
+        Clean a record from one of the register files, returning the record
+        and a list of the charity's classifications.
+        """
         # array fields
-        for k in [
-            "purposes",
-            "beneficiaries",
-            "activities",
-        ]:
-            if record.get(k):
-                reader = csv.reader([record[k]], delimiter=",", quotechar="'")
-                record[k] = list(next(reader))
-                for classification_record in record[k]:
-                    if classification_record.strip():
-                        self.charity_classification.add(
-                            (
-                                record["charity_number"],
-                                ClassificationTypes[k.upper()],
-                                classification_record.strip(),
-                            )
+        classifications = []
+        for k in array_fields:
+            for classification_record in record.get(k) or []:
+                if classification_record.strip():
+                    classifications.append(
+                        (
+                            record["charity_number"],
+                            ClassificationTypes[k.upper()],
+                            classification_record.strip(),
                         )
+                    )
 
         # date fields
-        for k, format_ in [
-            ("registered_date", "%d/%m/%Y"),
-            ("ceased_date", "%d/%m/%Y"),
-            ("year_end", "%d/%m/%Y"),
-            ("date_annual_return_received", "%d/%m/%Y"),
-            ("next_year_end_date", "%d/%m/%Y"),
-        ]:
-            if record.get(k):
-                record[k] = datetime.strptime(record[k], format_).date()
-                if record[k] == date(1970, 1, 1):
-                    record[k] = None
-
-        # int fields
-        for k in [
-            "mailing_cycle",
-            "most_recent_year_income",
-            "most_recent_year_expenditure",
-            "donations_and_legacies_income",
-            "charitable_activities_income",
-            "other_trading_activities_income",
-            "investments_income",
-            "other_income",
-            "raising_funds_spending",
-            "charitable_activities_spending",
-            "other_spending",
-        ]:
-            if isinstance(record.get(k), str):
-                record[k] = int(record[k])
+        for k in date_fields:
+            if record.get(k) == date(1970, 1, 1):
+                record[k] = None
 
         # website field
         if record.get("website") and not record.get("website").startswith("http"):
@@ -193,14 +230,6 @@ class Command(BaseCommand):
         if record.get("postcode"):
             record["postcode"] = record["postcode"].upper()
 
-        # add charity financial year to list
-        if record["year_end"]:
-            self.financial_years[(record["charity_number"], record["year_end"])] = {
-                k: v for k, v in record.items() if k in fy_fields
-            } | {
-                "charity_id": record["charity_number"],
-            }
-
         # replace "subject to insolvency proceedings" in charity name
         if insolvency_regex.search(record["charity_name"]):
             record["charity_name"] = re.sub(
@@ -211,19 +240,41 @@ class Command(BaseCommand):
             else:
                 record["notes"] = "Subject to insolvency proceedings."
 
+        return record, classifications
+
+    def get_financial_year(self, record):
+        return {k: v for k, v in record.items() if k in fy_fields} | {
+            "charity_id": record["charity_number"],
+        }
+
+    def is_latest(self, latest_year_end, year_end):
+        # the record with the latest year end is kept for each charity, with
+        # the first one seen winning a tie
+        return not (latest_year_end and latest_year_end >= year_end)
+
+    def add_charity(self, record):
+        record, classifications = self.clean_record(record)
+        if self.stream:
+            self.stage_charity(record, classifications)
+            return
+
+        self.charity_classification.update(classifications)
+
+        # add charity financial year to list
+        if record["year_end"]:
+            self.financial_years[(record["charity_number"], record["year_end"])] = (
+                self.get_financial_year(record)
+            )
+
         # check whether we have seen this charity before
         if record["charity_number"] in self.charities:
             latest_data = self.charities[record["charity_number"]]
-            if (
-                latest_data["year_end"]
-                and latest_data["year_end"] >= record["year_end"]
-            ):
+            if not self.is_latest(latest_data["year_end"], record["year_end"]):
                 return
         self.charities[record["charity_number"]] = record
 
     def save_charities(self):
         db = self._get_db()
-        connection = connections[db]
 
         if self.sample:
             self.logger("Sampling {:,.0f} charities".format(self.sample))
@@ -240,75 +291,171 @@ class Command(BaseCommand):
             }
             self.logger("Sampled {:,.0f} charities".format(len(self.charities)))
 
-        with connection.cursor() as cursor, transaction.atomic(using=db):
+        # add display and normalised names
+        names = [c["charity_name"] for c in self.charities.values()]
+        for record, display_name, normalised_name in zip(
+            self.charities.values(),
+            to_titlecase_many(names),
+            normalise_name_many(names),
+        ):
+            record["display_name"] = display_name
+            record["normalised_name"] = normalised_name
+
+        with transaction.atomic(using=db):
             # delete existing charities
             Charity.objects.all().delete()
+            CharityClassification.objects.all().delete()
 
-            # insert new charities
-            statement = (
-                """INSERT INTO "{table}" ("{fields}") VALUES {placeholder};""".format(
-                    table=Charity._meta.db_table,
-                    fields='", "'.join(char_fields),
-                    placeholder="(" + ", ".join(["%s" for f in char_fields]) + ")"
-                    if connection.vendor == "sqlite"
-                    else "%s",
-                )
-            )
-            self._execute_many(
-                cursor,
-                statement,
-                [[c.get(f) for f in char_fields] for c in self.charities.values()],
-            )
-            self.logger("Finished table insert [{}]".format(Charity._meta.db_table))
-
-            # insert financial years
-            statement = """INSERT INTO "{table}" ("{fields}") VALUES {placeholder}
-                    ON CONFLICT(charity_id, year_end) DO UPDATE
-                    SET {on_conflict}""".format(
-                table=CharityFinancialYear._meta.db_table,
-                fields='", "'.join(fy_fields),
-                placeholder="(" + ", ".join(["%s" for f in fy_fields]) + ")"
-                if connection.vendor == "sqlite"
-                else "%s",
-                on_conflict=", ".join(
+            for writer, rows in [
+                (
+                    BulkWriter(
+                        Charity, char_fields, using=db, staged=self.bulk_session
+                    ),
+                    ([c.get(f) for f in char_fields] for c in self.charities.values()),
+                ),
+                (
+                    BulkWriter(
+                        CharityFinancialYear,
+                        fy_fields,
+                        using=db,
+                        conflict_fields=["charity_id", "year_end"],
+                        staged=self.bulk_session,
+                    ),
                     (
-                        '"{}" = excluded."{}"'.format(f, f)
-                        for f in fy_fields
-                        if f not in ("charity_id", "year_end")
-                    )
+                        [c.get(f) for f in fy_fields]
+                        for c in self.financial_years.values()
+                    ),
+                ),
+                (
+                    BulkWriter(
+                        CharityClassification,
+                        classification_fields,
+                        using=db,
+                        staged=self.bulk_session,
+                    ),
+                    self.charity_classification,
                 ),
+            ]:
+                with writer:
+                    writer.write(rows)
+                self.logger(writer.summary())
+
+    def create_staging_tables(self):
+        db = self._get_db()
+        connection = connections[db]
+        self.staging_writers = {
+            Charity: BulkWriter(Charity, char_fields, using=db, staged=True),
+            CharityFinancialYear: BulkWriter(
+                CharityFinancialYear,
+                fy_fields,
+                using=db,
+                conflict_fields=["charity_id", "year_end"],
+                staged=True,
+            ),
+            CharityClassification: BulkWriter(
+                CharityClassification,
+                classification_fields,
+                using=db,
+                ignore_conflicts=True,
+                staged=True,
+            ),
+        }
+        self.staged_rows = {model: [] for model in self.staging_writers}
+        self.latest_table = "staging_oscr_latest"
+        # the year end and row order of the latest record for each charity
+        self.latest_rows = {}
+        self.row_order = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                CREATE_LATEST_SQL.format(
+                    latest=connection.ops.quote_name(self.latest_table)
+                )
             )
-            self._execute_many(
-                cursor,
-                statement,
-                [[c.get(f) for f in fy_fields] for c in self.financial_years.values()],
+
+    def drop_staging_tables(self):
+        for writer in self.staging_writers.values():
+            writer.drop_staging_table()
+        connection = self._get_connection()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DROP TABLE IF EXISTS {}".format(
+                    connection.ops.quote_name(self.latest_table)
+                )
             )
-            self.logger(
-                "Finished table insert [{}]".format(CharityFinancialYear._meta.db_table)
+
+    def stage_charity(self, record, classifications):
+        # each record adds one row to the charity staging table, so this
+        # matches the order the staged row is given by its writer
+        row_order = self.row_order
+        self.row_order += 1
+        charity_number = record["charity_number"]
+        latest = self.latest_rows.get(charity_number)
+        if latest is None or self.is_latest(latest[0], record["year_end"]):
+            self.latest_rows[charity_number] = (record["year_end"], row_order)
+
+        self.staged_rows[Charity].append([record.get(f) for f in char_fields])
+        if record["year_end"]:
+            financial_year = self.get_financial_year(record)
+            self.staged_rows[CharityFinancialYear].append(
+                [financial_year.get(f) for f in fy_fields]
+            )
+        self.staged_rows[CharityClassification].extend(classifications)
+        if len(self.staged_rows[Charity]) >= self.page_size:
+            self.flush_staging_tables()
+
+    def flush_staging_tables(self):
+        # add display and normalised names
+        charities = self.staged_rows[Charity]
+        name_index = char_fields.index("charity_name")
+        display_index = char_fields.index("display_name")
+        normalised_index = char_fields.index("normalised_name")
+        names = [row[name_index] for row in charities]
+        for row, display_name, normalised_name in zip(
+            charities, to_titlecase_many(names), normalise_name_many(names)
+        ):
+            row[display_index] = display_name
+            row[normalised_index] = normalised_name
+
+        for model, writer in self.staging_writers.items():
+            writer.write(self.staged_rows[model])
+            self.staged_rows[model] = []
+
+    def save_staged_charities(self):
+        self.flush_staging_tables()
+        db = self._get_db()
+        quote_name = connections[db].ops.quote_name
+
+        latest_rows = self.latest_rows
+        if self.sample:
+            self.logger("Sampling {:,.0f} charities".format(self.sample))
+            self.logger("Population of {:,.0f} charities".format(len(latest_rows)))
+            charity_numbers = random.sample(list(latest_rows.keys()), self.sample)
+            latest_rows = {k: latest_rows[k] for k in charity_numbers}
+            self.logger("Sampled {:,.0f} charities".format(len(latest_rows)))
+
+        with transaction.atomic(using=db):
+            BulkWriter(
+                self.latest_table, ["row_order", "charity_number"], using=db
+            ).write(
+                (row_order, charity_number)
+                for charity_number, (_, row_order) in latest_rows.items()
             )
 
             # delete existing charities
+            Charity.objects.all().delete()
             CharityClassification.objects.all().delete()
 
-            # insert new charities
-            statement = (
-                """INSERT INTO "{table}" ("{fields}") VALUES {placeholder};""".format(
-                    table=CharityClassification._meta.db_table,
-                    fields='", "'.join(classification_fields),
-                    placeholder="("
-                    + ", ".join(["%s" for f in classification_fields])
-                    + ")"
-                    if connection.vendor == "sqlite"
-                    else "%s",
-                )
-            )
-            self._execute_many(
-                cursor,
-                statement,
-                tuple(self.charity_classification),
-            )
-            self.logger(
-                "Finished table insert [{}]".format(
-                    CharityClassification._meta.db_table
+            # publish the rows to keep from the staging tables
+            for model, where in [
+                (Charity, LATEST_CHARITY_SQL),
+                (CharityFinancialYear, LATEST_CHARITY_ID_SQL),
+                (CharityClassification, LATEST_CHARITY_ID_SQL),
+            ]:
+                writer = self.staging_writers[model]
+                writer.publish(
+                    where=where.format(
+                        order_field=quote_name(STAGING_ORDER_FIELD),
+                        latest=quote_name(self.latest_table),
+                    )
                 )
-            )
+                self.logger(writer.summary())
@@ -1,5 +1,9 @@
 from django.db import models
 
+from charity_django.utils.geography import PostcodeGeography
+from charity_django.utils.search import NameSearchQuerySet
+from charity_django.utils.text import normalise_name, to_titlecase
+
 
 class ClassificationTypes(models.TextChoices):
     """Classification types"""
@@ -9,7 +13,7 @@ class ClassificationTypes(models.TextChoices):
     ACTIVITIES = "Activities"
 
 
-class Charity(models.Model):
+class Charity(PostcodeGeography, models.Model):
     charity_number = models.CharField(
         max_length=255,
         verbose_name="Charity Number",
@@ -20,6 +24,22 @@ class Charity(models.Model):
         db_index=True,
         verbose_name="Charity Name",
     )
+    display_name = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Name",
+    )
+    normalised_name = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Normalised name",
+    )
     registered_date = models.DateField(
         verbose_name="Registered Date",
     )
@@ -198,6 +218,8 @@ class Charity(models.Model):
         verbose_name="Regulatory Type",
     )
 
+    objects = NameSearchQuerySet.as_manager()
+
     @property
     def purposes(self):
         return self.classifications.filter(
@@ -220,6 +242,15 @@ class Charity(models.Model):
     def org_id(self):
         return f"GB-SC-{self.charity_number}"
 
+    def save(self, *args, **kwargs):
+        self.display_name = to_titlecase(self.charity_name)
+        self.normalised_name = normalise_name(self.charity_name)
+        super().save(*args, **kwargs)
+
+    @property
+    def name(self):
+        return self.display_name or to_titlecase(self.charity_name)
+
     def __str__(self):
         return f"{self.charity_name} [{self.charity_number}]"
 
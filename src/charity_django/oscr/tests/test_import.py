@@ -0,0 +1,210 @@
+import csv
+import io
+import sys
+import unittest.mock
+import zipfile
+
+import pytest
+import requests
+import requests_mock
+from django.db.models import Sum
+from django.test import TestCase
+
+from charity_django.oscr.management.commands.import_oscr import Command as OSCRCommand
+from charity_django.oscr.models import (
+    Charity,
+    CharityClassification,
+    CharityFinancialYear,
+)
+from charity_django.postcodes.models import Postcode
+from charity_django.utils.models import CharityAggregate
+
+HEADERS = [
+    "Charity Number",
+    "Charity Name",
+    "Registered Date",
+    "Charity Status",
+    "Notes",
+    "Postcode",
+    "Year End",
+    "Most recent year income",
+    "Purposes",
+]
+
+REGISTERS = [
+    [
+        (
+            "SC000001",
+            "FIRST CHARITY",
+            "01/01/2000",
+            "Active",
+            "",
+            "eh1 1aa",
+            "31/03/2023",
+            "100",
+            "'Education','Health'",
+        ),
+        (
+            "SC000003",
+            "Third Charity (Subject to insolvency proceedings)",
+            "01/01/2001",
+            "Active",
+            "",
+            "XX0 0XX",
+            "31/12/2022",
+            "50",
+            "",
+        ),
+    ],
+    [
+        (
+            "SC000001",
+            "FIRST CHARITY",
+            "01/01/2000",
+            "Active",
+            "",
+            "EH1 1AA",
+            "31/03/2022",
+            "80",
+            "'Education','Arts'",
+        ),
+        # a second row for the same year end
+        (
+            "SC000001",
+            "FIRST CHARITY",
+            "01/01/2000",
+            "Active",
+            "Tab\there",
+            "EH1 1AA",
+            "31/03/2023",
+            "90",
+            "'Education'",
+        ),
+    ],
+    [
+        (
+            "SC000002",
+            "Removed Charity",
+            "01/01/1990",
+            "Removed",
+            "",
+            "",
+            "",
+            "",
+            "",
+        ),
+    ],
+]
+
+
+class MockSession(requests.Session):
+    def __init__(self, *args, **kwargs):
+        kwargs.pop("expire_after", None)
+        super().__init__(*[], **kwargs)
+
+
+@pytest.fixture(scope="function", autouse=True)
+def disable_requests_cache():
+    """Replace CachedSession with a regular Session for all test functions"""
+    with unittest.mock.patch("requests_cache.CachedSession", MockSession):
+        yield
+
+
+class ImportOSCRTestCase(TestCase):
+    def _mock_downloads(self, m):
+        for url, rows in zip(OSCRCommand.base_urls, REGISTERS):
+            data = io.StringIO()
+            writer = csv.writer(data)
+            writer.writerow(HEADERS)
+            writer.writerows(rows)
+            content = io.BytesIO()
+            with zipfile.ZipFile(content, "w") as z:
+                z.writestr("register.csv", data.getvalue())
+            m.get(url, content=content.getvalue())
+
+    def _import(self, **options):
+        command = OSCRCommand()
+        command.stdout = sys.stdout
+        with requests_mock.Mocker() as m:
+            self._mock_downloads(m)
+            command.handle(**options)
+
+    def _snapshot(self):
+        return (
+            list(Charity.objects.order_by("charity_number").values()),
+            list(
+                CharityFinancialYear.objects.order_by("charity_id", "year_end").values(
+                    "charity_id", "year_end", "most_recent_year_income"
+                )
+            ),
+            set(
+                CharityClassification.objects.values_list(
+                    "charity_id", "classification_type", "classification"
+                )
+            ),
+        )
+
+    def test_charity_import(self):
+        self._import()
+
+        charity = Charity.objects.get(charity_number="SC000001")
+        self.assertEqual(charity.most_recent_year_income, 100)
+        self.assertEqual(charity.postcode, "EH1 1AA")
+        self.assertEqual(charity.display_name, "First Charity")
+        self.assertEqual(set(charity.purposes), {"Education", "Health", "Arts"})
+        self.assertEqual(
+            dict(
+                charity.financial_years.values_list(
+                    "year_end__year", "most_recent_year_income"
+                )
+            ),
+            {2022: 80, 2023: 90},
+        )
+
+        charity = Charity.objects.get(charity_number="SC000003")
+        self.assertEqual(charity.charity_name, "Third Charity")
+        self.assertEqual(charity.notes, "Subject to insolvency proceedings.")
+        self.assertIsNone(charity.postcode)
+
+        self.assertEqual(Charity.objects.count(), 3)
+
+    def test_charity_import_geography(self):
+        Postcode.objects.create(
+            PCD="EH1 1AA",
+            PCDS="EH1 1AA",
+            local_authority_id="S12000036",
+            country_id="S92000003",
+        )
+        self._import()
+
+        charity = Charity.objects.get(charity_number="SC000001")
+        self.assertEqual(charity.geo_laua, "S12000036")
+        self.assertEqual(charity.geo_ctry, "S92000003")
+        # the summary tables are rebuilt once the geography has been added
+        self.assertEqual(
+            CharityAggregate.objects.filter(
+                register="oscr", country="S92000003"
+            ).aggregate(count=Sum("charity_count"))["count"],
+            1,
+        )
+
+    def test_charity_import_stream(self):
+        self._import()
+        expected = self._snapshot()
+        self._import(stream=True)
+        self.assertEqual(self._snapshot(), expected)
+
+    def test_charity_import_bulk_session(self):
+        self._import()
+        expected = self._snapshot()
+        self._import(bulk_session=True)
+        self.assertEqual(self._snapshot(), expected)
+
+    def test_charity_import_stream_sample(self):
+        self._import(stream=True, sample=1)
+        self.assertEqual(Charity.objects.count(), 1)
+        self.assertFalse(
+            CharityFinancialYear.objects.exclude(
+                charity_id__in=Charity.objects.values("charity_number")
+            ).exists()
+        )
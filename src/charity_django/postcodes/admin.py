@@ -3,6 +3,7 @@ from django.urls import reverse
 from django.utils.html import format_html, format_html_join, mark_safe
 
 from charity_django.postcodes.models import GeoCode, GeoEntity, GeoEntityGroup, Postcode
+from charity_django.utils.admin import EstimatedCountMixin
 
 
 class GeoEntityInlineAdmin(admin.TabularInline):
@@ -47,7 +48,7 @@ class GeoEntityAdmin(admin.ModelAdmin):
 
 
 @admin.register(Postcode)
-class PostcodeAdmin(admin.ModelAdmin):
+class PostcodeAdmin(EstimatedCountMixin, admin.ModelAdmin):
     list_display = ("PCDS", "local_authority", "region", "country", "DOINTR", "DOTERM")
     search_fields = ("PCDS",)
     list_filter = ("country", "region")
@@ -5,6 +5,8 @@ from django.core.management.base import BaseCommand
 from requests import Session
 from requests_cache import CachedSession
 
+from charity_django.utils.bulk import BulkWriter
+
 GEOPORTAL_API_URL = "https://hub.arcgis.com/api/search/v1/collections/all/items"
 GEOPORTAL_DATA_URL = "https://www.arcgis.com/sharing/rest/content/items/{}/data"
 
@@ -14,6 +16,8 @@ logger.setLevel(logging.INFO)
 
 
 class BaseCommand(BaseCommand):
+    bulk_session = False
+
     def get_latest_geoportal_url(self, product_code: str) -> str:
         """
         Returns the latest URL for a given product code.
@@ -84,11 +88,13 @@ class BaseCommand(BaseCommand):
         logger.info(
             "Saving {:,.0f} {} records".format(len(self.records[model]), model.__name__)
         )
-        model.objects.bulk_create(
-            self.records[model].values(),
+        with BulkWriter(
+            model,
             batch_size=self.bulk_limit,
             ignore_conflicts=True,
-        )
+            staged=self.bulk_session,
+        ) as writer:
+            writer.write_objects(self.records[model].values())
         self.object_count[model] += len(self.records[model])
         logger.info(
             "Saved {:,.0f} {} records ({:,.0f} total)".format(
@@ -16,6 +16,10 @@ from charity_django.postcodes.models import (
     GeoCode,
     Postcode,
 )
+from charity_django.utils.bulk import add_bulk_session_argument, import_session
+from charity_django.utils.cache import bump_cache_version
+from charity_django.utils.indexes import DeferredIndexes
+from charity_django.utils.maintenance import add_analyze_arguments, analyze_tables
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -123,14 +127,31 @@ class Command(BaseCommand):
             help="Maximum number of records to import",
             default=None,
         )
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help="Drop the indexes on the postcode table and rebuild them afterwards",
+        )
+        add_analyze_arguments(parser)
+        add_bulk_session_argument(parser)
 
     def handle(self, *args, **options):
         self.debug = options["debug"]
+        self.bulk_session = options.get("bulk_session")
         db = router.db_for_write(Postcode)
-        with transaction.atomic(using=db), connections[db].cursor() as cursor:
+        with (
+            import_session(db, enabled=self.bulk_session),
+            transaction.atomic(using=db),
+            connections[db].cursor() as cursor,
+        ):
             # delete all existing data
             cursor.execute(f'DELETE FROM "{Postcode._meta.db_table}" WHERE 1=1')
 
+            indexes = None
+            if options.get("defer_indexes"):
+                indexes = DeferredIndexes([Postcode], using=db)
+                indexes.drop()
+
             # import the new data
             self.set_session(install_cache=options["cache"])
 
@@ -177,6 +198,20 @@ class Command(BaseCommand):
                                     break
                     self.save_all_records()
 
+        # the indexes are rebuilt once the data is committed
+        if indexes:
+            indexes.rebuild()
+
+        if options.get("analyze", True):
+            analyze_tables(
+                [Postcode],
+                using=db,
+                vacuum=[Postcode] if options.get("vacuum") else (),
+            )
+
+        # cached counts and filters for the old data are no longer valid
+        bump_cache_version(Postcode)
+
     def parse_row(self, row):
         record = Postcode()
         for k, v in row.items():
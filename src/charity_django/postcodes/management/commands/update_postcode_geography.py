@@ -0,0 +1,178 @@
+import logging
+import time
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections, router, transaction
+from django.db.models import Max
+
+from charity_django.postcodes.models import Postcode
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# (app label, model name, postcode field) for each register to enrich
+SOURCES = (
+    ("ccew", "Charity", "charity_contact_postcode"),
+    ("oscr", "Charity", "postcode"),
+    ("companies", "Company", "RegAddress_PostCode"),
+)
+
+# fields on `PostcodeGeography` and the `Postcode` fields they are copied from
+GEOGRAPHY_FIELDS = (
+    ("geo_lsoa21", "lsoa2021"),
+    ("geo_laua", "local_authority"),
+    ("geo_rgn", "region"),
+    ("geo_ctry", "country"),
+)
+
+# postcodes are matched on the variable length version, eg "SW1A 1AA", so
+# the stored value is stripped of spaces and the space added back before
+# the inward code. The CASE stops short values reaching SUBSTR.
+MATCH_SQL = """p.{pcds} = CASE
+    WHEN LENGTH({clean}) BETWEEN 5 AND 7
+    THEN SUBSTR({clean}, 1, LENGTH({clean}) - 3) || ' ' || SUBSTR({clean}, LENGTH({clean}) - 2)
+END"""
+
+# geography from a previous run is only cleared where the postcode no
+# longer matches, as matched rows are overwritten by UPDATE_SQL
+RESET_SQL = """
+UPDATE {table}
+SET {set_null}
+WHERE ({any_not_null})
+    AND NOT EXISTS (SELECT 1 FROM {postcode_table} p WHERE {match})
+"""
+
+UPDATE_SQL = """
+UPDATE {table}
+SET {set_fields},
+    {imd_decile} = {imd_decile_sql}
+FROM {postcode_table} p
+WHERE {match}
+"""
+
+
+class Command(BaseCommand):
+    help = "Look up the area codes for the postcodes of charities and companies"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--register",
+            action="append",
+            choices=[source[0] for source in SOURCES],
+            help="Only update these registers (default is all installed registers)",
+        )
+
+    def logger(self, message, error=False):
+        if error:
+            logger.error(message)
+            return
+        logger.info(message)
+
+    def get_imd_max(self, db):
+        """
+        Highest IMD rank found in each country, as each country ranks its
+        areas separately.
+        """
+        return {
+            country: imd_max
+            for country, imd_max in Postcode.objects.using(db)
+            .filter(IMD__isnull=False, country__isnull=False)
+            .order_by()
+            .values("country")
+            .annotate(imd_max=Max("IMD"))
+            .values_list("country", "imd_max")
+            if imd_max
+        }
+
+    def get_sql(self, connection, model, postcode_field, imd_max):
+        quote_name = connection.ops.quote_name
+        postcode_column = model._meta.get_field(postcode_field).column
+        table = quote_name(model._meta.db_table)
+        columns = {
+            quote_name(model._meta.get_field(field).column): quote_name(
+                Postcode._meta.get_field(source_field).column
+            )
+            for field, source_field in GEOGRAPHY_FIELDS
+        }
+        imd_decile = quote_name(model._meta.get_field("geo_imd_decile").column)
+        postcode_table = quote_name(Postcode._meta.db_table)
+        match = MATCH_SQL.format(
+            pcds=quote_name(Postcode._meta.get_field("PCDS").column),
+            clean="UPPER(REPLACE(TRIM({}.{}), ' ', ''))".format(
+                table, quote_name(postcode_column)
+            ),
+        )
+
+        reset_sql = RESET_SQL.format(
+            table=table,
+            postcode_table=postcode_table,
+            match=match,
+            set_null=", ".join(
+                f"{column} = NULL" for column in [*columns.keys(), imd_decile]
+            ),
+            any_not_null=" OR ".join(
+                f"{column} IS NOT NULL" for column in [*columns.keys(), imd_decile]
+            ),
+        )
+
+        # rank 1 is the most deprived area, so falls in decile 1
+        imd = "p." + quote_name(Postcode._meta.get_field("IMD").column)
+        imd_decile_sql = "NULL"
+        params = []
+        if imd_max:
+            imd_decile_sql = "CASE p.{} {} END".format(
+                quote_name(Postcode._meta.get_field("country").column),
+                " ".join(f"WHEN %s THEN (({imd} - 1) * 10 / %s) + 1" for _ in imd_max),
+            )
+            for country, max_rank in imd_max.items():
+                params.extend([country, max_rank])
+
+        update_sql = UPDATE_SQL.format(
+            table=table,
+            set_fields=",\n    ".join(
+                f"{column} = p.{source_column}"
+                for column, source_column in columns.items()
+            ),
+            imd_decile=imd_decile,
+            imd_decile_sql=imd_decile_sql,
+            postcode_table=postcode_table,
+            match=match,
+        )
+        return reset_sql, update_sql, params
+
+    def handle(self, *args, **options):
+        registers = options.get("register") or [source[0] for source in SOURCES]
+        imd_max = None
+        updated_registers = []
+        for app_label, model_name, postcode_field in SOURCES:
+            if app_label not in registers:
+                continue
+            if not apps.is_installed(f"charity_django.{app_label}"):
+                self.logger(f"{app_label} app not installed, skipping")
+                continue
+            model = apps.get_model(app_label, model_name)
+            db = router.db_for_write(model)
+            if imd_max is None:
+                imd_max = self.get_imd_max(db)
+
+            start = time.perf_counter()
+            connection = connections[db]
+            reset_sql, update_sql, params = self.get_sql(
+                connection, model, postcode_field, imd_max
+            )
+            with transaction.atomic(using=db), connection.cursor() as cursor:
+                cursor.execute(reset_sql)
+                cursor.execute(update_sql, params)
+                updated = cursor.rowcount
+            updated_registers.append(app_label)
+            self.logger(
+                f"Added geography to {updated:,.0f} {app_label} records "
+                f"in {time.perf_counter() - start:.2f} seconds"
+            )
+
+        # the charity summary tables are grouped by country and region
+        charity_registers = [r for r in updated_registers if r in ("ccew", "oscr")]
+        if charity_registers and apps.is_installed("charity_django.utils"):
+            call_command("update_charity_aggregates", register=charity_registers)
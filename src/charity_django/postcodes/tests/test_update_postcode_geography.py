@@ -0,0 +1,104 @@
+import datetime
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from charity_django.ccew.models import Charity as CCEWCharity
+from charity_django.companies.models import Company
+from charity_django.oscr.models import Charity as OSCRCharity
+from charity_django.postcodes.models import Postcode
+
+
+class TestUpdatePostcodeGeography(TestCase):
+    def setUp(self):
+        for pcd, pcds, lsoa, laua, rgn, ctry, imd in [
+            (
+                "LS1 1AA",
+                "LS1 1AA",
+                "E01000001",
+                "E08000035",
+                "E12000003",
+                "E92000001",
+                1,
+            ),
+            (
+                "LS2 1AA",
+                "LS2 1AA",
+                "E01000002",
+                "E08000035",
+                "E12000003",
+                "E92000001",
+                1000,
+            ),
+            ("EH1 1AA", "EH1 1AA", "S01000001", "S12000036", None, "S92000003", 700),
+            ("EH2 1AA", "EH2 1AA", "S01000002", "S12000036", None, "S92000003", 50),
+        ]:
+            Postcode.objects.create(
+                PCD=pcd,
+                PCDS=pcds,
+                lsoa2021_id=lsoa,
+                local_authority_id=laua,
+                region_id=rgn,
+                country_id=ctry,
+                IMD=imd,
+            )
+        CCEWCharity.objects.create(
+            organisation_number=1,
+            registered_charity_number=1000001,
+            linked_charity_number=0,
+            charity_name="Leeds Charity",
+            charity_contact_postcode=" ls11aa",
+        )
+        CCEWCharity.objects.create(
+            organisation_number=2,
+            registered_charity_number=1000002,
+            linked_charity_number=0,
+            charity_name="Unknown Charity",
+            charity_contact_postcode="XX1",
+            geo_ctry="E92000001",
+        )
+        OSCRCharity.objects.create(
+            charity_number="SC000001",
+            charity_name="Edinburgh Charity",
+            registered_date=datetime.date(2000, 1, 1),
+            postcode="EH1 1AA",
+        )
+        Company.objects.create(
+            CompanyNumber="01234567",
+            CompanyName="LEEDS COMPANY LIMITED",
+            RegAddress_PostCode="LS2  1AA",
+        )
+
+    def test_update_postcode_geography(self):
+        call_command("update_postcode_geography")
+
+        charity = CCEWCharity.objects.get(organisation_number=1)
+        self.assertEqual(charity.geo_lsoa21, "E01000001")
+        self.assertEqual(charity.geo_laua, "E08000035")
+        self.assertEqual(charity.geo_rgn, "E12000003")
+        self.assertEqual(charity.geo_ctry, "E92000001")
+        self.assertEqual(charity.geo_imd_decile, 1)
+
+        # geography from a previous run is cleared if the postcode doesn't match
+        charity = CCEWCharity.objects.get(organisation_number=2)
+        self.assertIsNone(charity.geo_ctry)
+        self.assertIsNone(charity.geo_imd_decile)
+
+        charity = OSCRCharity.objects.get(charity_number="SC000001")
+        self.assertEqual(charity.geo_laua, "S12000036")
+        self.assertIsNone(charity.geo_rgn)
+        self.assertEqual(charity.geo_ctry, "S92000003")
+        self.assertEqual(charity.geo_imd_decile, 10)
+
+        company = Company.objects.get(CompanyNumber="01234567")
+        self.assertEqual(company.geo_lsoa21, "E01000002")
+        self.assertEqual(company.geo_imd_decile, 10)
+
+    def test_update_postcode_geography_register(self):
+        call_command("update_postcode_geography", register=["oscr"])
+
+        self.assertEqual(
+            OSCRCharity.objects.get(charity_number="SC000001").geo_ctry, "S92000003"
+        )
+        self.assertIsNone(CCEWCharity.objects.get(organisation_number=1).geo_ctry)
+        self.assertIsNone(Company.objects.get(CompanyNumber="01234567").geo_ctry)
@@ -1,7 +1,23 @@
+import hashlib
+import json
+
 from django.contrib import admin
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import OperationalError, connections, transaction
+from django.db.models import prefetch_related_objects
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
-from charity_django.utils.models import CommandLog
+from charity_django.utils.cache import get_cache_version, get_used_values
+from charity_django.utils.models import (
+    SIZE_BANDS,
+    CharityAggregate,
+    CommandLog,
+    OrgidMatch,
+    size_band_filter,
+)
 
 
 class ReadOnlyMixin:
@@ -15,20 +31,155 @@ class ReadOnlyMixin:
         return False
 
 
+class NameSearchMixin:
+    """
+    Search the changelist using the model's `search_name` queryset method,
+    so searches use the normalised name index rather than `icontains` on
+    each of the `search_fields`. Search terms are also matched exactly
+    against the fields in `name_search_id_fields`.
+    """
+
+    name_search_id_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        results = queryset.search_name(search_term)
+        for field_name in self.name_search_id_fields:
+            try:
+                value = self.model._meta.get_field(field_name).to_python(search_term)
+            except ValidationError:
+                continue
+            results = results | queryset.filter(**{field_name: value})
+        return results, False
+
+
+class PrefetchChangeViewMixin:
+    """
+    Load the related rows shown on the change page along with the object.
+
+    Each lookup in `change_view_prefetch` is passed to
+    `prefetch_related_objects`, so display methods that use `.all()` on
+    those relations read from the prefetched rows instead of running their
+    own queries.
+    """
+
+    change_view_prefetch = ()
+
+    def get_object(self, request, object_id, from_field=None):
+        obj = super().get_object(request, object_id, from_field=from_field)
+        if obj is not None and self.change_view_prefetch:
+            prefetch_related_objects([obj], *self.change_view_prefetch)
+        return obj
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids counting every row of very large tables.
+
+    On postgres, the count for an unfiltered table comes from the planner's
+    row estimate in `pg_class`, and filtered counts give up after
+    `count_timeout` milliseconds and use the estimate from the query plan
+    instead. Tables estimated to have fewer than `estimate_threshold` rows
+    are counted exactly. Other databases always use an exact count.
+
+    Counts are cached for each query for `count_cache_timeout` seconds, or
+    until the table's cache version is bumped by the next import. The bump
+    is only seen by other processes if they share the cache, so with a
+    per-process cache (such as the default `LocMemCache`) web workers keep
+    the old counts until they expire.
+    """
+
+    count_timeout = 1_000
+    count_cache_timeout = 60 * 60
+    estimate_threshold = 100_000
+
+    def _get_cache_key(self):
+        sql, params = self.object_list.query.sql_with_params()
+        query_hash = hashlib.md5(
+            repr((sql, params)).encode("utf8"), usedforsecurity=False
+        ).hexdigest()
+        return "charity_django:count:{}:{}:{}".format(
+            self.object_list.model._meta.label_lower,
+            get_cache_version(self.object_list.model),
+            query_hash,
+        )
+
+    def _get_table_estimate(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+                [connection.ops.quote_name(self.object_list.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        # tables that haven't been analysed yet have a negative estimate
+        if row and row[0] is not None and row[0] >= self.estimate_threshold:
+            return int(row[0])
+
+    def _get_plan_estimate(self, connection):
+        sql, params = self.object_list.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def _get_timed_count(self, connection):
+        db = self.object_list.db
+        try:
+            with transaction.atomic(using=db):
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT set_config('statement_timeout', %s, true)",
+                        [str(self.count_timeout)],
+                    )
+                count = self.object_list.count()
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL statement_timeout TO DEFAULT")
+                return count
+        except OperationalError:
+            return self._get_plan_estimate(connection)
+
+    def _get_count(self):
+        connection = connections[self.object_list.db]
+        if connection.vendor != "postgresql":
+            return self.object_list.count()
+        if not self.object_list.query.where:
+            count = self._get_table_estimate(connection)
+            if count is not None:
+                return count
+        return self._get_timed_count(connection)
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, "query"):
+            return super().count
+        cache_key = self._get_cache_key()
+        count = cache.get(cache_key)
+        if count is None:
+            count = self._get_count()
+            cache.set(cache_key, count, timeout=self.count_cache_timeout)
+        return count
+
+
+class EstimatedCountMixin:
+    """
+    Use `EstimatedCountPaginator` for the changelist, and skip the second
+    count of the whole table when the results are filtered.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 class CharitySizeListFilter(admin.SimpleListFilter):
     recent_income_field = "total_income"
     title = _("charity size")
     parameter_name = "size"
 
-    size_bands = (
-        (0, -1, 0, _("Zero income")),
-        (1, 0, 10_000, _("Under £10,000")),
-        (2, 10_000, 100_000, _("£10k - £100k")),
-        (3, 100_000, 1_000_000, _("£100k - £1m")),
-        (4, 1_000_000, 10_000_000, _("£1m - £10m")),
-        (5, 10_000_000, 100_000_000, _("£10m - £100m")),
-        (6, 100_000_000, None, _("Over £100m")),
-    )
+    size_bands = SIZE_BANDS
 
     def lookups(self, request, model_admin):
         return (("unknown", _("Unknown")),) + tuple(
@@ -40,37 +191,30 @@ class CharitySizeListFilter(admin.SimpleListFilter):
             return queryset
         if self.value() == "unknown":
             return queryset.filter(
-                **{
-                    f"{self.recent_income_field}__isnull": True,
-                }
+                size_band_filter(self.recent_income_field, size_bands=self.size_bands)
             )
         for band in self.size_bands:
             if self.value() == str(band[0]):
-                if band[2] is None:
-                    return queryset.filter(
-                        **{
-                            f"{self.recent_income_field}__gte": band[1],
-                        }
-                    )
-                else:
-                    return queryset.filter(
-                        **{
-                            f"{self.recent_income_field}__range": (
-                                band[1] + 1,
-                                band[2],
-                            ),
-                        }
-                    )
+                return queryset.filter(
+                    size_band_filter(self.recent_income_field, band[0], self.size_bands)
+                )
         return queryset
 
 
 class UsedChoicesFieldListFilter(admin.filters.ChoicesFieldListFilter):
+    """
+    Only show the choices that are used in the field.
+
+    The used values are cached until the model's cache version is bumped,
+    which happens at the end of each import, so showing the filter doesn't
+    scan the table. If the admin's queryset is filtered, only the values in
+    that queryset are shown.
+    """
+
     def __init__(self, field, request, params, model, model_admin, field_path):
         super().__init__(field, request, params, model, model_admin, field_path)
-        self.lookup_choices = list(
-            model_admin.get_queryset(request)
-            .values_list(self.field_path, flat=True)
-            .distinct()
+        self.lookup_choices = get_used_values(
+            model, self.field_path, queryset=model_admin.get_queryset(request)
         )
 
     def choices(self, changelist):
@@ -150,3 +294,25 @@ class CommandLogAdmin(admin.ModelAdmin):
 
     class Media:
         css = {"all": ("admin/css/command_log.css",)}
+
+
+@admin.register(OrgidMatch)
+class OrgidMatchAdmin(ReadOnlyMixin, admin.ModelAdmin):
+    list_display = ("orgid", "matched_orgid", "match_type", "score")
+    list_filter = ("match_type",)
+    search_fields = ("=orgid", "=matched_orgid")
+
+
+@admin.register(CharityAggregate)
+class CharityAggregateAdmin(ReadOnlyMixin, admin.ModelAdmin):
+    list_display = (
+        "register",
+        "size_band",
+        "status",
+        "charity_type",
+        "country",
+        "region",
+        "charity_count",
+        "income_total",
+    )
+    list_filter = ("register", "size_band", "country")
@@ -0,0 +1,535 @@
+import io
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, models, router
+from django.utils.functional import cached_property
+
+try:
+    import psycopg2.extras
+except ImportError:
+    psycopg2 = None
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# settings for the import connection when using `import_session`
+IMPORT_SESSION_SETTINGS = {
+    "work_mem": "256MB",
+    "maintenance_work_mem": "1GB",
+    "synchronous_commit": "off",
+}
+
+# staging tables have the same columns as the table they are loaded into,
+# plus the order the rows were written in
+STAGING_ORDER_FIELD = "bulk_row_order"
+
+CREATE_STAGING_SQL = """
+CREATE {kind} TABLE {staging} AS
+SELECT CAST(0 AS BIGINT) AS {order_field}, {fields} FROM {table} WHERE 1 = 0
+"""
+
+# when upserting, the last row written for each key is kept
+PUBLISH_UPSERT_SQL = """
+INSERT INTO {table} ({fields})
+SELECT {fields} FROM (
+    SELECT staging.*,
+        ROW_NUMBER() OVER (
+            PARTITION BY {conflict_fields} ORDER BY {order_field} DESC
+        ) AS row_rank
+    FROM {staging} staging
+    WHERE {where}
+) staging
+WHERE row_rank = 1
+{on_conflict}
+"""
+
+# the WHERE clause stops SQLite reading ON CONFLICT as part of a join
+PUBLISH_SQL = """
+INSERT INTO {table} ({fields})
+SELECT {fields} FROM {staging}
+WHERE {where}
+ORDER BY {order_field}
+{on_conflict}
+"""
+
+
+def copy_value(value):
+    """A value in the postgres COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def add_bulk_session_argument(parser):
+    """
+    Add the `--bulk-session` option to an import command.
+    """
+    parser.add_argument(
+        "--bulk-session",
+        action="store_true",
+        help="Load through unlogged staging tables, with postgres settings "
+        "tuned for bulk imports",
+    )
+
+
+@contextmanager
+def import_session(using=None, enabled=True, settings=None):
+    """
+    Change the settings of the import connection for the duration of an
+    import, resetting them afterwards.
+
+    This raises `work_mem` and `maintenance_work_mem`, and turns off
+    `synchronous_commit`, so a crash could lose the last few commits but
+    won't leave the database inconsistent. It only applies to postgres, and
+    does nothing on other databases.
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    if not enabled or connection.vendor != "postgresql":
+        yield
+        return
+    settings = settings or IMPORT_SESSION_SETTINGS
+    with connection.cursor() as cursor:
+        for name, value in settings.items():
+            cursor.execute("SELECT set_config(%s, %s, false)", [name, value])
+    logger.info(
+        "Using import session settings: {}".format(
+            ", ".join("{} = {}".format(name, value) for name, value in settings.items())
+        )
+    )
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name in settings:
+                cursor.execute("RESET {}".format(name))
+
+
+class BulkStrategy:
+    """
+    A way of writing a batch of rows to a table.
+
+    `vendors` limits the strategy to those database backends, and strategies
+    that can't handle conflicts set `supports_conflicts` to False.
+    """
+
+    name = None
+    vendors = None
+    supports_conflicts = True
+
+    def is_available(self, writer):
+        if self.vendors and writer.connection.vendor not in self.vendors:
+            return False
+        if writer.has_conflict_clause and not self.supports_conflicts:
+            return False
+        return True
+
+    def write_batch(self, cursor, writer, rows):
+        raise NotImplementedError
+
+
+class CopyStrategy(BulkStrategy):
+    """`COPY ... FROM STDIN` on postgres, the fastest way to load rows."""
+
+    name = "copy"
+    vendors = ("postgresql",)
+    supports_conflicts = False
+
+    def is_available(self, writer):
+        return psycopg2 is not None and super().is_available(writer)
+
+    def write_batch(self, cursor, writer, rows):
+        data = io.StringIO()
+        for row in rows:
+            data.write("\t".join(copy_value(v) for v in row) + "\n")
+        data.seek(0)
+        cursor.copy_expert(
+            "COPY {} ({}) FROM STDIN".format(
+                writer.quoted_target_table, writer.quoted_fields
+            ),
+            data,
+        )
+
+
+class ExecuteValuesStrategy(BulkStrategy):
+    """psycopg2's `execute_values`, which supports `ON CONFLICT`."""
+
+    name = "execute_values"
+    vendors = ("postgresql",)
+
+    def is_available(self, writer):
+        return psycopg2 is not None and super().is_available(writer)
+
+    def write_batch(self, cursor, writer, rows):
+        psycopg2.extras.execute_values(
+            cursor, writer.insert_sql("%s"), rows, page_size=len(rows)
+        )
+
+
+class ValuesStrategy(BulkStrategy):
+    """
+    A multi-row `INSERT ... VALUES (...), (...)`, split so each statement
+    stays within `max_params` query parameters, or the backend's limit.
+    """
+
+    name = "values"
+
+    def __init__(self, max_params=None):
+        self.max_params = max_params
+
+    def write_batch(self, cursor, writer, rows):
+        placeholder = "({})".format(", ".join(["%s"] * len(writer.target_fields)))
+        max_params = (
+            self.max_params or writer.connection.features.max_query_params or 10_000
+        )
+        rows_per_statement = max(1, max_params // len(writer.target_fields))
+        for start in range(0, len(rows), rows_per_statement):
+            chunk = rows[start : start + rows_per_statement]
+            cursor.execute(
+                writer.insert_sql(", ".join([placeholder] * len(chunk))),
+                [value for row in chunk for value in row],
+            )
+
+
+class ExecuteManyStrategy(BulkStrategy):
+    """`cursor.executemany`, which works on any backend and suits SQLite."""
+
+    name = "executemany"
+
+    def write_batch(self, cursor, writer, rows):
+        placeholder = "({})".format(", ".join(["%s"] * len(writer.target_fields)))
+        cursor.executemany(writer.insert_sql(placeholder), rows)
+
+
+# strategies by name, tried in this order when no strategy is given. Add
+# to this to make a new strategy available to every importer.
+BULK_STRATEGIES = {
+    strategy.name: strategy
+    for strategy in [
+        CopyStrategy(),
+        ExecuteValuesStrategy(),
+        ExecuteManyStrategy(),
+        ValuesStrategy(),
+    ]
+}
+
+
+class BulkWriter:
+    """
+    Write rows to a table in batches, with the fastest strategy the database
+    supports.
+
+    `table` is a model or the name of a table. Rows are sequences of values
+    in the order of `fields`, which default to the model's concrete fields.
+    Pass `conflict_fields` (with optional `update_fields`) to upsert, or
+    `ignore_conflicts` to skip rows that already exist.
+
+    With `adaptive` set the batch size is adjusted after each batch, aiming
+    for each one to take about `target_seconds`. The number of rows, batches
+    and time taken are kept in `rows_written`, `batches` and `seconds`.
+
+    With `staged` set the rows are written to a staging table (`UNLOGGED`
+    on postgres, temporary elsewhere), without any conflict handling, and
+    moved into the table with a single `INSERT ... SELECT` by `publish`.
+    Used as a context manager the writer publishes the rows on exit, and
+    the staging table is always dropped.
+    """
+
+    def __init__(
+        self,
+        table,
+        fields=None,
+        using=None,
+        strategy=None,
+        batch_size=10_000,
+        min_batch_size=1_000,
+        max_batch_size=100_000,
+        target_seconds=2.0,
+        adaptive=True,
+        conflict_fields=None,
+        update_fields=None,
+        ignore_conflicts=False,
+        staged=False,
+    ):
+        if isinstance(table, type) and issubclass(table, models.Model):
+            self.model = table
+            self.table = table._meta.db_table
+            using = using or router.db_for_write(table)
+        else:
+            self.model = None
+            self.table = table
+        self.using = using or DEFAULT_DB_ALIAS
+        self.connection = connections[self.using]
+
+        if fields is None:
+            fields = [f.column for f in self._concrete_fields()]
+        self.fields = [self._column(f) for f in fields]
+        self.conflict_fields = [self._column(f) for f in conflict_fields or []]
+        if update_fields is None:
+            update_fields = [f for f in self.fields if f not in self.conflict_fields]
+        self.update_fields = [self._column(f) for f in update_fields]
+        self.ignore_conflicts = ignore_conflicts
+        self.staged = staged
+        # each writer has its own staging table, so imports running at the
+        # same time don't share one
+        self.staging_table = (
+            "{}_staging_{}".format(self.table, uuid.uuid4().hex[:12])
+            if staged
+            else None
+        )
+        self.staging_created = False
+
+        self.batch_size = batch_size
+        self.min_batch_size = min(min_batch_size, batch_size)
+        self.max_batch_size = max(max_batch_size, batch_size)
+        self.target_seconds = target_seconds
+        self.adaptive = adaptive
+        self.strategy = self.get_strategy(strategy)
+
+        self.rows_written = 0
+        self.batches = 0
+        self.seconds = 0.0
+        self.publish_seconds = 0.0
+
+    def _column(self, name):
+        if self.model is None:
+            return name
+        try:
+            return self.model._meta.get_field(name).column
+        except FieldDoesNotExist:
+            return name
+
+    def _concrete_fields(self):
+        if self.model is None:
+            raise ValueError("The fields must be given when writing to a table name")
+        # database generated primary keys are left out
+        return [f for f in self.model._meta.concrete_fields if not f.db_returning]
+
+    @cached_property
+    def model_fields(self):
+        by_column = {f.column: f for f in self._concrete_fields()}
+        return [by_column[column] for column in self.fields]
+
+    @property
+    def has_conflict_clause(self):
+        # conflicts are dealt with when staged rows are published
+        if self.staged:
+            return False
+        return self.ignore_conflicts or bool(self.conflict_fields)
+
+    def get_strategy(self, strategy):
+        if isinstance(strategy, BulkStrategy):
+            return strategy
+        if strategy is not None:
+            strategy = BULK_STRATEGIES[strategy]
+            if not strategy.is_available(self):
+                raise ValueError(
+                    "The {} strategy can't be used with this table".format(
+                        strategy.name
+                    )
+                )
+            return strategy
+        for strategy in BULK_STRATEGIES.values():
+            if strategy.is_available(self):
+                return strategy
+        raise ValueError("No bulk write strategy is available")
+
+    @property
+    def quoted_table(self):
+        return self.connection.ops.quote_name(self.table)
+
+    @property
+    def quoted_target_table(self):
+        return self.connection.ops.quote_name(self.staging_table or self.table)
+
+    @property
+    def target_fields(self):
+        if self.staged:
+            return [STAGING_ORDER_FIELD] + self.fields
+        return self.fields
+
+    @property
+    def quoted_fields(self):
+        return ", ".join(self.connection.ops.quote_name(f) for f in self.target_fields)
+
+    def conflict_sql(self):
+        quote_name = self.connection.ops.quote_name
+        if self.ignore_conflicts:
+            return "ON CONFLICT DO NOTHING"
+        if not self.conflict_fields:
+            return ""
+        return "ON CONFLICT ({}) DO {}".format(
+            ", ".join(quote_name(f) for f in self.conflict_fields),
+            "UPDATE SET {}".format(
+                ", ".join(
+                    "{0} = EXCLUDED.{0}".format(quote_name(f))
+                    for f in self.update_fields
+                )
+            )
+            if self.update_fields
+            else "NOTHING",
+        )
+
+    def insert_sql(self, values):
+        sql = "INSERT INTO {} ({}) VALUES {}".format(
+            self.quoted_target_table, self.quoted_fields, values
+        )
+        if self.has_conflict_clause:
+            sql += " " + self.conflict_sql()
+        return sql
+
+    def create_staging_table(self):
+        quote_name = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                CREATE_STAGING_SQL.format(
+                    kind="UNLOGGED"
+                    if self.connection.vendor == "postgresql"
+                    else "TEMPORARY",
+                    staging=self.quoted_target_table,
+                    order_field=quote_name(STAGING_ORDER_FIELD),
+                    fields=", ".join(quote_name(f) for f in self.fields),
+                    table=self.quoted_table,
+                )
+            )
+        self.staging_created = True
+
+    def drop_staging_table(self):
+        if not self.staging_created:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS {}".format(self.quoted_target_table))
+        self.staging_created = False
+
+    def publish(self, where="1 = 1"):
+        """
+        Move the staged rows into the table, returning the number of rows
+        inserted or updated.
+
+        `where` is an SQL condition on the columns of the staging table, to
+        only publish some of the staged rows.
+        """
+        if not self.staging_created:
+            return 0
+        quote_name = self.connection.ops.quote_name
+        template = PUBLISH_UPSERT_SQL if self.conflict_fields else PUBLISH_SQL
+        start = time.perf_counter()
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                template.format(
+                    table=self.quoted_table,
+                    fields=", ".join(quote_name(f) for f in self.fields),
+                    staging=self.quoted_target_table,
+                    order_field=quote_name(STAGING_ORDER_FIELD),
+                    conflict_fields=", ".join(
+                        quote_name(f) for f in self.conflict_fields
+                    ),
+                    on_conflict=self.conflict_sql(),
+                    where=where,
+                )
+            )
+            rowcount = cursor.rowcount
+        self.publish_seconds += time.perf_counter() - start
+        self.drop_staging_table()
+        return rowcount
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.publish()
+        finally:
+            self.drop_staging_table()
+
+    def _next_batch_size(self, rows, seconds):
+        if not self.adaptive or rows < self.batch_size or seconds <= 0:
+            return self.batch_size
+        # no more than double or halve the batch size each time
+        target = int(rows / seconds * self.target_seconds)
+        target = min(max(target, self.batch_size // 2), self.batch_size * 2)
+        return min(max(target, self.min_batch_size), self.max_batch_size)
+
+    def write_batch(self, rows):
+        if not rows:
+            return
+        if self.staged:
+            if not self.staging_created:
+                self.create_staging_table()
+            rows = [
+                (order, *row) for order, row in enumerate(rows, start=self.rows_written)
+            ]
+        start = time.perf_counter()
+        with self.connection.cursor() as cursor:
+            try:
+                self.strategy.write_batch(cursor, self, rows)
+            except DatabaseError as e:
+                logger.error(e)
+                logger.error(self.insert_sql("..."))
+                logger.error(rows[0:10])
+                raise
+        seconds = time.perf_counter() - start
+        self.rows_written += len(rows)
+        self.batches += 1
+        self.seconds += seconds
+        self.batch_size = self._next_batch_size(len(rows), seconds)
+
+    def write(self, rows):
+        """
+        Write an iterable of rows, returning the number of rows written.
+        """
+        rows = iter(rows)
+        written = self.rows_written
+        while True:
+            batch = [tuple(row) for row in islice(rows, self.batch_size)]
+            if not batch:
+                break
+            self.write_batch(batch)
+        return self.rows_written - written
+
+    def write_objects(self, objs):
+        """
+        Write model instances, preparing their values as `bulk_create` does.
+        """
+        fields = self.model_fields
+        return self.write(
+            [
+                field.get_db_prep_save(field.pre_save(obj, True), self.connection)
+                for field in fields
+            ]
+            for obj in objs
+        )
+
+    @property
+    def rows_per_second(self):
+        return self.rows_written / self.seconds if self.seconds else 0
+
+    def summary(self):
+        summary = (
+            "Wrote {:,.0f} rows to {} in {:,.0f} batches ({:.2f}s, {:,.0f} rows/s, {})"
+        ).format(
+            self.rows_written,
+            self.table,
+            self.batches,
+            self.seconds,
+            self.rows_per_second,
+            self.strategy.name,
+        )
+        if self.staged:
+            summary += " through {} ({:.2f}s to publish)".format(
+                self.staging_table, self.publish_seconds
+            )
+        return summary
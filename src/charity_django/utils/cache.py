@@ -0,0 +1,130 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db import connections, router
+
+# walks the index one distinct value at a time, rather than reading every row
+LOOSE_INDEX_SCAN_SQL = """
+WITH RECURSIVE used_values (value) AS (
+    (SELECT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY {column} LIMIT 1)
+    UNION ALL
+    SELECT (
+        SELECT {column} FROM {table}
+        WHERE {column} > used_values.value
+        ORDER BY {column} LIMIT 1
+    )
+    FROM used_values
+    WHERE used_values.value IS NOT NULL
+)
+SELECT value FROM used_values WHERE value IS NOT NULL
+UNION ALL
+SELECT NULL WHERE EXISTS (SELECT 1 FROM {table} WHERE {column} IS NULL)
+"""
+
+# how long the used values are kept, even if the cache version isn't bumped
+USED_VALUES_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(model):
+    return f"charity_django:version:{model._meta.label_lower}"
+
+
+def get_cache_version(model):
+    """
+    Current version of the data in `model`'s table.
+
+    Include this in the key of anything cached from the table, so the cached
+    values are ignored once the next import has run.
+    """
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        version = 1
+        cache.add(key, version, timeout=None)
+    return version
+
+
+def bump_cache_version(*models):
+    """
+    Mark the data for each model as changed, so anything cached for the old
+    version is no longer used. Run at the end of an import.
+    """
+    for model in models:
+        key = _version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, timeout=None)
+
+
+def _get_distinct_values(model, field_name, queryset=None):
+    db = router.db_for_read(model)
+    if queryset is not None and queryset.query.has_filters():
+        return list(queryset.order_by().values_list(field_name, flat=True).distinct())
+    connection = connections[db]
+    # only fields on the model's own table can use the index directly
+    field = None if "__" in field_name else model._meta.get_field(field_name)
+    if (
+        connection.vendor == "postgresql"
+        and field is not None
+        and field.concrete
+        and (field.db_index or field.unique)
+    ):
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                LOOSE_INDEX_SCAN_SQL.format(
+                    table=quote_name(model._meta.db_table),
+                    column=quote_name(field.column),
+                )
+            )
+            return [field.to_python(row[0]) for row in cursor.fetchall()]
+    return list(
+        model._default_manager.using(db)
+        .order_by()
+        .values_list(field_name, flat=True)
+        .distinct()
+    )
+
+
+def _used_values_key(model, field_name, queryset=None):
+    key = "charity_django:used_values:{}:{}:{}".format(
+        model._meta.label_lower, field_name, get_cache_version(model)
+    )
+    if queryset is not None and queryset.query.has_filters():
+        sql, params = queryset.query.sql_with_params()
+        key += (
+            ":"
+            + hashlib.md5(
+                repr((sql, params)).encode("utf8"), usedforsecurity=False
+            ).hexdigest()
+        )
+    return key
+
+
+def get_used_values(model, field_name, refresh=False, queryset=None):
+    """
+    Distinct values found in a field of `model`, cached until the model's
+    cache version is next bumped, or for `USED_VALUES_CACHE_TIMEOUT` seconds.
+
+    If `queryset` is filtered, only the values in that queryset are used,
+    and they are cached separately for each query. On postgres, indexed
+    fields of an unfiltered table are read with a loose index scan, so a
+    cache miss doesn't need to scan the whole table.
+    """
+    cache_key = _used_values_key(model, field_name, queryset)
+    values = None if refresh else cache.get(cache_key)
+    if values is None:
+        values = _get_distinct_values(model, field_name, queryset)
+        cache.set(cache_key, values, timeout=USED_VALUES_CACHE_TIMEOUT)
+    return values
+
+
+def refresh_used_values(model, *field_names):
+    """
+    Fill the cache of used values for the fields of `model`, so the first
+    request after an import doesn't have to find them. Run after
+    `bump_cache_version`.
+    """
+    for field_name in field_names:
+        get_used_values(model, field_name, refresh=True)
@@ -0,0 +1,202 @@
+import csv
+from typing import NamedTuple
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class ExportSource(NamedTuple):
+    app_label: str
+    model_name: str
+    # rows are exported in order of this field, which needs to be unique
+    key: str
+    filters: dict = {}
+
+    @property
+    def model(self):
+        return apps.get_model(self.app_label, self.model_name)
+
+    @property
+    def fields(self):
+        return [f.attname for f in self.model._meta.concrete_fields]
+
+
+EXPORT_SOURCES = {
+    "ccew": ExportSource("ccew", "Charity", "organisation_number"),
+    "ccew-financials": ExportSource("ccew", "CharityAnnualReturnHistory", "id"),
+    "oscr": ExportSource("oscr", "Charity", "charity_number"),
+    "oscr-financials": ExportSource("oscr", "CharityFinancialYear", "id"),
+    "ccni": ExportSource("ccni", "Charity", "reg_charity_number"),
+    "crie": ExportSource("crie", "Charity", "registered_charity_number"),
+    "crie-financials": ExportSource("crie", "CharityFinancialYear", "id"),
+    "companies": ExportSource("companies", "Company", "CompanyNumber"),
+    "postcodes": ExportSource("postcodes", "Postcode", "PCD"),
+}
+
+
+def get_export_sources():
+    """
+    The export sources for the apps that are installed.
+    """
+    return {
+        name: source
+        for name, source in EXPORT_SOURCES.items()
+        if apps.is_installed(f"charity_django.{source.app_label}")
+    }
+
+
+def iter_rows(source, fields=None, page_size=50_000, chunk_size=5_000, using=None):
+    """
+    Yield every row of the source as a tuple of `fields`.
+
+    Rows are fetched a page at a time, with each page starting after the
+    last key of the page before, so a page never needs an OFFSET. Within a
+    page the rows are streamed with a server-side cursor on postgres, so
+    only `chunk_size` rows are held in memory.
+    """
+    model = source.model
+    fields = list(fields or source.fields)
+    if source.key not in fields:
+        raise ValueError(f"Fields to export must include the key `{source.key}`")
+    key_index = fields.index(source.key)
+    queryset = (
+        model._default_manager.using(using or router.db_for_read(model))
+        .filter(**source.filters)
+        .order_by(source.key)
+        .values_list(*fields)
+    )
+
+    last_key = None
+    while True:
+        page = queryset
+        if last_key is not None:
+            page = page.filter(**{f"{source.key}__gt": last_key})
+        row_count = 0
+        for row in page[:page_size].iterator(chunk_size=chunk_size):
+            row_count += 1
+            last_key = row[key_index]
+            yield row
+        if row_count < page_size:
+            return
+
+
+class CSVExportWriter:
+    binary = False
+
+    def __init__(self, file, fields, model=None):
+        self.writer = csv.writer(file)
+        self.writer.writerow(fields)
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        pass
+
+
+class JSONLinesExportWriter:
+    binary = False
+
+    def __init__(self, file, fields, model=None):
+        self.file = file
+        self.fields = fields
+        self.encoder = DjangoJSONEncoder()
+
+    def write_rows(self, rows):
+        self.file.writelines(
+            self.encoder.encode(dict(zip(self.fields, row))) + "\n" for row in rows
+        )
+
+    def close(self):
+        pass
+
+
+class ParquetExportWriter:
+    """
+    Write each batch of rows as a row group of a parquet file.
+
+    Needs the optional `pyarrow` package.
+    """
+
+    binary = True
+
+    def __init__(self, file, fields, model=None):
+        if pyarrow is None:
+            raise ImportError("pyarrow is needed to export to parquet")
+        self.fields = fields
+        self.schema = pyarrow.schema(
+            [(field, self.get_type(model, field)) for field in fields]
+        )
+        self.writer = pyarrow.parquet.ParquetWriter(file, self.schema)
+
+    def get_type(self, model, field_name):
+        # the schema comes from the model, as a batch could be all nulls
+        field = next(f for f in model._meta.concrete_fields if f.attname == field_name)
+        if field.is_relation:
+            field = field.target_field
+        internal_type = field.get_internal_type()
+        if internal_type in ("AutoField", "BigAutoField", "SmallAutoField"):
+            return pyarrow.int64()
+        if internal_type.endswith("IntegerField"):
+            return pyarrow.int64()
+        if internal_type in ("FloatField", "DecimalField"):
+            return pyarrow.float64()
+        if internal_type == "BooleanField":
+            return pyarrow.bool_()
+        if internal_type == "DateField":
+            return pyarrow.date32()
+        if internal_type == "DateTimeField":
+            return pyarrow.timestamp("us")
+        return pyarrow.string()
+
+    def write_rows(self, rows):
+        columns = list(zip(*rows))
+        self.writer.write_table(
+            pyarrow.Table.from_arrays(
+                [
+                    pyarrow.array(list(column), type=field_type)
+                    for column, field_type in zip(columns, self.schema.types)
+                ],
+                schema=self.schema,
+            )
+        )
+
+    def close(self):
+        self.writer.close()
+
+
+EXPORT_WRITERS = {
+    "csv": CSVExportWriter,
+    "jsonl": JSONLinesExportWriter,
+    "parquet": ParquetExportWriter,
+}
+
+
+def export_rows(source, file, format="csv", fields=None, batch_size=10_000, **kwargs):
+    """
+    Write all the rows of the source to `file`, `batch_size` rows at a time.
+
+    Returns the number of rows written.
+    """
+    fields = list(fields or source.fields)
+    writer = EXPORT_WRITERS[format](file, fields, model=source.model)
+    row_count = 0
+    batch = []
+    for row in iter_rows(source, fields=fields, **kwargs):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            writer.write_rows(batch)
+            row_count += len(batch)
+            batch = []
+    if batch:
+        writer.write_rows(batch)
+        row_count += len(batch)
+    writer.close()
+    return row_count
@@ -0,0 +1,48 @@
+from django.db import models
+
+
+class PostcodeGeography(models.Model):
+    """
+    Areas looked up from an organisation's postcode by the
+    `update_postcode_geography` command, so records can be grouped by area
+    without joining to the postcode table.
+    """
+
+    geo_lsoa21 = models.CharField(
+        max_length=9,
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name="Lower Super Output Area (2021)",
+    )
+    geo_laua = models.CharField(
+        max_length=9,
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name="Local Authority",
+    )
+    geo_rgn = models.CharField(
+        max_length=9,
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name="Region",
+    )
+    geo_ctry = models.CharField(
+        max_length=9,
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name="Country",
+    )
+    geo_imd_decile = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name="IMD decile",
+        help_text="Index of Multiple Deprivation decile for the postcode, from 1 (most deprived) to 10, within its country",
+    )
+
+    class Meta:
+        abstract = True
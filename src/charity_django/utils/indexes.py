@@ -0,0 +1,148 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import DEFAULT_DB_ALIAS, connections, router
+
+from charity_django.utils.search import trigram_indexes
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MAINTENANCE_WORK_MEM = "1GB"
+INDEX_WORKERS = 4
+
+
+def secondary_indexes(model, connection):
+    """
+    The name and `CREATE INDEX` statement of each secondary index on a model.
+
+    These come from the model's `_meta` in the same way as they do for
+    migrations, so they cover `db_index=True` fields (including the extra
+    `_like` indexes postgres uses for text fields) and `Meta.indexes`. The
+    trigram indexes added by `AddTrigramIndex` migrations are included too.
+    Primary keys and unique constraints are left alone.
+    """
+    schema_editor = connection.schema_editor()
+    return [
+        (str(statement.parts["name"]).strip('"'), str(statement))
+        for statement in schema_editor._model_indexes_sql(model)
+    ] + trigram_indexes(model, connection)
+
+
+def _existing_indexes(connection, table):
+    with connection.cursor() as cursor:
+        return set(connection.introspection.get_constraints(cursor, table).keys())
+
+
+def _create_index(using, sql, maintenance_work_mem, close=False):
+    connection = connections[using]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET maintenance_work_mem = %s", [maintenance_work_mem])
+            cursor.execute(sql)
+            if connection.vendor == "postgresql" and not close:
+                cursor.execute("RESET maintenance_work_mem")
+    finally:
+        if close:
+            connection.close()
+
+
+class DeferredIndexes:
+    """
+    Drop the secondary indexes on tables before they are fully reloaded, and
+    rebuild them once the data is in, which is much quicker than keeping the
+    indexes up to date row by row.
+
+    On postgres the indexes are rebuilt in parallel, with up to `workers`
+    connections, as long as `rebuild` is called once the data has been
+    committed. Inside a transaction they are rebuilt one at a time on the
+    same connection.
+    """
+
+    def __init__(
+        self,
+        models,
+        using=None,
+        maintenance_work_mem=MAINTENANCE_WORK_MEM,
+        workers=INDEX_WORKERS,
+    ):
+        self.models = list(models)
+        self.using = using or (
+            router.db_for_write(self.models[0]) if self.models else DEFAULT_DB_ALIAS
+        )
+        self.connection = connections[self.using]
+        self.maintenance_work_mem = maintenance_work_mem
+        self.workers = workers
+        self.dropped = []
+
+    def drop(self):
+        """
+        Drop the secondary indexes that exist on the tables.
+        """
+        schema_editor = self.connection.schema_editor()
+        quote_name = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            for model in self.models:
+                table = model._meta.db_table
+                existing = _existing_indexes(self.connection, table)
+                for name, sql in secondary_indexes(model, self.connection):
+                    if name not in existing:
+                        continue
+                    cursor.execute(
+                        schema_editor.sql_delete_index
+                        % {
+                            "table": quote_name(table),
+                            "name": quote_name(name),
+                        }
+                    )
+                    self.dropped.append((table, name, sql))
+                logger.info("Dropped indexes on {}".format(table))
+        logger.info("Dropped {:,.0f} indexes".format(len(self.dropped)))
+        return self.dropped
+
+    def rebuild(self):
+        """
+        Create the indexes that were dropped, skipping any that already exist.
+        """
+        existing = {}
+        statements = []
+        for table, name, sql in self.dropped:
+            if table not in existing:
+                existing[table] = _existing_indexes(self.connection, table)
+            if name not in existing[table]:
+                statements.append(sql)
+
+        start = time.perf_counter()
+        parallel = (
+            self.connection.vendor == "postgresql"
+            and not self.connection.in_atomic_block
+            and self.workers > 1
+            and len(statements) > 1
+        )
+        if parallel:
+            # each worker thread gets its own connection
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(
+                        _create_index,
+                        self.using,
+                        sql,
+                        self.maintenance_work_mem,
+                        close=True,
+                    )
+                    for sql in statements
+                ]
+                for future in futures:
+                    future.result()
+        else:
+            for sql in statements:
+                _create_index(self.using, sql, self.maintenance_work_mem)
+        self.dropped = []
+        logger.info(
+            "Rebuilt {:,.0f} indexes in {:.1f}s".format(
+                len(statements), time.perf_counter() - start
+            )
+        )
+        return len(statements)
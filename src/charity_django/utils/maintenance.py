@@ -0,0 +1,69 @@
+import argparse
+import logging
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections, router
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+ANALYZE_SQL = "ANALYZE {table}"
+VACUUM_SQL = "VACUUM (ANALYZE) {table}"
+
+
+def add_analyze_arguments(parser):
+    """
+    Add the `--analyze` and `--vacuum` options to an import command.
+    """
+    parser.add_argument(
+        "--analyze",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Analyze the imported tables once the import has finished",
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Vacuum the tables with the most changed rows as well as analyzing them",
+    )
+
+
+def analyze_tables(models, using=None, vacuum=()):
+    """
+    Refresh the query planner statistics for tables after an import, so the
+    first queries on the new data don't have to wait for autovacuum.
+
+    Models in `vacuum` are also vacuumed, which is worth doing for tables
+    where lots of rows have been updated or deleted. `VACUUM` only runs on
+    postgres outside a transaction, otherwise those tables are just analyzed.
+
+    Returns the number of seconds taken for each table.
+    """
+    models = list(dict.fromkeys(models))
+    vacuum = set(vacuum)
+    using = using or (router.db_for_write(models[0]) if models else DEFAULT_DB_ALIAS)
+    connection = connections[using]
+    can_vacuum = connection.vendor == "postgresql" and not connection.in_atomic_block
+
+    timings = {}
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        for model in models:
+            table = model._meta.db_table
+            sql = VACUUM_SQL if (model in vacuum and can_vacuum) else ANALYZE_SQL
+            table_start = time.perf_counter()
+            cursor.execute(sql.format(table=connection.ops.quote_name(table)))
+            timings[table] = time.perf_counter() - table_start
+            logger.info(
+                "{} {} ({:.1f}s)".format(
+                    "Vacuumed" if sql == VACUUM_SQL else "Analyzed",
+                    table,
+                    timings[table],
+                )
+            )
+    logger.info(
+        "Analyzed {:,.0f} tables in {:.1f}s".format(
+            len(timings), time.perf_counter() - start
+        )
+    )
+    return timings
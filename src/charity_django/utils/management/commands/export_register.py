@@ -0,0 +1,76 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from charity_django.utils.export import (
+    EXPORT_SOURCES,
+    EXPORT_WRITERS,
+    export_rows,
+    get_export_sources,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class Command(BaseCommand):
+    help = "Export all the records from a register to a CSV, JSON Lines or parquet file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", choices=list(EXPORT_SOURCES.keys()))
+        parser.add_argument(
+            "--format", choices=list(EXPORT_WRITERS.keys()), default="csv"
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to (default is to write CSV or JSON Lines to stdout)",
+        )
+        parser.add_argument(
+            "--fields",
+            nargs="+",
+            help="Only export these fields (must include the key field)",
+        )
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--page-size", type=int, default=50_000)
+
+    def logger(self, message, error=False):
+        if error:
+            logger.error(message)
+            return
+        logger.info(message)
+
+    def handle(self, *args, **options):
+        sources = get_export_sources()
+        if options["source"] not in sources:
+            raise CommandError(f"App for {options['source']} is not installed")
+        source = sources[options["source"]]
+        binary = EXPORT_WRITERS[options["format"]].binary
+
+        if options.get("output"):
+            if binary:
+                file = open(options["output"], "wb")
+            else:
+                file = open(options["output"], "w", newline="", encoding="utf8")
+        elif binary:
+            raise CommandError("An --output file is needed for this format")
+        else:
+            file = self.stdout
+
+        start = time.perf_counter()
+        try:
+            row_count = export_rows(
+                source,
+                file,
+                format=options["format"],
+                fields=options.get("fields"),
+                batch_size=options["batch_size"],
+                page_size=options["page_size"],
+            )
+        finally:
+            if file is not self.stdout:
+                file.close()
+        self.logger(
+            f"Exported {row_count:,.0f} {options['source']} records "
+            f"in {time.perf_counter() - start:.2f} seconds"
+        )
@@ -0,0 +1,287 @@
+import logging
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import NamedTuple
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from tqdm import tqdm
+
+from charity_django.utils.models import OrgidMatch
+from charity_django.utils.text import (
+    find_postcode,
+    normalise_company_number,
+    normalise_name,
+    normalise_postcode,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MatchType = OrgidMatch.MatchType
+
+MATCH_SCORES = {
+    MatchType.COMPANY_NUMBER: 1.0,
+    MatchType.NAME_POSTCODE: 0.95,
+    # multiplied by the similarity of the names
+    MatchType.SIMILAR_NAME_POSTCODE: 0.9,
+    MatchType.UNIQUE_NAME: 0.75,
+}
+
+
+class MatchRecord(NamedTuple):
+    orgid: str
+    register: str
+    name: str
+    postcode: str | None
+    company_number: str | None
+
+
+class Command(BaseCommand):
+    help = "Find organisations that appear in more than one register and record their org-ids as equivalent"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-score",
+            type=float,
+            default=0.75,
+            help="Only save matches with at least this score",
+        )
+        parser.add_argument(
+            "--similarity",
+            type=float,
+            default=0.9,
+            help="How similar two names at the same postcode need to be to match",
+        )
+        parser.add_argument(
+            "--max-block-size",
+            type=int,
+            default=1_000,
+            help="Skip postcodes shared by more than this many charities",
+        )
+        parser.add_argument(
+            "--skip-companies",
+            action="store_true",
+            help="Only match charities against each other",
+        )
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def logger(self, message, error=False):
+        if error:
+            logger.error(message)
+            return
+        logger.info(message)
+
+    def handle(self, *args, **options):
+        self.min_score = options["min_score"]
+        self.similarity = options["similarity"]
+        self.max_block_size = options["max_block_size"]
+        self.batch_size = options["batch_size"]
+        self.matches = {}
+
+        # blocks of charity records that share a key
+        self.by_postcode = defaultdict(list)
+        self.by_company_number = defaultdict(list)
+        self.by_name = defaultdict(list)
+        for record in self.get_charities():
+            if record.postcode:
+                self.by_postcode[record.postcode].append(record)
+            if record.company_number:
+                self.by_company_number[record.company_number].append(record)
+            self.by_name[record.name].append(record)
+
+        self.match_charities()
+        if not options["skip_companies"] and apps.is_installed(
+            "charity_django.companies"
+        ):
+            self.match_companies()
+        self.save_matches()
+
+    def get_charities(self):
+        if apps.is_installed("charity_django.ccew"):
+            Charity = apps.get_model("ccew", "Charity")
+            for regno, name, postcode, company_number in (
+                Charity.objects.filter(linked_charity_number=0)
+                .values_list(
+                    "registered_charity_number",
+                    "normalised_name",
+                    "charity_contact_postcode",
+                    "charity_company_registration_number",
+                )
+                .iterator(chunk_size=self.batch_size)
+            ):
+                yield MatchRecord(
+                    f"GB-CHC-{regno}",
+                    "ccew",
+                    name,
+                    normalise_postcode(postcode),
+                    normalise_company_number(company_number),
+                )
+
+        if apps.is_installed("charity_django.oscr"):
+            Charity = apps.get_model("oscr", "Charity")
+            for regno, name, postcode in Charity.objects.values_list(
+                "charity_number", "normalised_name", "postcode"
+            ).iterator(chunk_size=self.batch_size):
+                yield MatchRecord(
+                    f"GB-SC-{regno}",
+                    "oscr",
+                    name,
+                    normalise_postcode(postcode),
+                    None,
+                )
+
+        if apps.is_installed("charity_django.ccni"):
+            Charity = apps.get_model("ccni", "Charity")
+            for regno, name, address, company_number in Charity.objects.values_list(
+                "reg_charity_number",
+                "normalised_name",
+                "public_address",
+                "company_number",
+            ).iterator(chunk_size=self.batch_size):
+                yield MatchRecord(
+                    f"GB-NIC-{regno}",
+                    "ccni",
+                    name,
+                    find_postcode(address),
+                    normalise_company_number(company_number, prefix="NI"),
+                )
+
+        if apps.is_installed("charity_django.crie"):
+            Charity = apps.get_model("crie", "Charity")
+            for regno, name, address in Charity.objects.values_list(
+                "registered_charity_number",
+                "normalised_name",
+                "primary_address",
+            ).iterator(chunk_size=self.batch_size):
+                # some Irish charities are based in Northern Ireland
+                yield MatchRecord(
+                    f"IE-CHY-{regno}",
+                    "crie",
+                    name,
+                    find_postcode(address),
+                    None,
+                )
+
+    def add_match(self, a, b, match_type, similarity=1.0):
+        if a.register == b.register:
+            return
+        score = MATCH_SCORES[match_type] * similarity
+        if score < self.min_score:
+            return
+        key = tuple(sorted((a.orgid, b.orgid)))
+        if key not in self.matches or self.matches[key][0] < score:
+            self.matches[key] = (score, match_type)
+
+    def name_similarity(self, a, b):
+        if not a or not b:
+            return 0
+        if a == b:
+            return 1.0
+        matcher = SequenceMatcher(None, a, b)
+        # the quick upper bounds rule out most pairs cheaply
+        if (
+            matcher.real_quick_ratio() < self.similarity
+            or matcher.quick_ratio() < self.similarity
+        ):
+            return 0
+        return matcher.ratio()
+
+    def match_pair_at_postcode(self, a, b):
+        similarity = self.name_similarity(a.name, b.name)
+        if similarity == 1.0:
+            self.add_match(a, b, MatchType.NAME_POSTCODE)
+        elif similarity >= self.similarity:
+            self.add_match(a, b, MatchType.SIMILAR_NAME_POSTCODE, similarity)
+
+    def match_charities(self):
+        self.logger("Matching charities by company number")
+        for records in self.by_company_number.values():
+            for a, b in combinations(records, 2):
+                self.add_match(a, b, MatchType.COMPANY_NUMBER)
+
+        self.logger("Matching charities by name and postcode")
+        skipped = 0
+        for records in tqdm(self.by_postcode.values()):
+            if len(records) > self.max_block_size:
+                skipped += 1
+                continue
+            for a, b in combinations(records, 2):
+                self.match_pair_at_postcode(a, b)
+        if skipped:
+            self.logger(f"Skipped {skipped:,.0f} postcodes with too many charities")
+
+        # names that only appear once in each register they're found in
+        self.logger("Matching charities by unique name")
+        for name, records in self.by_name.items():
+            if not name or len(records) < 2:
+                continue
+            registers = [r.register for r in records]
+            if len(registers) != len(set(registers)):
+                continue
+            for a, b in combinations(records, 2):
+                self.add_match(a, b, MatchType.UNIQUE_NAME)
+        self.logger(f"Found {len(self.matches):,.0f} matches between charities")
+
+    def match_companies(self):
+        self.logger("Matching companies by company number and postcode")
+        Company = apps.get_model("companies", "Company")
+        match_count = len(self.matches)
+        skipped = set()
+        for company_number, name, company_name, postcode in tqdm(
+            Company.objects.values_list(
+                "CompanyNumber",
+                "normalised_name",
+                "CompanyName",
+                "RegAddress_PostCode",
+            ).iterator(chunk_size=self.batch_size)
+        ):
+            charities = self.by_company_number.get(company_number, [])
+            postcode = normalise_postcode(postcode)
+            at_postcode = self.by_postcode.get(postcode, []) if postcode else []
+            if len(at_postcode) > self.max_block_size:
+                skipped.add(postcode)
+                at_postcode = []
+            if not charities and not at_postcode:
+                continue
+
+            company = MatchRecord(
+                f"GB-COH-{company_number}",
+                "companies",
+                name or normalise_name(company_name),
+                postcode,
+                company_number,
+            )
+            for charity in charities:
+                self.add_match(company, charity, MatchType.COMPANY_NUMBER)
+            for charity in at_postcode:
+                self.match_pair_at_postcode(company, charity)
+        if skipped:
+            self.logger(
+                f"Skipped {len(skipped):,.0f} postcodes with too many charities"
+            )
+        self.logger(
+            f"Found {len(self.matches) - match_count:,.0f} matches with companies"
+        )
+
+    def save_matches(self):
+        db = router.db_for_write(OrgidMatch)
+        with transaction.atomic(using=db):
+            deleted, _ = OrgidMatch.objects.using(db).all().delete()
+            self.logger(f"Deleted {deleted:,.0f} existing matches")
+            OrgidMatch.objects.using(db).bulk_create(
+                (
+                    OrgidMatch(
+                        orgid=orgid,
+                        matched_orgid=matched_orgid,
+                        match_type=match_type,
+                        score=score,
+                    )
+                    for (a, b), (score, match_type) in self.matches.items()
+                    for orgid, matched_orgid in ((a, b), (b, a))
+                ),
+                batch_size=self.batch_size,
+            )
+        self.logger(f"Saved {len(self.matches):,.0f} matches")
@@ -0,0 +1,124 @@
+import logging
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from django.db.models import CharField, Count, F, Sum, Value
+
+from charity_django.utils.models import CharityAggregate, size_band_expression
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+Register = CharityAggregate.Register
+
+# country codes for registers that don't have postcode geography
+NORTHERN_IRELAND = "N92000002"
+
+
+class Command(BaseCommand):
+    help = "Rebuild the summary tables of charity counts and income"
+
+    # for each register, the model and the fields used for each dimension
+    sources = {
+        Register.CCEW: {
+            "model": ("ccew", "Charity"),
+            "filters": {"linked_charity_number": 0},
+            "income": "latest_income",
+            "status": "charity_registration_status",
+            "charity_type": "charity_type",
+            "country": "geo_ctry",
+            "region": "geo_rgn",
+        },
+        Register.OSCR: {
+            "model": ("oscr", "Charity"),
+            "filters": {},
+            "income": "most_recent_year_income",
+            "status": "charity_status",
+            "charity_type": "constitutional_form",
+            "country": "geo_ctry",
+            "region": "geo_rgn",
+        },
+        Register.CCNI: {
+            "model": ("ccni", "Charity"),
+            "filters": {},
+            "income": "total_income",
+            "status": "status",
+            "charity_type": "type_of_governing_document",
+            "country": Value(NORTHERN_IRELAND),
+            "region": Value(None, output_field=CharField()),
+        },
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--register",
+            action="append",
+            choices=Register.values,
+            help="Only rebuild the aggregates for these registers (default is all installed registers)",
+        )
+
+    def logger(self, message, error=False):
+        if error:
+            logger.error(message)
+            return
+        logger.info(message)
+
+    def get_aggregates(self, register, source):
+        model = apps.get_model(*source["model"])
+        dimensions = {
+            dimension: (
+                F(source[dimension])
+                if isinstance(source[dimension], str)
+                else source[dimension]
+            )
+            for dimension in ("status", "charity_type", "country", "region")
+        }
+        # the grouping happens in the database, so only the summary rows
+        # are fetched
+        for row in (
+            model.objects.filter(**source["filters"])
+            .order_by()
+            .annotate(
+                agg_size_band=size_band_expression(source["income"]),
+                **{f"agg_{k}": v for k, v in dimensions.items()},
+            )
+            .values(
+                "agg_size_band",
+                *[f"agg_{dimension}" for dimension in dimensions],
+            )
+            .annotate(
+                agg_count=Count("pk"),
+                agg_income=Sum(source["income"]),
+            )
+        ):
+            yield CharityAggregate(
+                register=register,
+                size_band=row["agg_size_band"],
+                status=row["agg_status"],
+                charity_type=row["agg_charity_type"],
+                country=row["agg_country"],
+                region=row["agg_region"],
+                charity_count=row["agg_count"],
+                income_total=row["agg_income"] or 0,
+            )
+
+    def handle(self, *args, **options):
+        registers = options.get("register") or Register.values
+        db = router.db_for_write(CharityAggregate)
+        for register, source in self.sources.items():
+            if register not in registers:
+                continue
+            if not apps.is_installed(f"charity_django.{source['model'][0]}"):
+                self.logger(f"{register} app not installed, skipping")
+                continue
+            start = time.perf_counter()
+            aggregates = list(self.get_aggregates(register, source))
+            with transaction.atomic(using=db):
+                CharityAggregate.objects.using(db).filter(register=register).delete()
+                CharityAggregate.objects.using(db).bulk_create(aggregates)
+            self.logger(
+                f"Saved {len(aggregates):,.0f} aggregates for {register} "
+                f"in {time.perf_counter() - start:.2f} seconds"
+            )
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:45
+
+import charity_django.utils.orgid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("utils", "0003_commandlog_notified_commandlog_updated_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrgidMatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "orgid",
+                    charity_django.utils.orgid.OrgidField(
+                        db_index=True, max_length=200, verbose_name="Org ID"
+                    ),
+                ),
+                (
+                    "matched_orgid",
+                    charity_django.utils.orgid.OrgidField(
+                        db_index=True, max_length=200, verbose_name="Matched Org ID"
+                    ),
+                ),
+                (
+                    "match_type",
+                    models.CharField(
+                        choices=[
+                            ("company_number", "Company number"),
+                            ("name_postcode", "Name and postcode"),
+                            ("similar_name_postcode", "Similar name and postcode"),
+                            ("unique_name", "Unique name"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("score", models.FloatField()),
+                ("updated", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Org ID Match",
+                "verbose_name_plural": "Org ID Matches",
+                "unique_together": {("orgid", "matched_orgid")},
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("utils", "0004_orgidmatch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CharityAggregate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "register",
+                    models.CharField(
+                        choices=[
+                            ("ccew", "Charity Commission for England and Wales"),
+                            ("oscr", "Office of the Scottish Charity Regulator"),
+                            ("ccni", "Charity Commission for Northern Ireland"),
+                        ],
+                        db_index=True,
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "size_band",
+                    models.PositiveSmallIntegerField(
+                        blank=True,
+                        choices=[
+                            (0, "Zero income"),
+                            (1, "Under £10,000"),
+                            (2, "£10k - £100k"),
+                            (3, "£100k - £1m"),
+                            (4, "£1m - £10m"),
+                            (5, "£10m - £100m"),
+                            (6, "Over £100m"),
+                        ],
+                        db_index=True,
+                        help_text="Income band of the charity, or empty if income isn't known",
+                        null=True,
+                    ),
+                ),
+                ("status", models.CharField(blank=True, max_length=255, null=True)),
+                (
+                    "charity_type",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "country",
+                    models.CharField(
+                        blank=True,
+                        db_index=True,
+                        max_length=9,
+                        null=True,
+                        verbose_name="Country",
+                    ),
+                ),
+                (
+                    "region",
+                    models.CharField(
+                        blank=True,
+                        db_index=True,
+                        max_length=9,
+                        null=True,
+                        verbose_name="Region",
+                    ),
+                ),
+                ("charity_count", models.PositiveIntegerField(default=0)),
+                ("income_total", models.FloatField(default=0)),
+                ("updated", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Charity Aggregate",
+                "verbose_name_plural": "Charity Aggregates",
+            },
+        ),
+    ]
@@ -1,4 +1,58 @@
 from django.db import models
+from django.db.models import Case, Q, Sum, When
+from django.utils.translation import gettext_lazy as _
+
+from charity_django.utils.orgid import OrgidField
+
+# (band, lower limit, upper limit, label) for grouping charities by income.
+# Each band covers incomes above the lower limit, up to and including the
+# upper limit. Negative incomes aren't in any band.
+SIZE_BANDS = (
+    (0, -1, 0, _("Zero income")),
+    (1, 0, 10_000, _("Under £10,000")),
+    (2, 10_000, 100_000, _("£10k - £100k")),
+    (3, 100_000, 1_000_000, _("£100k - £1m")),
+    (4, 1_000_000, 10_000_000, _("£1m - £10m")),
+    (5, 10_000_000, 100_000_000, _("£10m - £100m")),
+    (6, 100_000_000, None, _("Over £100m")),
+)
+
+
+def size_band_filter(income_field, band=None, size_bands=SIZE_BANDS):
+    """
+    Filter for the incomes in `income_field` that fall in a size band, or
+    that aren't in any band (including unknown incomes) if `band` is None.
+
+    This is used for both the admin filter and the charity aggregates, so
+    they agree on the edges of each band.
+    """
+    if band is None:
+        lowest = min(lower for _band, lower, _upper, _label in size_bands)
+        return Q(**{f"{income_field}__isnull": True}) | Q(
+            **{f"{income_field}__lte": lowest}
+        )
+    for size_band, lower, upper, _label in size_bands:
+        if size_band == band:
+            q = Q(**{f"{income_field}__gt": lower})
+            if upper is not None:
+                q &= Q(**{f"{income_field}__lte": upper})
+            return q
+    raise ValueError("Unknown size band: {}".format(band))
+
+
+def size_band_expression(income_field):
+    """
+    Expression that gives the size band for the income in `income_field`,
+    or NULL if the income is unknown or not in any band.
+    """
+    return Case(
+        *[
+            When(size_band_filter(income_field, band), then=band)
+            for band, _lower, _upper, _label in SIZE_BANDS
+        ],
+        default=None,
+        output_field=models.PositiveSmallIntegerField(),
+    )
 
 
 class CommandLog(models.Model):
@@ -39,3 +93,97 @@ class CommandLog(models.Model):
         verbose_name = "Command Log"
         verbose_name_plural = "Command Logs"
         ordering = ("-started",)
+
+
+class OrgidMatch(models.Model):
+    """
+    Two org-ids found to belong to the same organisation.
+
+    Each match is stored in both directions, so all the org-ids equivalent
+    to a given one can be found by filtering on `orgid`.
+    """
+
+    class MatchType(models.TextChoices):
+        COMPANY_NUMBER = "company_number", "Company number"
+        NAME_POSTCODE = "name_postcode", "Name and postcode"
+        SIMILAR_NAME_POSTCODE = "similar_name_postcode", "Similar name and postcode"
+        UNIQUE_NAME = "unique_name", "Unique name"
+
+    orgid = OrgidField(db_index=True, verbose_name="Org ID")
+    matched_orgid = OrgidField(db_index=True, verbose_name="Matched Org ID")
+    match_type = models.CharField(max_length=50, choices=MatchType.choices)
+    score = models.FloatField()
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return "{} = {} ({:.2f})".format(self.orgid, self.matched_orgid, self.score)
+
+    class Meta:
+        verbose_name = "Org ID Match"
+        verbose_name_plural = "Org ID Matches"
+        unique_together = [("orgid", "matched_orgid")]
+
+
+class CharityAggregateQuerySet(models.QuerySet):
+    def totals(self, *group_by, **filters):
+        """
+        Number of charities and their total income, grouped by the fields in
+        `group_by`, eg `CharityAggregate.objects.totals("register", "size_band")`.
+
+        Any keyword arguments are used to filter the aggregates first.
+        """
+        return (
+            self.filter(**filters)
+            .values(*group_by)
+            .annotate(count=Sum("charity_count"), income=Sum("income_total"))
+            .order_by(*group_by)
+        )
+
+
+class CharityAggregate(models.Model):
+    """
+    Number of charities and their total income for each combination of
+    register, size band, status, type and area.
+
+    Rebuilt by the `update_charity_aggregates` command after each import, so
+    summaries can be shown without scanning the register tables.
+    """
+
+    class Register(models.TextChoices):
+        CCEW = "ccew", "Charity Commission for England and Wales"
+        OSCR = "oscr", "Office of the Scottish Charity Regulator"
+        CCNI = "ccni", "Charity Commission for Northern Ireland"
+
+    register = models.CharField(max_length=10, choices=Register.choices, db_index=True)
+    size_band = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        choices=[(band, label) for band, _lower, _upper, label in SIZE_BANDS],
+        db_index=True,
+        help_text="Income band of the charity, or empty if income isn't known",
+    )
+    status = models.CharField(max_length=255, null=True, blank=True)
+    charity_type = models.CharField(max_length=255, null=True, blank=True)
+    country = models.CharField(
+        max_length=9, null=True, blank=True, db_index=True, verbose_name="Country"
+    )
+    region = models.CharField(
+        max_length=9, null=True, blank=True, db_index=True, verbose_name="Region"
+    )
+    charity_count = models.PositiveIntegerField(default=0)
+    income_total = models.FloatField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = CharityAggregateQuerySet.as_manager()
+
+    def __str__(self):
+        return "{} {} {} ({:,.0f} charities)".format(
+            self.register,
+            self.get_size_band_display(),
+            self.status,
+            self.charity_count,
+        )
+
+    class Meta:
+        verbose_name = "Charity Aggregate"
+        verbose_name_plural = "Charity Aggregates"
@@ -0,0 +1,105 @@
+import csv
+import re
+from datetime import datetime
+from functools import lru_cache, partial
+
+from django.utils.text import slugify
+
+DATE_CACHE_SIZE = 100_000
+
+# a value in a list separated by commas, which can be wrapped in single
+# quotes (with '' for a quote inside the value) if it contains a comma
+QUOTED_LIST_VALUE = re.compile(r"'((?:[^']|'')*)'|([^,]+)")
+
+# a list where every quoted value is closed just before a comma or the end
+# of the list. Quotes after the start of an unquoted value are kept as they
+# are, as `csv.reader` does.
+_LIST_ITEM = r"(?:'(?:[^']|'')*'|[^,'][^,]*)?"
+WELL_FORMED_LIST = re.compile(rf"{_LIST_ITEM}(?:,{_LIST_ITEM})*")
+
+
+def slugify_header(header):
+    """
+    Turn a column header into a field name, eg "Registered Charity Number
+    (RCN)" into "registered_charity_number_rcn".
+    """
+    return slugify(header).replace("-", "_").replace("__", "_").replace("__", "_")
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(value, format_="%Y-%m-%d"):
+    return datetime.strptime(value, format_).date()
+
+
+def date_parser(format_):
+    """
+    A function that parses dates in `format_`, with the results cached as
+    the same dates appear many times in a register.
+    """
+    return partial(parse_date, format_=format_)
+
+
+def split_quoted_list(value):
+    """
+    Split a list like "'Education','Relief of poverty, sickness'", giving the
+    same values as `csv.reader` with `quotechar="'"`, but leaving out empty
+    values between commas.
+
+    Well formed lists are split with a regular expression. Anything else,
+    such as a quote that isn't closed, is left to `csv.reader`.
+    """
+    if "\n" in value or "\r" in value or not WELL_FORMED_LIST.fullmatch(value):
+        return [v for v in next(csv.reader([value], quotechar="'"), []) if v]
+    values = (
+        unquoted or quoted.replace("''", "'")
+        for quoted, unquoted in QUOTED_LIST_VALUE.findall(value)
+    )
+    return [v for v in values if v]
+
+
+class RowTransformer:
+    """
+    Turn rows from a register file into records.
+
+    The headers are mapped to field names once for the file, rather than
+    for every row, and each value is converted with the function given for
+    its field in `converters`. Values in `null_values` become None and are
+    not converted.
+    """
+
+    def __init__(
+        self,
+        headers,
+        field_name=slugify_header,
+        exclude=(),
+        null_values=("",),
+        strip=False,
+        converters=None,
+    ):
+        converters = converters or {}
+        self.null_values = null_values
+        self.strip = strip
+        self.columns = []
+        for index, header in enumerate(headers):
+            if not header:
+                continue
+            field = field_name(header)
+            if not field or field in exclude:
+                continue
+            self.columns.append((index, field, converters.get(field)))
+        self.fields = [field for _, field, _ in self.columns]
+
+    def __call__(self, row):
+        record = {}
+        row_length = len(row)
+        for index, field, converter in self.columns:
+            value = row[index] if index < row_length else None
+            if value is None or value in self.null_values:
+                value = None
+            else:
+                if self.strip:
+                    value = value.strip()
+                if converter is not None:
+                    value = converter(value)
+            record[field] = value
+        return record
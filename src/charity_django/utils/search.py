@@ -0,0 +1,114 @@
+from django.db import connections, models
+from django.db.migrations.operations.base import Operation
+
+from charity_django.utils.text import normalise_name
+
+# sorts after any character that can appear in a normalised name
+MAX_CHAR = "\U0010ffff"
+
+TRIGRAM_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)"
+)
+
+
+class NameSearchQuerySet(models.QuerySet):
+    name_search_field = "normalised_name"
+
+    def search_name(self, query):
+        """
+        Find records whose normalised name matches the query.
+
+        On PostgreSQL this matches the query anywhere in the name, using the
+        trigram index added by `AddTrigramIndex`. On other databases it
+        falls back to a prefix match, which can use the ordinary index on
+        the field.
+        """
+        query = normalise_name(query)
+        if not query:
+            return self.none()
+        if connections[self.db].vendor == "postgresql":
+            return self.filter(**{f"{self.name_search_field}__contains": query})
+        return self.filter(
+            **{
+                f"{self.name_search_field}__gte": query,
+                f"{self.name_search_field}__lt": query + MAX_CHAR,
+            }
+        )
+
+
+class AddTrigramIndex(Operation):
+    """
+    Add a pg_trgm GIN index to a field so `LIKE '%...%'` searches can use it.
+
+    This does nothing on databases other than PostgreSQL, which rely on the
+    field's own index instead.
+    """
+
+    reversible = True
+
+    def __init__(self, model_name, field_name, name):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.name = name
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        quote_name = schema_editor.quote_name
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            TRIGRAM_INDEX_SQL.format(
+                name=quote_name(self.name),
+                table=quote_name(model._meta.db_table),
+                column=quote_name(model._meta.get_field(self.field_name).column),
+            )
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        schema_editor.execute(
+            "DROP INDEX IF EXISTS {}".format(schema_editor.quote_name(self.name))
+        )
+
+    def describe(self):
+        return "Create trigram index {} on field {} of {}".format(
+            self.name, self.field_name, self.model_name
+        )
+
+    @property
+    def migration_name_fragment(self):
+        return "{}_{}_trigram".format(self.model_name.lower(), self.field_name)
+
+
+def trigram_indexes(model, connection):
+    """
+    The name and `CREATE INDEX` statement of the trigram index on the field
+    searched by a model's `NameSearchQuerySet`.
+
+    These indexes are added by `AddTrigramIndex`, which names them
+    `<table>_<field>_trgm`, so they aren't in the model's `_meta`. They only
+    exist on PostgreSQL.
+    """
+    if connection.vendor != "postgresql":
+        return []
+    queryset = model._default_manager.get_queryset()
+    if not isinstance(queryset, NameSearchQuerySet):
+        return []
+    field = model._meta.get_field(queryset.name_search_field)
+    name = "{}_{}_trgm".format(model._meta.db_table, field.name)
+    quote_name = connection.ops.quote_name
+    return [
+        (
+            name,
+            TRIGRAM_INDEX_SQL.format(
+                name=quote_name(name),
+                table=quote_name(model._meta.db_table),
+                column=quote_name(field.column),
+            ),
+        )
+    ]
@@ -0,0 +1,259 @@
+import argparse
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from charity_django.crie.models import Charity
+from charity_django.utils.bulk import (
+    BULK_STRATEGIES,
+    BulkWriter,
+    ValuesStrategy,
+    add_bulk_session_argument,
+    copy_value,
+    import_session,
+)
+
+
+def charities(count, name="Charity {}"):
+    return [
+        Charity(registered_charity_number=i, registered_charity_name=name.format(i))
+        for i in range(1, count + 1)
+    ]
+
+
+class TestBulkWriter(TestCase):
+    def test_default_strategy(self):
+        writer = BulkWriter(Charity)
+        expected = "copy" if connection.vendor == "postgresql" else "executemany"
+        self.assertEqual(writer.strategy.name, expected)
+        self.assertEqual(writer.table, Charity._meta.db_table)
+
+    def test_unavailable_strategy(self):
+        if connection.vendor == "postgresql":
+            # copy can't handle conflicts
+            with self.assertRaises(ValueError):
+                BulkWriter(Charity, strategy="copy", ignore_conflicts=True)
+        else:
+            with self.assertRaises(ValueError):
+                BulkWriter(Charity, strategy="copy")
+
+    def test_strategies(self):
+        for name, strategy in BULK_STRATEGIES.items():
+            writer = BulkWriter(Charity, batch_size=3)
+            if not strategy.is_available(writer):
+                continue
+            with self.subTest(strategy=name):
+                Charity.objects.all().delete()
+                writer = BulkWriter(
+                    Charity, strategy=name, batch_size=3, adaptive=False
+                )
+                self.assertEqual(writer.write_objects(charities(10)), 10)
+                self.assertEqual(writer.batches, 4)
+                self.assertEqual(Charity.objects.count(), 10)
+                self.assertEqual(
+                    Charity.objects.get(registered_charity_number=7).display_name,
+                    None,
+                )
+
+    def test_values_strategy_splits_statements(self):
+        writer = BulkWriter(
+            Charity,
+            ["registered_charity_number", "registered_charity_name"],
+            strategy=ValuesStrategy(max_params=20),
+        )
+        with CaptureQueriesContext(connection) as queries:
+            writer.write((i, "Charity {}".format(i)) for i in range(25))
+        # 10 rows of two values fit in each statement
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(Charity.objects.count(), 25)
+
+    def test_table_name(self):
+        writer = BulkWriter(
+            Charity._meta.db_table,
+            ["registered_charity_number", "registered_charity_name"],
+        )
+        writer.write([(1, "One"), (2, "Two")])
+        self.assertEqual(
+            list(
+                Charity.objects.order_by("pk").values_list(
+                    "registered_charity_name", flat=True
+                )
+            ),
+            ["One", "Two"],
+        )
+
+    def test_table_name_needs_fields(self):
+        with self.assertRaises(ValueError):
+            BulkWriter(Charity._meta.db_table)
+
+    def test_upsert(self):
+        BulkWriter(Charity).write_objects(charities(3))
+        Charity.objects.update(website="https://example.com/")
+
+        writer = BulkWriter(
+            Charity,
+            conflict_fields=["registered_charity_number"],
+            update_fields=["registered_charity_name"],
+        )
+        writer.write_objects(charities(4, name="Updated {}"))
+
+        self.assertEqual(Charity.objects.count(), 4)
+        self.assertEqual(Charity.objects.get(pk=2).registered_charity_name, "Updated 2")
+        # fields not in update_fields are kept
+        self.assertEqual(Charity.objects.get(pk=2).website, "https://example.com/")
+
+    def test_ignore_conflicts(self):
+        BulkWriter(Charity).write_objects(charities(3))
+        writer = BulkWriter(Charity, ignore_conflicts=True)
+        writer.write_objects(charities(5, name="New {}"))
+        self.assertEqual(Charity.objects.count(), 5)
+        self.assertEqual(Charity.objects.get(pk=1).registered_charity_name, "Charity 1")
+        self.assertEqual(Charity.objects.get(pk=5).registered_charity_name, "New 5")
+
+    def test_insert_sql(self):
+        writer = BulkWriter(
+            Charity,
+            ["registered_charity_number", "registered_charity_name"],
+            conflict_fields=["registered_charity_number"],
+        )
+        self.assertTrue(
+            writer.insert_sql("%s").endswith(
+                'ON CONFLICT ("registered_charity_number") DO UPDATE SET '
+                '"registered_charity_name" = EXCLUDED."registered_charity_name"'
+            )
+        )
+        writer = BulkWriter(
+            Charity, ["registered_charity_number"], ignore_conflicts=True
+        )
+        self.assertTrue(writer.insert_sql("%s").endswith("ON CONFLICT DO NOTHING"))
+
+    def staging_exists(self, writer):
+        with connection.cursor() as cursor:
+            tables = connection.introspection.table_names(cursor, include_views=True)
+            # SQLite lists temporary tables separately
+            if connection.vendor == "sqlite":
+                cursor.execute(
+                    "SELECT name FROM sqlite_temp_master WHERE type = 'table'"
+                )
+                tables += [row[0] for row in cursor.fetchall()]
+        return writer.staging_table in tables
+
+    def test_staged(self):
+        with BulkWriter(Charity, staged=True, batch_size=2) as writer:
+            writer.write_objects(charities(5))
+            self.assertTrue(self.staging_exists(writer))
+            # nothing is in the table until the rows are published
+            self.assertEqual(Charity.objects.count(), 0)
+        self.assertEqual(Charity.objects.count(), 5)
+        self.assertFalse(self.staging_exists(writer))
+        self.assertIn("_staging", writer.summary())
+
+    def test_staged_tables_are_unique(self):
+        first = BulkWriter(Charity, staged=True)
+        second = BulkWriter(Charity, staged=True)
+        self.assertNotEqual(first.staging_table, second.staging_table)
+        with first, second:
+            first.write_objects(charities(2))
+            second.write_objects(charities(4)[2:])
+        self.assertEqual(Charity.objects.count(), 4)
+
+    def test_staged_upsert(self):
+        BulkWriter(Charity).write_objects(charities(3))
+        Charity.objects.update(website="https://example.com/")
+
+        with BulkWriter(
+            Charity,
+            staged=True,
+            batch_size=2,
+            conflict_fields=["registered_charity_number"],
+            update_fields=["registered_charity_name"],
+        ) as writer:
+            self.assertFalse(writer.has_conflict_clause)
+            writer.write_objects(charities(4, name="Updated {}"))
+            # the last row written for each key wins
+            writer.write_objects(charities(2, name="Latest {}"))
+
+        self.assertEqual(Charity.objects.count(), 4)
+        self.assertEqual(Charity.objects.get(pk=2).registered_charity_name, "Latest 2")
+        self.assertEqual(Charity.objects.get(pk=3).registered_charity_name, "Updated 3")
+        self.assertEqual(Charity.objects.get(pk=2).website, "https://example.com/")
+
+    def test_staged_ignore_conflicts(self):
+        BulkWriter(Charity).write_objects(charities(3))
+        with BulkWriter(Charity, staged=True, ignore_conflicts=True) as writer:
+            writer.write_objects(charities(5, name="New {}"))
+        self.assertEqual(Charity.objects.count(), 5)
+        self.assertEqual(Charity.objects.get(pk=1).registered_charity_name, "Charity 1")
+
+    def test_staged_publish_where(self):
+        writer = BulkWriter(Charity, staged=True)
+        try:
+            writer.write_objects(charities(5))
+            writer.publish(where="registered_charity_number > 3")
+        finally:
+            writer.drop_staging_table()
+        self.assertEqual(
+            list(
+                Charity.objects.order_by("pk").values_list(
+                    "registered_charity_number", flat=True
+                )
+            ),
+            [4, 5],
+        )
+
+    def test_staged_error(self):
+        with self.assertRaises(ValueError):
+            with BulkWriter(Charity, staged=True) as writer:
+                writer.write_objects(charities(5))
+                raise ValueError("Import failed")
+        self.assertEqual(Charity.objects.count(), 0)
+        self.assertFalse(self.staging_exists(writer))
+
+    def test_import_session(self):
+        # the session settings only apply to postgres
+        with import_session("default"):
+            BulkWriter(Charity).write_objects(charities(2))
+        self.assertEqual(Charity.objects.count(), 2)
+
+    def test_add_bulk_session_argument(self):
+        parser = argparse.ArgumentParser()
+        add_bulk_session_argument(parser)
+        self.assertFalse(parser.parse_args([]).bulk_session)
+        self.assertTrue(parser.parse_args(["--bulk-session"]).bulk_session)
+
+    def test_adaptive_batch_size(self):
+        writer = BulkWriter(
+            Charity,
+            batch_size=1_000,
+            min_batch_size=500,
+            max_batch_size=1_500,
+            target_seconds=1.0,
+        )
+        # fast batches grow, but by no more than double and within the maximum
+        self.assertEqual(writer._next_batch_size(1_000, 0.01), 1_500)
+        # slow batches shrink, but by no more than half
+        self.assertEqual(writer._next_batch_size(1_000, 100), 500)
+        self.assertEqual(writer._next_batch_size(1_000, 1.25), 800)
+        # a short final batch leaves the size alone
+        self.assertEqual(writer._next_batch_size(10, 100), 1_000)
+
+        writer = BulkWriter(Charity, batch_size=1_000, adaptive=False)
+        self.assertEqual(writer._next_batch_size(1_000, 0.01), 1_000)
+
+    def test_metrics(self):
+        writer = BulkWriter(Charity, batch_size=2, adaptive=False)
+        self.assertEqual(writer.rows_per_second, 0)
+        writer.write_objects(charities(5))
+        self.assertEqual(writer.rows_written, 5)
+        self.assertEqual(writer.batches, 3)
+        self.assertGreater(writer.seconds, 0)
+        self.assertGreater(writer.rows_per_second, 0)
+        self.assertIn("Wrote 5 rows", writer.summary())
+        self.assertIn(writer.strategy.name, writer.summary())
+
+    def test_copy_value(self):
+        self.assertEqual(copy_value(None), "\\N")
+        self.assertEqual(copy_value(True), "t")
+        self.assertEqual(copy_value(1), "1")
+        self.assertEqual(copy_value("a\tb\nc\\d"), "a\\tb\\nc\\\\d")
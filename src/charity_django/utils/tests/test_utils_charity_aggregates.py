@@ -0,0 +1,131 @@
+import datetime
+
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+
+from charity_django.ccew.admin import CCEWCharitySizeListFilter
+from charity_django.ccew.models import Charity as CCEWCharity
+from charity_django.ccni.models import Charity as CCNICharity
+from charity_django.oscr.models import Charity as OSCRCharity
+from charity_django.utils.models import SIZE_BANDS, CharityAggregate
+
+
+class TestCharityAggregates(TestCase):
+    def setUp(self):
+        for organisation_number, income, status in [
+            (1, 5_000, "Registered"),
+            (2, 7_500, "Registered"),
+            (3, 250_000, "Registered"),
+            (4, None, "Removed"),
+        ]:
+            CCEWCharity.objects.create(
+                organisation_number=organisation_number,
+                registered_charity_number=organisation_number,
+                linked_charity_number=0,
+                charity_name=f"Test Charity {organisation_number}",
+                charity_registration_status=status,
+                latest_income=income,
+                geo_ctry="E92000001",
+                geo_rgn="E12000003",
+            )
+        # linked charities aren't counted
+        CCEWCharity.objects.create(
+            organisation_number=5,
+            registered_charity_number=1,
+            linked_charity_number=1,
+            charity_name="Linked Charity",
+            charity_registration_status="Registered",
+            latest_income=1_000,
+        )
+        OSCRCharity.objects.create(
+            charity_number="SC000001",
+            charity_name="Scottish Charity",
+            registered_date=datetime.date(2000, 1, 1),
+            charity_status="Active",
+            most_recent_year_income=0,
+        )
+        CCNICharity.objects.create(
+            reg_charity_number=100001,
+            charity_name="Northern Irish Charity",
+            status="Registered",
+            total_income=20_000_000,
+        )
+
+    def test_update_charity_aggregates(self):
+        call_command("update_charity_aggregates")
+
+        totals = {
+            (row["register"], row["size_band"]): (row["count"], row["income"])
+            for row in CharityAggregate.objects.totals("register", "size_band")
+        }
+        self.assertEqual(
+            totals,
+            {
+                ("ccew", None): (1, 0),
+                ("ccew", 1): (2, 12_500),
+                ("ccew", 3): (1, 250_000),
+                ("oscr", 0): (1, 0),
+                ("ccni", 5): (1, 20_000_000),
+            },
+        )
+
+        by_country = {
+            row["country"]: row["count"]
+            for row in CharityAggregate.objects.totals(
+                "country", status__in=["Registered", "Active"]
+            )
+        }
+        self.assertEqual(by_country, {None: 1, "E92000001": 3, "N92000002": 1})
+
+    def test_update_charity_aggregates_register(self):
+        call_command("update_charity_aggregates")
+        CCNICharity.objects.all().delete()
+        call_command("update_charity_aggregates", register=["ccew"])
+
+        # only the aggregates for the register being updated are replaced
+        self.assertEqual(
+            CharityAggregate.objects.filter(register="ccni").count(),
+            1,
+        )
+        self.assertEqual(
+            sum(
+                row["count"] for row in CharityAggregate.objects.totals(register="ccew")
+            ),
+            4,
+        )
+
+    def test_size_bands_match_admin_filter(self):
+        # incomes on the edges of the bands, and ones not in any band
+        for organisation_number, income in enumerate(
+            [-100, -1, 0, 1, 10_000, 10_001, 100_000_000, 100_000_001],
+            start=10,
+        ):
+            CCEWCharity.objects.create(
+                organisation_number=organisation_number,
+                registered_charity_number=organisation_number,
+                linked_charity_number=0,
+                charity_name=f"Edge Charity {organisation_number}",
+                latest_income=income,
+            )
+        call_command("update_charity_aggregates", register=["ccew"])
+
+        aggregates = {
+            row["size_band"]: row["count"]
+            for row in CharityAggregate.objects.totals("size_band", register="ccew")
+        }
+        request = RequestFactory().get("/")
+        queryset = CCEWCharity.objects.filter(linked_charity_number=0)
+        for value, band in [("unknown", None)] + [
+            (str(band), band) for band, _lower, _upper, _label in SIZE_BANDS
+        ]:
+            with self.subTest(band=value):
+                list_filter = CCEWCharitySizeListFilter(
+                    request, {"size": [value]}, CCEWCharity, None
+                )
+                self.assertEqual(
+                    list_filter.queryset(request, queryset).count(),
+                    aggregates.get(band, 0),
+                )
+        # negative incomes aren't counted as zero income
+        self.assertEqual(aggregates[0], 1)
+        self.assertEqual(aggregates[None], 3)
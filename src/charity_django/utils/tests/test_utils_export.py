@@ -0,0 +1,77 @@
+import csv
+import datetime
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from charity_django.ccew.models import Charity as CCEWCharity
+from charity_django.oscr.models import Charity as OSCRCharity
+from charity_django.utils.export import EXPORT_SOURCES, export_rows, iter_rows
+
+
+class TestExport(TestCase):
+    def setUp(self):
+        for i in range(7):
+            CCEWCharity.objects.create(
+                organisation_number=10 - i,
+                registered_charity_number=1000 + i,
+                linked_charity_number=0,
+                charity_name=f"Test Charity {i}",
+                date_of_registration=datetime.date(2000 + i, 1, 1),
+            )
+        OSCRCharity.objects.create(
+            charity_number="SC000001",
+            charity_name="Scottish Charity",
+            registered_date=datetime.date(2000, 1, 1),
+        )
+
+    def test_iter_rows(self):
+        source = EXPORT_SOURCES["ccew"]
+        # each page is one query
+        with self.assertNumQueries(4):
+            rows = list(
+                iter_rows(
+                    source,
+                    fields=["organisation_number", "charity_name"],
+                    page_size=2,
+                )
+            )
+        self.assertEqual([row[0] for row in rows], [4, 5, 6, 7, 8, 9, 10])
+        self.assertEqual(rows[0], (4, "Test Charity 6"))
+
+    def test_iter_rows_key_missing(self):
+        with self.assertRaises(ValueError):
+            list(iter_rows(EXPORT_SOURCES["ccew"], fields=["charity_name"]))
+
+    def test_export_csv(self):
+        output = io.StringIO()
+        row_count = export_rows(
+            EXPORT_SOURCES["ccew"], output, batch_size=3, page_size=2
+        )
+        self.assertEqual(row_count, 7)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[0]["organisation_number"], "4")
+        self.assertEqual(rows[0]["date_of_registration"], "2006-01-01")
+
+    def test_export_register_command(self):
+        output = io.StringIO()
+        call_command(
+            "export_register",
+            "oscr",
+            format="jsonl",
+            fields=["charity_number", "charity_name", "registered_date"],
+            stdout=output,
+        )
+        self.assertEqual(
+            [json.loads(line) for line in output.getvalue().splitlines()],
+            [
+                {
+                    "charity_number": "SC000001",
+                    "charity_name": "Scottish Charity",
+                    "registered_date": "2000-01-01",
+                }
+            ],
+        )
@@ -0,0 +1,81 @@
+from django.db import connection
+from django.test import TestCase
+
+from charity_django.companies.models import Company, PreviousName
+from charity_django.utils.indexes import DeferredIndexes, secondary_indexes
+from charity_django.utils.search import trigram_indexes
+
+
+def index_names(model):
+    with connection.cursor() as cursor:
+        return set(
+            connection.introspection.get_constraints(
+                cursor, model._meta.db_table
+            ).keys()
+        )
+
+
+class TestDeferredIndexes(TestCase):
+    def test_secondary_indexes(self):
+        indexes = dict(secondary_indexes(Company, connection))
+        field = Company._meta.get_field("CompanyName")
+        name = connection.schema_editor()._create_index_name(
+            Company._meta.db_table, [field.column]
+        )
+        self.assertIn(name, indexes)
+        self.assertTrue(indexes[name].startswith("CREATE INDEX"))
+        # the primary key isn't a secondary index
+        self.assertFalse(
+            any(
+                '("{}")'.format(Company._meta.pk.column) in sql
+                for sql in indexes.values()
+            )
+        )
+        # every index is one that exists on the table
+        self.assertLessEqual(set(indexes), index_names(Company))
+
+    def test_trigram_indexes(self):
+        names = {name for name, _ in secondary_indexes(Company, connection)}
+        if connection.vendor == "postgresql":
+            self.assertIn("companies_company_normalised_name_trgm", names)
+        else:
+            self.assertNotIn("companies_company_normalised_name_trgm", names)
+        self.assertEqual(
+            [name for name, _ in trigram_indexes(PreviousName, connection)], []
+        )
+
+    def test_drop_and_rebuild(self):
+        models = [Company, PreviousName]
+        before = {model: index_names(model) for model in models}
+        secondary = {
+            model: {name for name, _ in secondary_indexes(model, connection)}
+            for model in models
+        }
+
+        indexes = DeferredIndexes(models)
+        dropped = indexes.drop()
+        self.assertEqual(
+            {name for _, name, _ in dropped}, set().union(*secondary.values())
+        )
+        for model in models:
+            self.assertEqual(index_names(model), before[model] - secondary[model])
+
+        Company.objects.create(CompanyNumber="00000001", CompanyName="Company")
+
+        self.assertEqual(indexes.rebuild(), len(dropped))
+        for model in models:
+            self.assertEqual(index_names(model), before[model])
+
+        # nothing is left to rebuild
+        self.assertEqual(indexes.rebuild(), 0)
+
+    def test_rebuild_skips_existing(self):
+        indexes = DeferredIndexes([Company])
+        indexes.drop()
+        name, sql = secondary_indexes(Company, connection)[0]
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+        self.assertEqual(
+            indexes.rebuild(), len(secondary_indexes(Company, connection)) - 1
+        )
+        self.assertIn(name, index_names(Company))
@@ -0,0 +1,54 @@
+import argparse
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from charity_django.ccni.models import Charity, CharityClassification
+from charity_django.utils.maintenance import add_analyze_arguments, analyze_tables
+
+
+def maintenance_queries(queries):
+    return [
+        query["sql"]
+        for query in queries.captured_queries
+        if query["sql"].startswith(("ANALYZE", "VACUUM"))
+    ]
+
+
+class TestAnalyzeTables(TestCase):
+    def test_analyze_tables(self):
+        with CaptureQueriesContext(connection) as queries:
+            timings = analyze_tables([Charity, CharityClassification, Charity])
+
+        self.assertEqual(
+            list(timings),
+            [Charity._meta.db_table, CharityClassification._meta.db_table],
+        )
+        self.assertTrue(all(seconds >= 0 for seconds in timings.values()))
+        self.assertEqual(
+            maintenance_queries(queries),
+            [
+                'ANALYZE "{}"'.format(Charity._meta.db_table),
+                'ANALYZE "{}"'.format(CharityClassification._meta.db_table),
+            ],
+        )
+
+    def test_vacuum_falls_back_to_analyze(self):
+        # VACUUM can't run inside a transaction, or on SQLite
+        with CaptureQueriesContext(connection) as queries:
+            analyze_tables([Charity], vacuum=[Charity])
+        self.assertEqual(
+            maintenance_queries(queries),
+            ['ANALYZE "{}"'.format(Charity._meta.db_table)],
+        )
+
+    def test_add_analyze_arguments(self):
+        parser = argparse.ArgumentParser()
+        add_analyze_arguments(parser)
+        options = parser.parse_args([])
+        self.assertTrue(options.analyze)
+        self.assertFalse(options.vacuum)
+        options = parser.parse_args(["--no-analyze", "--vacuum"])
+        self.assertFalse(options.analyze)
+        self.assertTrue(options.vacuum)
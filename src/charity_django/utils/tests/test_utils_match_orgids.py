@@ -0,0 +1,109 @@
+import datetime
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from charity_django.ccew.models import Charity as CCEWCharity
+from charity_django.ccni.models import Charity as CCNICharity
+from charity_django.companies.models import Company
+from charity_django.oscr.models import Charity as OSCRCharity
+from charity_django.utils.models import OrgidMatch
+
+
+class TestMatchOrgids(TestCase):
+    def setUp(self):
+        CCEWCharity.objects.create(
+            organisation_number=1,
+            registered_charity_number=1000001,
+            linked_charity_number=0,
+            charity_name="THE EXAMPLE TRUST",
+            charity_contact_postcode="EH1 1AA",
+            charity_company_registration_number="1234567",
+        )
+        CCEWCharity.objects.create(
+            organisation_number=2,
+            registered_charity_number=1000002,
+            linked_charity_number=0,
+            charity_name="Riverside Community Centre",
+            charity_contact_postcode="BT1 1AA",
+        )
+        CCEWCharity.objects.create(
+            organisation_number=3,
+            registered_charity_number=1000003,
+            linked_charity_number=0,
+            charity_name="Unconnected Charity",
+            charity_contact_postcode="SW1A 1AA",
+        )
+        OSCRCharity.objects.create(
+            charity_number="SC000001",
+            charity_name="The Example Trust",
+            registered_date=datetime.date(2000, 1, 1),
+            postcode="EH11AA",
+        )
+        CCNICharity.objects.create(
+            reg_charity_number=100001,
+            charity_name="Riverside Community Centre Ltd",
+            public_address="1 High Street, Belfast, BT1 1AA",
+        )
+        Company.objects.create(
+            CompanyNumber="01234567",
+            CompanyName="EXAMPLE TRUST LIMITED",
+        )
+        Company.objects.create(
+            CompanyNumber="07654321",
+            CompanyName="UNCONNECTED CHARITY",
+            RegAddress_PostCode="SW1A 1AA",
+        )
+        Company.objects.create(
+            CompanyNumber="01111111",
+            CompanyName="SOMETHING ELSE ENTIRELY LTD",
+            RegAddress_PostCode="SW1A 1AA",
+        )
+
+    def get_matches(self, orgid):
+        return {
+            m.matched_orgid: m.match_type
+            for m in OrgidMatch.objects.filter(orgid=orgid)
+        }
+
+    def test_match_orgids(self):
+        call_command("match_orgids")
+
+        self.assertEqual(
+            self.get_matches("GB-CHC-1000001"),
+            {
+                "GB-SC-SC000001": OrgidMatch.MatchType.NAME_POSTCODE,
+                "GB-COH-01234567": OrgidMatch.MatchType.COMPANY_NUMBER,
+            },
+        )
+        self.assertEqual(
+            self.get_matches("GB-NIC-100001"),
+            {"GB-CHC-1000002": OrgidMatch.MatchType.NAME_POSTCODE},
+        )
+        self.assertEqual(
+            self.get_matches("GB-COH-07654321"),
+            {"GB-CHC-1000003": OrgidMatch.MatchType.NAME_POSTCODE},
+        )
+        self.assertEqual(self.get_matches("GB-COH-01111111"), {})
+
+    def test_match_orgids_skip_companies(self):
+        call_command("match_orgids", skip_companies=True)
+        self.assertFalse(
+            OrgidMatch.objects.filter(orgid__startswith="GB-COH-").exists()
+        )
+        self.assertTrue(OrgidMatch.objects.filter(orgid="GB-SC-SC000001").exists())
+
+    def test_match_orgids_twice(self):
+        call_command("match_orgids")
+        count = OrgidMatch.objects.count()
+        call_command("match_orgids")
+        self.assertEqual(OrgidMatch.objects.count(), count)
+
+    def test_match_orgids_max_block_size(self):
+        call_command("match_orgids", max_block_size=0)
+        # postcodes with too many records are skipped for companies too
+        self.assertEqual(self.get_matches("GB-COH-07654321"), {})
+        self.assertEqual(
+            self.get_matches("GB-COH-01234567"),
+            {"GB-CHC-1000001": OrgidMatch.MatchType.COMPANY_NUMBER},
+        )
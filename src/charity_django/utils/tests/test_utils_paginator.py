@@ -0,0 +1,55 @@
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from charity_django.companies.admin import CompanyAdmin
+from charity_django.companies.models import Company
+from charity_django.utils.admin import EstimatedCountPaginator
+from charity_django.utils.cache import bump_cache_version, get_cache_version
+
+
+class TestEstimatedCountPaginator(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(5):
+            Company.objects.create(
+                CompanyNumber=f"0000000{i}",
+                CompanyName=f"Company {i}",
+                CompanyStatus="Active" if i % 2 else "Dissolved",
+            )
+
+    def test_count_is_cached(self):
+        queryset = Company.objects.order_by("CompanyNumber")
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(queryset, 2).count, 5)
+        Company.objects.create(CompanyNumber="00000009", CompanyName="New")
+        with self.assertNumQueries(0):
+            self.assertEqual(EstimatedCountPaginator(queryset, 2).count, 5)
+
+        # cached separately for each filter
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                EstimatedCountPaginator(
+                    queryset.filter(CompanyStatus="Active"), 2
+                ).count,
+                2,
+            )
+
+        # an import invalidates the cached counts
+        version = get_cache_version(Company)
+        bump_cache_version(Company)
+        self.assertEqual(get_cache_version(Company), version + 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(queryset, 2).count, 6)
+
+    def test_list(self):
+        self.assertEqual(EstimatedCountPaginator([1, 2, 3], 2).count, 3)
+
+    def test_changelist(self):
+        request = RequestFactory().get("/")
+        request.user = User.objects.create_superuser("admin")
+        model_admin = CompanyAdmin(Company, AdminSite())
+        changelist = model_admin.get_changelist_instance(request)
+        self.assertEqual(changelist.result_count, 5)
+        self.assertIsNone(changelist.full_result_count)
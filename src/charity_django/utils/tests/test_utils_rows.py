@@ -0,0 +1,96 @@
+import csv
+import datetime
+import random
+from unittest import TestCase
+
+from charity_django.utils.rows import (
+    RowTransformer,
+    date_parser,
+    parse_date,
+    slugify_header,
+    split_quoted_list,
+)
+
+
+class TestRowTransformer(TestCase):
+    def test_slugify_header(self):
+        self.assertEqual(
+            slugify_header("Registered Charity Number (RCN)"),
+            "registered_charity_number_rcn",
+        )
+        self.assertEqual(slugify_header(" Also - Known As "), "also_known_as")
+
+    def test_row_transformer(self):
+        transform = RowTransformer(
+            ["Charity Number", "Name", "", "Registered", "Income", "Notes", "  "],
+            exclude=("notes",),
+            null_values=("", "-"),
+            strip=True,
+            converters={
+                "registered": date_parser("%d/%m/%Y"),
+                "income": int,
+            },
+        )
+        self.assertEqual(
+            transform.fields, ["charity_number", "name", "registered", "income"]
+        )
+        self.assertEqual(
+            transform(["SC1", " Test ", "x", "01/02/2003", "-", "Note"]),
+            {
+                "charity_number": "SC1",
+                "name": "Test",
+                "registered": datetime.date(2003, 2, 1),
+                "income": None,
+            },
+        )
+        # rows shorter than the headers
+        self.assertEqual(
+            transform(["SC2"]),
+            {
+                "charity_number": "SC2",
+                "name": None,
+                "registered": None,
+                "income": None,
+            },
+        )
+
+    def test_parse_date_cached(self):
+        parse_date.cache_clear()
+        parse = date_parser("%d %B %Y")
+        for _ in range(3):
+            self.assertEqual(parse("1 April 2020"), datetime.date(2020, 4, 1))
+        self.assertEqual(parse_date.cache_info().hits, 2)
+
+    def test_split_quoted_list(self):
+        cases = [
+            "'Education','Health'",
+            "'Relief of poverty, sickness',Other",
+            "A, B",
+            "'A', 'B'",
+            "'It''s','B'",
+            "'A',,'B'",
+            "A",
+            "",
+            "''",
+            "it's",
+            # badly quoted lists are split the same way as csv.reader does
+            "a,,'a,'b",
+            "'A,B",
+            "'A'B,C",
+            "A,'B\nC'",
+        ]
+        for value in cases:
+            with self.subTest(value=value):
+                self.assertEqual(split_quoted_list(value), self.csv_list(value))
+
+    def test_split_quoted_list_random(self):
+        # random lists made up of the characters that matter
+        rng = random.Random(0)
+        for _ in range(1_000):
+            value = "".join(rng.choice("a', ") for _ in range(rng.randint(1, 10)))
+            self.assertEqual(split_quoted_list(value), self.csv_list(value), value)
+
+    def csv_list(self, value):
+        return [
+            v for v in next(csv.reader([value], delimiter=",", quotechar="'"), []) if v
+        ]
@@ -0,0 +1,63 @@
+from django.contrib.admin.sites import AdminSite
+from django.test import RequestFactory, TestCase
+
+from charity_django.ccew.admin import CharityAdmin
+from charity_django.ccew.models import Charity
+
+
+class TestNameSearch(TestCase):
+    def setUp(self):
+        for i, name in enumerate(
+            [
+                "THE EXAMPLE TRUST",
+                "Example Community Association Ltd",
+                "Another Charity",
+            ]
+        ):
+            Charity.objects.create(
+                organisation_number=i + 1,
+                registered_charity_number=1000 + i,
+                linked_charity_number=0,
+                charity_name=name,
+            )
+
+    def test_normalised_name_on_save(self):
+        charity = Charity.objects.get(organisation_number=1)
+        self.assertEqual(charity.normalised_name, "example")
+
+    def test_search_name(self):
+        self.assertEqual(
+            set(
+                Charity.objects.search_name("the example").values_list(
+                    "organisation_number", flat=True
+                )
+            ),
+            {1, 2},
+        )
+        self.assertEqual(
+            list(
+                Charity.objects.search_name("ANOTHER").values_list(
+                    "organisation_number", flat=True
+                )
+            ),
+            [3],
+        )
+        self.assertFalse(Charity.objects.search_name("missing").exists())
+        self.assertFalse(Charity.objects.search_name("").exists())
+
+    def test_admin_search(self):
+        model_admin = CharityAdmin(Charity, AdminSite())
+        request = RequestFactory().get("/")
+        queryset = Charity.objects.all()
+
+        results, may_have_duplicates = model_admin.get_search_results(
+            request, queryset, "another charity"
+        )
+        self.assertFalse(may_have_duplicates)
+        self.assertEqual([c.organisation_number for c in results], [3])
+
+        results, _ = model_admin.get_search_results(request, queryset, "1001")
+        self.assertEqual([c.organisation_number for c in results], [2])
+
+        results, _ = model_admin.get_search_results(request, queryset, "")
+        self.assertEqual(results.count(), 3)
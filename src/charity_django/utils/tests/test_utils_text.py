@@ -1,14 +1,34 @@
 from unittest import TestCase
 
+import titlecase
+from faker import Faker
+
+from charity_django.utils.charity_provider import CharityProvider
 from charity_django.utils.text import (
     clean_url,
+    find_postcode,
     list_to_string,
+    normalise_company_number,
+    normalise_name,
+    normalise_name_many,
+    normalise_postcode,
     regex_search,
+    title_exceptions,
     to_titlecase,
+    to_titlecase_many,
     working_url,
 )
 
 
+def reference_titlecase(s):
+    """The uncached implementation, used to check the cached one gives the same results"""
+    s = s.strip()
+    if not s.isupper() and not s.islower():
+        return s
+    s = titlecase.titlecase(s, callback=title_exceptions)
+    return s[0].upper() + s[1:]
+
+
 class TestUtilsText(TestCase):
     def test_regex_search(self):
         self.assertTrue(regex_search("abc", r"abc"))
@@ -96,6 +116,84 @@ class TestUtilsText(TestCase):
         for s, expected in sentences:
             self.assertEqual(to_titlecase(s, sentence=True), expected)
 
+    def test_to_titlecase_many(self):
+        self.assertEqual(
+            to_titlecase_many(["MRS SMITH", None, "charity uk ltd", "MRS SMITH", 500]),
+            ["Mrs Smith", None, "Charity UK Ltd", "Mrs Smith", 500],
+        )
+        self.assertEqual(
+            to_titlecase_many(["the charity the name"], sentence=True),
+            ["The charity the name"],
+        )
+        self.assertEqual(to_titlecase_many([]), [])
+
+    def test_to_titlecase_matches_reference(self):
+        cases = [
+            "THE A",
+            "A TALE OF THE",
+            "MCDONALD'S TRUST",
+            "ST. JOHN'S AMBULANCE",
+            "O'REILLY-SMITH & CO / THE FUND",
+            "THE CHARITY: THE NAME",
+            "1ST A.B.C. SCOUTS",
+            "DR. WHO'S FUND (UK) LTD.",
+            "the pta of st mary's",
+            "FIRST LINE\nSECOND LINE OF THE",
+        ]
+        for s in cases:
+            self.assertEqual(to_titlecase(s), reference_titlecase(s))
+
+    def test_to_titlecase_many_matches_reference(self):
+        # a sample of names in the style of the CCEW register
+        fake = Faker("en_GB")
+        fake.add_provider(CharityProvider)
+        fake.seed_instance(400)
+        names = [fake.charity_name().upper() for _ in range(1_000)]
+        self.assertEqual(
+            to_titlecase_many(names), [reference_titlecase(name) for name in names]
+        )
+
+    def test_normalise_name(self):
+        test_cases = [
+            ("The Example Trust Ltd.", "example"),
+            ("EXAMPLE", "example"),
+            ("St. Mary’s Church & School", "st marys church school"),
+            ("A.B.C. Limited", "abc"),
+            ("Fírinne", "firinne"),
+            ("Save the Children (UK)", "save children uk"),
+            ("THE TRUST", "the trust"),
+            ("  ", None),
+            (None, None),
+        ]
+        for name, expected in test_cases:
+            with self.subTest(name=name):
+                self.assertEqual(normalise_name(name), expected)
+
+    def test_normalise_name_many(self):
+        values = ["The Example Trust", "Another Charity", None, "EXAMPLE"]
+        self.assertEqual(
+            normalise_name_many(values),
+            ["example", "another", None, "example"],
+        )
+
+    def test_normalise_postcode(self):
+        self.assertEqual(normalise_postcode("sw1a 1aa"), "SW1A1AA")
+        self.assertEqual(normalise_postcode(" EH1  1AA "), "EH11AA")
+        self.assertEqual(normalise_postcode("not a postcode"), None)
+        self.assertEqual(normalise_postcode(None), None)
+
+    def test_find_postcode(self):
+        self.assertEqual(find_postcode("1 High Street, Belfast, BT1 1AA"), "BT11AA")
+        self.assertEqual(find_postcode("Main Street, Dublin 2, D02 X285"), None)
+        self.assertEqual(find_postcode(None), None)
+
+    def test_normalise_company_number(self):
+        self.assertEqual(normalise_company_number("1234567"), "01234567")
+        self.assertEqual(normalise_company_number(" sc123456 "), "SC123456")
+        self.assertEqual(normalise_company_number("12345", prefix="NI"), "NI012345")
+        self.assertEqual(normalise_company_number("0"), None)
+        self.assertEqual(normalise_company_number(None), None)
+
     def test_working_url(self):
         cases = [
             ("https://www.google.com", "https://www.google.com"),
@@ -0,0 +1,79 @@
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from charity_django.companies.admin import CompanyAdmin
+from charity_django.companies.models import Company
+from charity_django.utils.admin import UsedChoicesFieldListFilter
+from charity_django.utils.cache import (
+    bump_cache_version,
+    get_used_values,
+    refresh_used_values,
+)
+
+
+class TestUsedChoices(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i, status in enumerate(["Active", "Active", "Dissolved", None]):
+            Company.objects.create(
+                CompanyNumber=f"0000000{i}",
+                CompanyName=f"Company {i}",
+                CompanyStatus=status,
+            )
+
+    def test_get_used_values(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                set(get_used_values(Company, "CompanyStatus")),
+                {"Active", "Dissolved", None},
+            )
+        Company.objects.create(
+            CompanyNumber="00000009", CompanyName="New", CompanyStatus="Liquidation"
+        )
+        with self.assertNumQueries(0):
+            self.assertNotIn("Liquidation", get_used_values(Company, "CompanyStatus"))
+
+        bump_cache_version(Company)
+        self.assertIn("Liquidation", get_used_values(Company, "CompanyStatus"))
+
+    def test_changelist_filter(self):
+        request = RequestFactory().get("/")
+        request.user = User.objects.create_superuser("admin")
+        site = AdminSite()
+        site.register(Company, CompanyAdmin)
+        model_admin = site._registry[Company]
+        refresh_used_values(Company, *Company.used_choices_fields)
+
+        with self.assertNumQueries(0):
+            list_filter = UsedChoicesFieldListFilter(
+                Company._meta.get_field("CompanyStatus"),
+                request,
+                {},
+                Company,
+                model_admin,
+                "CompanyStatus",
+            )
+        self.assertEqual(set(list_filter.lookup_choices), {"Active", "Dissolved", None})
+
+    def test_changelist_filter_queryset(self):
+        class ActiveCompanyAdmin(CompanyAdmin):
+            def get_queryset(self, request):
+                return super().get_queryset(request).exclude(CompanyStatus="Active")
+
+        request = RequestFactory().get("/")
+        request.user = User.objects.create_superuser("admin")
+        site = AdminSite()
+        site.register(Company, ActiveCompanyAdmin)
+        refresh_used_values(Company, "CompanyStatus")
+
+        list_filter = UsedChoicesFieldListFilter(
+            Company._meta.get_field("CompanyStatus"),
+            request,
+            {},
+            Company,
+            site._registry[Company],
+            "CompanyStatus",
+        )
+        self.assertEqual(set(list_filter.lookup_choices), {"Dissolved", None})
@@ -1,4 +1,6 @@
 import re
+import unicodedata
+from functools import lru_cache
 
 import titlecase
 
@@ -7,15 +9,9 @@ ORD_NUMBERS_RE = re.compile(r"([0-9]+(?:st|nd|rd|th))")
 SENTENCE_SPLIT = re.compile(r"(\. )")
 
 
-def title_exceptions(word, **kwargs):
-    word_test = word.strip("(){}<>.")
-
-    # lowercase words
-    if word_test.lower() in ["a", "an", "of", "the", "is", "or"]:
-        return word.lower()
-
-    # uppercase words
-    if word_test.upper() in [
+LOWERCASE_WORDS = frozenset(["a", "an", "of", "the", "is", "or"])
+UPPERCASE_WORDS = frozenset(
+    [
         "UK",
         "FM",
         "YMCA",
@@ -41,11 +37,11 @@ def title_exceptions(word, **kwargs):
         "AFC",
         "CE",
         "CIC",
-    ]:
-        return word.upper()
-
-    # words with no vowels that aren't all uppercase
-    if word_test.lower() in [
+    ]
+)
+# words with no vowels that aren't all uppercase
+NO_VOWEL_WORDS = frozenset(
+    [
         "st",
         "mr",
         "mrs",
@@ -55,7 +51,29 @@ def title_exceptions(word, **kwargs):
         "cwm",
         "clwb",
         "drs",
-    ]:
+    ]
+)
+CONTRACTIONS = frozenset(["YOU'RE", "DON'T", "HAVEN'T"])
+WORD_SEPARATORS = (".", "'", ")")
+LINE_SPLIT = re.compile(r"[\r\n]+")
+WORD_SPLIT = re.compile(r"[\t ]")
+
+TITLECASE_CACHE_SIZE = 100_000
+
+
+def title_exceptions(word, **kwargs):
+    word_test = word.strip("(){}<>.")
+
+    # lowercase words
+    if word_test.lower() in LOWERCASE_WORDS:
+        return word.lower()
+
+    # uppercase words
+    if word_test.upper() in UPPERCASE_WORDS:
+        return word.upper()
+
+    # words with no vowels that aren't all uppercase
+    if word_test.lower() in NO_VOWEL_WORDS:
         return word_test.title()
 
     # words with number ordinals
@@ -63,30 +81,20 @@ def title_exceptions(word, **kwargs):
         return word.lower()
 
     # words with dots/etc in the middle
-    for s in [".", "'", ")"]:
+    for s in WORD_SEPARATORS:
         dots = word.split(s)
         if len(dots) > 1:
             # check for possesive apostrophes
             if s == "'" and dots[-1].upper() == "S":
                 return s.join(
-                    [
-                        titlecase.titlecase(i, callback=title_exceptions)
-                        for i in dots[:-1]
-                    ]
-                    + [dots[-1].lower()]
+                    [_titlecase_part(i) for i in dots[:-1]] + [dots[-1].lower()]
                 )
             # check for you're and other contractions
-            if word_test.upper() in ["YOU'RE", "DON'T", "HAVEN'T"]:
+            if word_test.upper() in CONTRACTIONS:
                 return s.join(
-                    [
-                        titlecase.titlecase(i, callback=title_exceptions)
-                        for i in dots[:-1]
-                    ]
-                    + [dots[-1].lower()]
+                    [_titlecase_part(i) for i in dots[:-1]] + [dots[-1].lower()]
                 )
-            return s.join(
-                [titlecase.titlecase(i, callback=title_exceptions) for i in dots]
-            )
+            return s.join([_titlecase_part(i) for i in dots])
 
     # words with no vowels in (treat as acronyms)
     if not bool(VOWELS.search(word_test)):
@@ -95,10 +103,54 @@ def title_exceptions(word, **kwargs):
     return None
 
 
-def to_titlecase(s, sentence=False):
-    if not isinstance(s, str):
-        return s
+@lru_cache(maxsize=TITLECASE_CACHE_SIZE)
+def _titlecase_part(part):
+    # parts of a word split on punctuation are titlecased on their own
+    return titlecase.titlecase(part, callback=title_exceptions)
+
 
+@lru_cache(maxsize=TITLECASE_CACHE_SIZE)
+def _titlecase_word(word, all_caps):
+    """
+    Titlecase a single word, returning a tuple of the new word and whether
+    it was set by `title_exceptions` (and so shouldn't be changed further).
+
+    The result for a word doesn't depend on the words around it, apart from
+    the first and last word adjustments made in `_titlecase_line`, so it can
+    be shared between all the names the word appears in.
+    """
+    new_word = title_exceptions(word, all_caps=all_caps)
+    if new_word:
+        return new_word, True
+    return (
+        titlecase.titlecase(word, callback=title_exceptions, small_first_last=False),
+        False,
+    )
+
+
+def _titlecase_line(line):
+    # equivalent to titlecase.titlecase(line, callback=title_exceptions)
+    all_caps = line.upper() == line
+    words = [_titlecase_word(word, all_caps) for word in WORD_SPLIT.split(line)]
+    tc_line = [word for word, _ in words]
+    if tc_line:
+        if not words[0][1]:
+            tc_line[0] = titlecase.SMALL_FIRST.sub(
+                lambda m: "%s%s" % (m.group(1), m.group(2).capitalize()),
+                tc_line[0],
+            )
+        if not words[-1][1]:
+            tc_line[-1] = titlecase.SMALL_LAST.sub(
+                lambda m: m.group(0).capitalize(), tc_line[-1]
+            )
+    return titlecase.SUBPHRASE.sub(
+        lambda m: "%s%s" % (m.group(1), m.group(2).capitalize()),
+        " ".join(tc_line),
+    )
+
+
+@lru_cache(maxsize=TITLECASE_CACHE_SIZE)
+def _to_titlecase(s, sentence=False):
     s = s.strip()
 
     # if it contains any lowercase letters then return as is
@@ -110,12 +162,148 @@ def to_titlecase(s, sentence=False):
         return "".join([sent.capitalize() for sent in re.split(SENTENCE_SPLIT, s)])
 
     # try titlecasing
-    s = titlecase.titlecase(s, callback=title_exceptions)
+    s = "\n".join(_titlecase_line(line) for line in LINE_SPLIT.split(s))
 
     # Make sure first letter is capitalise
     return s[0].upper() + s[1:]
 
 
+def to_titlecase(s, sentence=False):
+    if not isinstance(s, str):
+        return s
+    return _to_titlecase(s, sentence)
+
+
+def to_titlecase_many(values, sentence=False):
+    """
+    Titlecase a list of values, such as a column of charity names.
+
+    Each distinct value is only titlecased once, and the results are
+    returned in the same order as the input.
+    """
+    values = list(values)
+    results = {}
+    for value in values:
+        if value not in results:
+            results[value] = to_titlecase(value, sentence=sentence)
+    return [results[value] for value in values]
+
+
+# words that don't help tell organisation names apart
+NAME_STOP_WORDS = frozenset(
+    [
+        "the",
+        "a",
+        "an",
+        "and",
+        "of",
+        "for",
+        "limited",
+        "ltd",
+        "plc",
+        "llp",
+        "cic",
+        "cio",
+        "incorporated",
+        "inc",
+        "company",
+        "co",
+        "trust",
+        "trustees",
+        "charity",
+    ]
+)
+NAME_JOINERS = re.compile(r"['.’]")
+NAME_PUNCTUATION = re.compile(r"[^\w\s]+|_")
+NAME_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=TITLECASE_CACHE_SIZE)
+def _normalise_name(s):
+    s = unicodedata.normalize("NFKD", s.casefold())
+    s = "".join(c for c in s if not unicodedata.combining(c))
+    # apostrophes and dots are dropped so "A.B.C." becomes "abc"
+    s = NAME_JOINERS.sub("", s.replace("&", " and "))
+    s = NAME_PUNCTUATION.sub(" ", s)
+    words = NAME_WHITESPACE.split(s.strip())
+    normalised = " ".join(w for w in words if w not in NAME_STOP_WORDS)
+    # a name made up entirely of stop words is kept as it is
+    return normalised or " ".join(words)
+
+
+def normalise_name(s):
+    """
+    Normalise an organisation name for searching and matching.
+
+    The name is casefolded, accents and punctuation are removed and common
+    words like "the", "limited" and "trust" are dropped, so
+    "The Example Trust Ltd." and "EXAMPLE" both become "example".
+    """
+    if not isinstance(s, str):
+        return None
+    return _normalise_name(s) or None
+
+
+def normalise_name_many(values):
+    """
+    Normalise a list of names, returning the results in the same order.
+    """
+    values = list(values)
+    results = {}
+    for value in values:
+        if value not in results:
+            results[value] = normalise_name(value)
+    return [results[value] for value in values]
+
+
+POSTCODE_REGEX = re.compile(
+    r"\b([A-Z]{1,2}[0-9][A-Z0-9]?)\s*([0-9][A-Z]{2})\b", re.IGNORECASE
+)
+
+
+def normalise_postcode(s):
+    """
+    Uppercase a UK postcode and remove any spaces, eg "sw1a 1aa" becomes "SW1A1AA".
+
+    Returns None if the value doesn't look like a postcode.
+    """
+    if not isinstance(s, str):
+        return None
+    match = POSTCODE_REGEX.fullmatch(s.strip())
+    if not match:
+        return None
+    return (match.group(1) + match.group(2)).upper()
+
+
+def find_postcode(s):
+    """
+    Find the last UK postcode in a piece of text, such as an address.
+    """
+    if not isinstance(s, str):
+        return None
+    matches = POSTCODE_REGEX.findall(s)
+    if not matches:
+        return None
+    return (matches[-1][0] + matches[-1][1]).upper()
+
+
+def normalise_company_number(s, prefix=""):
+    """
+    Format a company number the way Companies House does, eg "1234" becomes "00001234".
+
+    Numbers without a letter prefix are padded to eight characters, with
+    `prefix` (such as "NI") added first if given.
+    """
+    if s is None:
+        return None
+    s = re.sub(r"\s+", "", str(s)).upper()
+    if not s or s.strip("0") == "":
+        return None
+    if s.isdigit():
+        return prefix + s.zfill(8 - len(prefix))
+    return s
+
+
 def regex_search(s, regex):
     return re.search(regex, s) is not None
 